@@ -1,6 +1,10 @@
 import pandas as pd
 import re
-import math
+
+from extraction_cache import file_sha256
+from product_costing import CostBreakdownCache, calculate_costs, catalogue_fingerprint
+from rollups import build_rollup, read_rollup, rollup_key, write_rollup
+from state_normalizer import normalize_states
 
 
 
@@ -87,39 +91,12 @@ df['DayOfWeek'] = df['Order Date'].dt.day_name()
 df['WeekOfYear'] = df['Order Date'].dt.isocalendar().week
 print(f"✓ Date components extracted")
 
-# Clean Place of Delivery and Normalize State
-states_map = {
-    'ANDHRA PRADESH': 'Andhra Pradesh', 'ARUNACHAL PRADESH': 'Arunachal Pradesh',
-    'ASSAM': 'Assam', 'BIHAR': 'Bihar', 'CHHATTISGARH': 'Chhattisgarh',
-    'GOA': 'Goa', 'GUJARAT': 'Gujarat', 'HARYANA': 'Haryana',
-    'HIMACHAL PRADESH': 'Himachal Pradesh', 'JHARKHAND': 'Jharkhand',
-    'KARNATAKA': 'Karnataka', 'KERALA': 'Kerala', 'MADHYA PRADESH': 'Madhya Pradesh',
-    'MAHARASHTRA': 'Maharashtra', 'MANIPUR': 'Manipur', 'MEGHALAYA': 'Meghalaya',
-    'MIZORAM': 'Mizoram', 'NAGALAND': 'Nagaland', 'ODISHA': 'Odisha',
-    'PUNJAB': 'Punjab', 'RAJASTHAN': 'Rajasthan', 'SIKKIM': 'Sikkim',
-    'TAMIL NADU': 'Tamil Nadu', 'TAMILNADU': 'Tamil Nadu', 'TAMIL NADU ': 'Tamil Nadu',
-    'TELANGANA': 'Telangana', 'TRIPURA': 'Tripura', 'UTTAR PRADESH': 'Uttar Pradesh',
-    'UTTARAKHAND': 'Uttarakhand', 'WEST BENGAL': 'West Bengal',
-    # Union Territories
-    'ANDAMAN AND NICOBAR ISLANDS': 'Andaman and Nicobar Islands',
-    'CHANDIGARH': 'Chandigarh', 'DADRA AND NAGAR HAVELI AND DAMAN AND DIU': 'Dadra and Nagar Haveli and Daman and Diu',
-    'DELHI': 'Delhi', 'JAMMU AND KASHMIR': 'Jammu and Kashmir',
-    'LADAKH': 'Ladakh', 'LAKSHADWEEP': 'Lakshadweep', 'PUDUCHERRY': 'Puducherry'
-}
-
-def normalize_state(val):
-    val_str = str(val).upper().strip()
-    if val_str in states_map:
-        return states_map[val_str]
-    for state_key in states_map.keys():
-        if state_key in val_str:
-            return states_map[state_key]
-    return "Unknown"
-
+# Clean Place of Delivery and Normalize State (see state_normalizer.py)
+addresses = df['Shipping Address'] if 'Shipping Address' in df.columns else None
 if 'Place of Delivery' in df.columns:
-    df['State'] = df['Place of Delivery'].apply(normalize_state)
+    df['State'] = normalize_states(df['Place of Delivery'], addresses)
 elif 'State' in df.columns:
-    df['State'] = df['State'].apply(normalize_state)
+    df['State'] = normalize_states(df['State'], addresses)
 else:
     df['State'] = "Unknown"
 print(f"✓ State names standardized and normalized")
@@ -132,13 +109,6 @@ def extract_weight(description):
     if kg_match: return float(kg_match.group(1))
     return 0.5
 
-def get_dynamic_shipping(total_weight_kg):
-    if total_weight_kg <= 0.5: return 76
-    elif total_weight_kg <= 1.0: return 100
-    elif total_weight_kg <= 2.0: return 143
-    elif total_weight_kg <= 5.0: return 143 + (math.ceil(total_weight_kg - 2.0) * 40)
-    else: return 263 + (math.ceil(total_weight_kg - 5.0) * 26)
-
 # Build a lookup dictionary from df_data for efficiency
 product_costs = {}
 for _, row in df_data.iterrows():
@@ -151,78 +121,28 @@ for _, row in df_data.iterrows():
         'weight': extract_weight(row['Description'])
     }
 
-def calculate_profit(description, qty):
-    if pd.isna(description): return 0
-    try: quantity = int(qty) if not pd.isna(qty) else 1
-    except: quantity = 1
-    
-    description_str = str(description).lower()
-    matched_products = []
-    remaining_desc = description_str
-    sorted_names = sorted(product_costs.keys(), key=len, reverse=True)
-    
-    for name in sorted_names:
-        if name in remaining_desc:
-            count = remaining_desc.count(name)
-            matched_products.extend([product_costs[name]] * count)
-            remaining_desc = remaining_desc.replace(name, " ")
-            
-    if not matched_products: return 0
-    
-    total_sp = sum(p['sp_before_gst'] for p in matched_products)
-    total_purchase = sum(p['purchase'] for p in matched_products)
-    total_referral = sum(p['referral'] for p in matched_products)
-    total_packing = sum(p['packing'] for p in matched_products)
-    total_weight = sum(p['weight'] for p in matched_products)
-    
-    revenue = total_sp * quantity
-    base_costs = (total_purchase + total_referral + total_packing) * quantity
-    shipping = get_dynamic_shipping(total_weight * quantity)
-    
-    return round(revenue - base_costs - shipping, 2)
-
-def calculate_expenses(description, qty):
-    """Calculate expenses (purchase + packing) for an order."""
-    if pd.isna(description): return 0
-    try: quantity = int(qty) if not pd.isna(qty) else 1
-    except: quantity = 1
-    
-    description_str = str(description).lower()
-    matched_products = []
-    remaining_desc = description_str
-    sorted_names = sorted(product_costs.keys(), key=len, reverse=True)
-    
-    for name in sorted_names:
-        if name in remaining_desc:
-            count = remaining_desc.count(name)
-            matched_products.extend([product_costs[name]] * count)
-            remaining_desc = remaining_desc.replace(name, " ")
-            
-    if not matched_products: return 0
-    
-    total_purchase = sum(p['purchase'] for p in matched_products)
-    total_packing = sum(p['packing'] for p in matched_products)
-    
-    # Expenses = (purchase + packing) * quantity
-    expenses = (total_purchase + total_packing) * quantity
-    
-    return round(expenses, 2)
+# Description -> matched products and per-unit totals, shared by the Profit,
+# Expenses and Platform Fees computations; see product_costing.py
+cost_breakdowns = CostBreakdownCache(product_costs)
 
 # Clean Qty column - convert to numeric
 df['Qty'] = pd.to_numeric(df['Qty'], errors='coerce').fillna(1).astype(int)
 print(f"✓ Qty column cleaned and converted to numeric")
 
+# Cost every row in one columnar pass, matching each distinct description once
+costs = calculate_costs(df['Description'], df['Qty'], cost_breakdowns, df['Invoice Value'])
+
 # Add Profit column using both Description and Qty
-df['Profit'] = df.apply(lambda row: calculate_profit(row['Description'], row['Qty']), axis=1)
+df['Profit'] = costs['Profit']
 print(f"✓ Profit column added based on product margins and quantities")
 
 # Add Expenses column
-df['Expenses'] = df.apply(lambda row: calculate_expenses(row['Description'], row['Qty']), axis=1)
+df['Expenses'] = costs['Expenses']
 print(f"✓ Expenses column added (Purchase + Packing costs)")
 
 # Add Platform Fees column (Revenue - Expenses - Profit)
 # Revenue is 'Invoice Value'
-df['Platform Fees'] = df['Invoice Value'] - df['Expenses'] - df['Profit']
+df['Platform Fees'] = costs['Platform Fees']
 print(f"✓ Platform Fees column added (Shipping + Tax + Referral)")
 
 
@@ -293,6 +213,24 @@ df.groupby(['Year', 'Month'])['Invoice Value'] \
 # Save to a specific folder
 df.to_csv("invoice_data_with_profit.csv", index=False)
 
+# Materialize the dashboard rollup for this CSV (see rollups.py). Missing
+# payment modes count as Cash on Delivery, as they do in the dashboard.
+rollup_df = df
+if 'Mode of Payment' in df.columns:
+    rollup_df = df.assign(**{'Mode of Payment': df['Mode of Payment'].fillna('Cash on Delivery')})
+try:
+    rollup = build_rollup(rollup_df)
+    rollup_id = rollup_key(file_sha256("all_invoices.csv"), catalogue_fingerprint(product_costs))
+    rollup_file = write_rollup(rollup, rollup_id)
+    print(f"✓ Dashboard rollup written to {rollup_file}")
+    # Read it back the way the dashboard will, to catch Parquet round-trip drift
+    if rollup.equals(read_rollup(rollup_id)):
+        print("✓ Dashboard rollup reads back unchanged")
+    else:
+        print("✗ Dashboard rollup reads back differently from what was written")
+except ImportError:
+    print("✗ Dashboard rollup not written (install pyarrow for Parquet support)")
+
 #import pandas as pd
 #import matplotlib.pyplot as plt
 
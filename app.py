@@ -5,7 +5,12 @@ import seaborn as sns
 import plotly.express as px
 import plotly.graph_objects as go
 import re
-import math
+import hashlib
+
+from product_costing import CostBreakdownCache, calculate_costs, catalogue_fingerprint
+from rollups import build_rollup, read_rollup, rollup_key
+from state_geometry import ALL_INDIA_STATES, FEATURE_ID_KEY, GEOJSON_URL, load_state_geometry
+from state_normalizer import normalize_states
 
 # Page Configuration
 st.set_page_config(
@@ -176,13 +181,6 @@ def extract_weight(description):
     if kg_match: return float(kg_match.group(1))
     return 0.5
 
-def get_dynamic_shipping(total_weight_kg):
-    if total_weight_kg <= 0.5: return 76
-    elif total_weight_kg <= 1.0: return 100
-    elif total_weight_kg <= 2.0: return 143
-    elif total_weight_kg <= 5.0: return 143 + (math.ceil(total_weight_kg - 2.0) * 40)
-    else: return 263 + (math.ceil(total_weight_kg - 5.0) * 26)
-
 product_costs = {}
 for _, row in df_data_internal.iterrows():
     name = row['Description'].strip().lower()
@@ -192,68 +190,12 @@ for _, row in df_data_internal.iterrows():
         'weight': extract_weight(row['Description'])
     }
 
-def calculate_profit_internal(description, qty):
-    if pd.isna(description): return 0
-    try: quantity = int(qty) if not pd.isna(qty) else 1
-    except: quantity = 1
-    
-    description_str = str(description).lower()
-    matched_products = []
-    remaining_desc = description_str
-    sorted_names = sorted(product_costs.keys(), key=len, reverse=True)
-    
-    for name in sorted_names:
-        if name in remaining_desc:
-            # Count how many times this product appears in the string
-            # This handles cases where multiple items are listed in one row
-            count = remaining_desc.count(name)
-            matched_products.extend([product_costs[name]] * count)
-            # Remove to prevent double-matching with shorter names
-            remaining_desc = remaining_desc.replace(name, " ")
-            
-    if not matched_products: return 0
-    
-    total_sp = sum(p['sp_before_gst'] for p in matched_products)
-    total_purchase = sum(p['purchase'] for p in matched_products)
-    total_referral = sum(p['referral'] for p in matched_products)
-    total_packing = sum(p['packing'] for p in matched_products)
-    total_weight = sum(p['weight'] for p in matched_products)
-    
-    revenue = total_sp * quantity
-    base_costs = (total_purchase + total_referral + total_packing) * quantity
-    shipping = get_dynamic_shipping(total_weight * quantity)
-    
-    return round(revenue - base_costs - shipping, 2)
-
-def calculate_expenses_internal(description, qty):
-    """Calculate expenses (purchase + packing) for an order."""
-    if pd.isna(description): return 0
-    try: quantity = int(qty) if not pd.isna(qty) else 1
-    except: quantity = 1
-    
-    description_str = str(description).lower()
-    matched_products = []
-    remaining_desc = description_str
-    sorted_names = sorted(product_costs.keys(), key=len, reverse=True)
-    
-    for name in sorted_names:
-        if name in remaining_desc:
-            # Count how many times this product appears in the string
-            count = remaining_desc.count(name)
-            matched_products.extend([product_costs[name]] * count)
-            # Remove to prevent double-matching with shorter names
-            remaining_desc = remaining_desc.replace(name, " ")
-            
-    if not matched_products: return 0
-    
-    total_purchase = sum(p['purchase'] for p in matched_products)
-    total_packing = sum(p['packing'] for p in matched_products)
-    
-    # Expenses = (purchase + packing) * quantity
-    # Shipping and referral are paid by customer/deducted from revenue, not "out of pocket" expenses in this context
-    expenses = (total_purchase + total_packing) * quantity
-    
-    return round(expenses, 2)
+# Description -> matched products and per-unit totals, shared by the Profit,
+# Expenses and Platform Fees computations; see product_costing.py
+cost_breakdowns = CostBreakdownCache(product_costs)
+# Part of every data key below: Profit, Expenses and Platform Fees change
+# with the catalogue as much as with the CSV
+catalogue_hash = catalogue_fingerprint(product_costs)
 
 def load_and_process_data(uploaded_file):
     """Load and perform initial cleaning on the data."""
@@ -275,48 +217,22 @@ def load_and_process_data(uploaded_file):
         df['Day'] = df['Order Date'].dt.day
         df['DayOfWeek'] = df['Order Date'].dt.day_name()
         
-        # 4. Clean Place of Delivery
-        states_map = {
-            'ANDHRA PRADESH': 'Andhra Pradesh', 'ARUNACHAL PRADESH': 'Arunachal Pradesh',
-            'ASSAM': 'Assam', 'BIHAR': 'Bihar', 'CHHATTISGARH': 'Chhattisgarh',
-            'GOA': 'Goa', 'GUJARAT': 'Gujarat', 'HARYANA': 'Haryana',
-            'HIMACHAL PRADESH': 'Himachal Pradesh', 'JHARKHAND': 'Jharkhand',
-            'KARNATAKA': 'Karnataka', 'KERALA': 'Kerala', 'MADHYA PRADESH': 'Madhya Pradesh',
-            'MAHARASHTRA': 'Maharashtra', 'MANIPUR': 'Manipur', 'MEGHALAYA': 'Meghalaya',
-            'MIZORAM': 'Mizoram', 'NAGALAND': 'Nagaland', 'ODISHA': 'Odisha',
-            'PUNJAB': 'Punjab', 'RAJASTHAN': 'Rajasthan', 'SIKKIM': 'Sikkim',
-            'TAMIL NADU': 'Tamil Nadu', 'TAMILNADU': 'Tamil Nadu', 'TAMIL NADU ': 'Tamil Nadu',
-            'TELANGANA': 'Telangana', 'TRIPURA': 'Tripura', 'UTTAR PRADESH': 'Uttar Pradesh',
-            'UTTARAKHAND': 'Uttarakhand', 'WEST BENGAL': 'West Bengal',
-            # Union Territories
-            'ANDAMAN AND NICOBAR ISLANDS': 'Andaman and Nicobar Islands',
-            'CHANDIGARH': 'Chandigarh', 'DADRA AND NAGAR HAVELI AND DAMAN AND DIU': 'Dadra and Nagar Haveli and Daman and Diu',
-            'DELHI': 'Delhi', 'JAMMU AND KASHMIR': 'Jammu and Kashmir',
-            'LADAKH': 'Ladakh', 'LAKSHADWEEP': 'Lakshadweep', 'PUDUCHERRY': 'Puducherry'
-        }
-        
-        def normalize_state(val):
-            val_str = str(val).upper().strip()
-            # Direct mapping
-            if val_str in states_map:
-                return states_map[val_str]
-            # Search within string if not a direct match (handles noisy address strings)
-            for state_key in states_map.keys():
-                if state_key in val_str:
-                    return states_map[state_key]
-            return "Unknown"
-
+        # 4. Clean Place of Delivery (see state_normalizer.py). Each distinct
+        # value is resolved once; the Shipping Address PIN is the fallback.
+        addresses = df['Shipping Address'] if 'Shipping Address' in df.columns else None
         if 'Place of Delivery' in df.columns:
-            df['State'] = df['Place of Delivery'].apply(normalize_state)
+            df['State'] = normalize_states(df['Place of Delivery'], addresses)
         elif 'State' in df.columns:
-            df['State'] = df['State'].apply(normalize_state)
+            df['State'] = normalize_states(df['State'], addresses)
         else:
             df['State'] = "Unknown"
             
         # 5. Clean Qty and Calculate Profit and Expenses
         df['Qty'] = pd.to_numeric(df['Qty'], errors='coerce').fillna(1).astype(int)
-        df['Profit'] = df.apply(lambda row: calculate_profit_internal(row['Description'], row['Qty']), axis=1)
-        df['Expenses'] = df.apply(lambda row: calculate_expenses_internal(row['Description'], row['Qty']), axis=1)
+        # Each distinct description is matched once; see product_costing.py
+        costs = calculate_costs(df['Description'], df['Qty'], cost_breakdowns, df['Invoice Value'])
+        df['Profit'] = costs['Profit']
+        df['Expenses'] = costs['Expenses']
         
         # 6. Clean Mode of Payment (Nulls treated as Cash on Delivery)
         if 'Mode of Payment' in df.columns:
@@ -324,14 +240,753 @@ def load_and_process_data(uploaded_file):
         
         # 7. Calculate Platform Fees (Revenue - Expenses - Profit)
         # Revenue is 'Invoice Value'
-        df['Platform Fees'] = df['Invoice Value'] - df['Expenses'] - df['Profit']
+        df['Platform Fees'] = costs['Platform Fees']
             
         return df
     except Exception as e:
         st.error(f"Error processing file: {e}")
         return None
 
+@st.cache_resource(show_spinner=False)
+def load_india_geojson():
+    """
+    India state boundaries (state_geometry.py), read and validated once per process.
+
+    Raises:
+        FileNotFoundError: If assets/india_states.geojson is missing
+    """
+    geojson, missing_states = load_state_geometry(ALL_INDIA_STATES)
+    if missing_states:
+        print(f"✗ No map boundary for: {', '.join(missing_states)}")
+    return geojson, missing_states
+
+def content_hash(source):
+    """Return the SHA-256 of an uploaded file's bytes, or of a file on disk given its path."""
+    if isinstance(source, str):
+        digest = hashlib.sha256()
+        with open(source, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+    return hashlib.sha256(source.getvalue()).hexdigest()
+
+# Cached stages. Streamlit reruns the whole script on every widget interaction,
+# so the processed frame and each section's aggregate are memoized on the data
+# key (rollups.rollup_key: the CSV's content hash and the catalogue
+# fingerprint); the frame itself is passed as an unhashed "_" argument.
+@st.cache_data(show_spinner=False, max_entries=8)
+def load_processed_data(data_hash, _source):
+    """load_and_process_data, computed once per distinct CSV content."""
+    return load_and_process_data(_source)
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def load_rollup(data_hash, _df):
+    """The pre-aggregated totals of the data (see rollups.py): the file materialized by analysis.py for this CSV, or built from the processed frame."""
+    rollup = read_rollup(data_hash)
+    if rollup is None:
+        rollup = build_rollup(_df)
+    return rollup
+
+# The section aggregates group the rollup, whose size depends on the number of
+# distinct state / month / product / payment keys rather than on the invoice count
+@st.cache_data(show_spinner=False, max_entries=8)
+def state_summary(data_hash, _df):
+    """Orders, revenue, items sold and profit per state, for every state and UT."""
+    state_analysis = load_rollup(data_hash, _df).groupby('State').agg(
+        Orders=('Orders', 'sum'),
+        Revenue=('Revenue', 'sum'),
+        Items_Sold=('Qty', 'sum'),
+        Profit=('Profit', 'sum')
+    )
+    
+    # Reindex to include all states and fill with 0
+    state_analysis = state_analysis.reindex(ALL_INDIA_STATES).fillna(0)
+    
+    # Calculate Avg Order
+    state_analysis['Avg Order (₹)'] = (state_analysis['Revenue'] / state_analysis['Orders']).fillna(0).round(2)
+    
+    # Reorder and Rename columns for display
+    state_analysis = state_analysis[['Orders', 'Revenue', 'Avg Order (₹)', 'Items_Sold', 'Profit']]
+    state_analysis.columns = ['Orders', 'Revenue (₹)', 'Avg Order (₹)', 'Items Sold', 'Profit']
+    
+    return state_analysis.sort_values('Revenue (₹)', ascending=False)
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def monthly_summary(data_hash, _df):
+    """Monthly totals and their "Mon YYYY" labels."""
+    monthly_analysis = load_rollup(data_hash, _df).groupby(['Year', 'Month']).agg(
+        Orders=('Orders', 'sum'),
+        Revenue=('Revenue', 'sum'),
+        Units_Sold=('Qty', 'sum'),
+        Profit=('Profit', 'sum'),
+        Expenses=('Expenses', 'sum'),
+        Platform_Fees=('Platform Fees', 'sum')
+    ).round(2)
+    
+    # Calculate Avg Order
+    monthly_analysis['Avg Order (₹)'] = (monthly_analysis['Revenue'] / monthly_analysis['Orders']).fillna(0).round(2)
+    
+    # Create labels for display
+    month_labels_idx = []
+    for idx in monthly_analysis.index:
+        year, month = idx
+        month_names = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 
+                       'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+        month_labels_idx.append(f"{month_names[month-1]} {year}")
+    
+    return monthly_analysis, month_labels_idx
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def product_summary(data_hash, _df):
+    """Orders, units, revenue, expenses, fees and profit per product, best sellers first."""
+    product_performance = load_rollup(data_hash, _df).groupby('Description').agg(
+        Total_Orders=('Orders', 'sum'),
+        Units_Sold=('Qty', 'sum'),
+        Revenue=('Revenue', 'sum'),
+        Expenses=('Expenses', 'sum'),
+        Platform_Fees=('Platform Fees', 'sum'),
+        Profit=('Profit', 'sum')
+    ).reset_index()
+    
+    # Sort by Units Sold descending
+    return product_performance.sort_values('Units_Sold', ascending=False)
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def payment_summary(data_hash, _df):
+    """Number of sales per Mode of Payment, most used first."""
+    payment_stats = load_rollup(data_hash, _df).groupby('Mode of Payment', sort=False)['Rows'].sum()
+    payment_stats = payment_stats.sort_values(ascending=False, kind='stable').reset_index()
+    payment_stats.columns = ['Payment Method', 'Number of Sales']
+    return payment_stats
+
+# --- 1. BASIC DATA OVERVIEW ---
+def render_overview(df, data_hash):
+    """Key metrics, calculation reference and the raw data."""
+    st.header("1. Basic Data Overview")
+
+    # Key Metrics
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Total Records", f"{len(df):,}")
+    with col2:
+        total_revenue = df['Invoice Value'].sum()
+        st.metric("Total Revenue", f"₹{total_revenue:,.2f}")
+    with col3:
+        total_profit = df['Profit'].sum()
+        st.metric("Total Profit", f"₹{total_profit:,.2f}")
+    with col4:
+        st.metric("Total Columns", len(df.columns))
+
+    # Calculation Methodology Reference
+    with st.expander("ℹ️ Understanding the Business Metrics (Calculation Logic)", expanded=True):
+        st.markdown("""
+        | Category | What it represents | Items Included |
+        | :--- | :--- | :--- |
+        | **🛍️ Expenses** | Your direct sourcing/out-of-pocket spending | Purchase Cost + Packing Cost |
+        | **📦 Platform Fees** | Total deductions by Amazon / Govt | Shipping Cost + Tax (GST) + Referral Fee |
+        | **💵 Net Profit** | Your actual monthly earnings | Revenue - Expenses - Platform Fees |
+        """)
+        st.info("💡 **Note:** Net Profit is calculated on the pre-tax selling price to accurately isolate tax into the Platform Fees bucket.")
+
+    # Raw Data Expander
+    with st.expander("View Raw Data Frame"):
+        st.dataframe(df)
+
+    # Column Types
+    with st.expander("View Column Info"):
+        dtype_df = df.dtypes.astype(str).reset_index()
+        dtype_df.columns = ["Column", "Type"]
+        st.table(dtype_df)
+
+# --- 2. DATA QUALITY ---
+def render_data_quality(df, data_hash):
+    """Missing values per column."""
+    st.header("2. Data Quality Check")
+
+    missing = df.isnull().sum()
+    missing = missing[missing > 0]
+    if not missing.empty:
+        st.warning("Found missing values in the following columns:")
+        col_miss1, col_miss2 = st.columns([1, 2])
+        with col_miss1:
+            missing_df = pd.DataFrame({'Missing Count': missing, 'Percentage': (missing / len(df) * 100).round(2)})
+            st.dataframe(missing_df)
+    else:
+        st.success("No missing values found!")
+
+# --- 3. GEOGRAPHICAL ANALYSIS ---
+def render_geography(df, data_hash):
+    """State-wise table and map / bar / pie chart of revenue."""
+    st.header("3. Geographical Analysis")
+
+    state_analysis = state_summary(data_hash, df)
+
+    col_geo1, col_geo2 = st.columns([1, 1])
+    with col_geo1:
+        st.subheader("State-wise Table")
+        st.dataframe(state_analysis, height=400)
+
+    with col_geo2:
+        st.subheader("Revenue by State")
+
+        # Chart Type Selection
+        chart_type = st.radio(
+            "Select Chart Type:",
+            ["Map (Interactive)", "Bar Chart", "Pie Chart"],
+            horizontal=True,
+            label_visibility="collapsed"
+        )
+
+        # Check if there are too many states for Pie/Treemap
+        plot_data_df = state_analysis.reset_index()
+
+        if "Map" in chart_type:
+            # Choropleth Map of India, from the local boundaries
+            try:
+                geojson, missing_states = load_india_geojson()
+            except FileNotFoundError as e:
+                # No local copy yet: let the browser fetch the full-resolution
+                # boundaries, as the dashboard did before the local copy
+                geojson, missing_states = GEOJSON_URL, []
+                st.caption(f"Using the online map boundaries: {e}")
+
+            fig = px.choropleth(
+                plot_data_df,
+                geojson=geojson,
+                featureidkey=FEATURE_ID_KEY,
+                locations='State',
+                color='Orders',
+                hover_name='State',
+                hover_data={'Orders': True, 'Revenue (₹)': ':₹,.2f', 'Profit': ':₹,.2f'},
+                color_continuous_scale=px.colors.sequential.Blues,
+                range_color=[0, plot_data_df['Orders'].max()],
+                labels={'Orders': 'Orders'}
+            )
+
+            fig.update_geos(
+                visible=False, 
+                resolution=50,
+                showcountries=True, 
+                countrycolor="RebeccaPurple",
+                fitbounds="locations"
+            )
+
+            fig.update_layout(
+                margin={"r":0,"t":0,"l":0,"b":0},
+                height=500,
+                coloraxis_colorbar=dict(
+                    title="Orders",
+                    thicknessmode="pixels", thickness=15,
+                    lenmode="pixels", len=200,
+                    yanchor="top", y=1,
+                    ticks="outside"
+                )
+            )
+            st.plotly_chart(fig, use_container_width=True)
+            if missing_states:
+                st.caption(f"No map boundary for: {', '.join(missing_states)}")
+
+        elif "Bar" in chart_type:
+            # Horizontal Bar Chart - Filter out states with no orders
+            bar_plot_df = plot_data_df[plot_data_df['Orders'] > 0].sort_values('Revenue (₹)', ascending=True)
+
+            fig = px.bar(
+                bar_plot_df, 
+                x='Revenue (₹)', 
+                y='State',
+                orientation='h',
+                text_auto='.2s',
+                color='Revenue (₹)',
+                color_continuous_scale='Blues'
+            )
+            fig.update_layout(showlegend=False, height=400)
+            st.plotly_chart(fig, use_container_width=True)
+
+        elif "Pie" in chart_type:
+            # Filter out states with no orders for Pie Chart
+            pie_plot_df = plot_data_df[plot_data_df['Orders'] > 0]
+
+            # Logic to group smaller segments for Pie Chart
+            if len(pie_plot_df) > 10:
+                top_9 = pie_plot_df.nlargest(9, 'Revenue (₹)')
+                others_val = pie_plot_df.nsmallest(len(pie_plot_df) - 9, 'Revenue (₹)')['Revenue (₹)'].sum()
+                others_row = pd.DataFrame({'State': ['OTHERS'], 'Orders': [0], 'Revenue (₹)': [others_val]})
+                pie_plot_df = pd.concat([top_9, others_row])
+
+            fig = px.pie(
+                pie_plot_df, 
+                values='Revenue (₹)', 
+                names='State',
+                hole=0.4,
+                color_discrete_sequence=px.colors.sequential.RdBu
+            )
+            st.plotly_chart(fig, use_container_width=True)
+
+# --- 4. TEMPORAL ANALYSIS ---
+def render_monthly_trend(df, data_hash):
+    """Monthly totals table."""
+    st.header("4. Monthly sales trend and growth pattern")
+
+    monthly_analysis, month_labels_idx = monthly_summary(data_hash, df)
+
+    # Prepare display dataframe
+    monthly_analysis_display = monthly_analysis[['Orders', 'Revenue', 'Avg Order (₹)', 'Units_Sold', 'Expenses', 'Platform_Fees', 'Profit']].copy()
+    monthly_analysis_display.index = month_labels_idx
+    monthly_analysis_display.columns = ['Orders', 'Revenue (₹)', 'Avg Order (₹)', 'Units Sold', 'Expenses (₹)', 'Platform Fees (₹)', 'Profit']
+
+    st.dataframe(monthly_analysis_display, use_container_width=True)
+
+# --- 5. MONTHLY ORDERS AND REVENUE CHART ---
+def render_orders_revenue_chart(df, data_hash):
+    """Dual-axis monthly orders and revenue chart."""
+    st.header("5. Monthly Orders & Revenue Trend")
+
+    monthly_analysis, month_labels_idx = monthly_summary(data_hash, df)
+
+    # Create Interactive Dual-Axis Chart with Plotly
+    fig = go.Figure()
+
+    # Line Chart for Order Count (Primary Y)
+    fig.add_trace(
+        go.Scatter(
+            x=month_labels_idx,
+            y=monthly_analysis['Orders'],
+            name="Orders",
+            line=dict(color='navy', width=3),
+            marker=dict(size=8),
+            mode='lines+markers+text',
+            text=[str(int(v)) for v in monthly_analysis['Orders']],
+            textposition="top center",
+            yaxis='y1'
+        )
+    )
+
+    # Line Chart for Revenue (Secondary Y)
+    fig.add_trace(
+        go.Scatter(
+            x=month_labels_idx,
+            y=monthly_analysis['Revenue'],
+            name="Revenue",
+            line=dict(color='darkorange', width=3),
+            marker=dict(size=8),
+            mode='lines+markers+text',
+            text=[f'₹{v:,.0f}' for v in monthly_analysis['Revenue']],
+            textposition="bottom center",
+            yaxis='y2'
+        )
+    )
+
+    # Layout Configuration
+    fig.update_layout(
+        template="plotly_white",
+        title=dict(
+            text='Monthly Orders & Revenue Trend', 
+            font=dict(size=20, color='#0e3b5e')
+        ),
+        xaxis=dict(
+            title=dict(text=''), 
+            showgrid=False
+        ),
+        yaxis=dict(
+            title=dict(text='Order Count', font=dict(color='navy')),
+            tickfont=dict(color='navy'),
+            showgrid=True,
+            gridcolor='rgba(0,0,0,0.05)'
+        ),
+        yaxis2=dict(
+            title=dict(text='Revenue (₹)', font=dict(color='darkorange')),
+            tickfont=dict(color='darkorange'),
+            overlaying='y',
+            side='right',
+            showgrid=False
+        ),
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        ),
+        hovermode="x unified",
+        height=500
+    )
+
+    st.plotly_chart(fig, use_container_width=True)
+
+# --- 6. MONTHLY PROFIT CHART ---
+def render_profit_chart(df, data_hash):
+    """Monthly profit and expenses chart."""
+    st.header("6. Monthly Profit Trend")
+
+    monthly_analysis, month_labels_idx = monthly_summary(data_hash, df)
+
+    fig_profit = go.Figure()
+
+    # Line Chart for Profit
+    fig_profit.add_trace(
+        go.Scatter(
+            x=month_labels_idx,
+            y=monthly_analysis['Profit'],
+            name="Monthly Profit",
+            line=dict(color='green', width=4),
+            marker=dict(size=10, symbol='diamond'),
+            mode='lines+markers+text',
+            text=[f'₹{v:,.0f}' for v in monthly_analysis['Profit']],
+            textposition="top center"
+        )
+    )
+
+    # Line Chart for Expenses
+    fig_profit.add_trace(
+        go.Scatter(
+            x=month_labels_idx,
+            y=monthly_analysis['Expenses'],
+            name="Expenses",
+            line=dict(color='crimson', width=4),
+            marker=dict(size=10, symbol='circle'),
+            mode='lines+markers+text',
+            text=[f'₹{v:,.0f}' for v in monthly_analysis['Expenses']],
+            textposition="bottom center"
+        )
+    )
+
+    fig_profit.update_layout(
+        template="plotly_white",
+        title=dict(text='Monthly Profit & Expenses Trend', font=dict(size=20, color='#0e3b5e')),
+        xaxis=dict(title=dict(text='Month')),
+        yaxis=dict(
+            title=dict(text='Amount (₹)', font=dict(color='#0e3b5e')),
+            tickfont=dict(color='#0e3b5e'),
+            showgrid=True
+        ),
+        hovermode="x unified",
+        height=500
+    )
+
+    st.plotly_chart(fig_profit, use_container_width=True)
+
+# --- 7. MONTHLY REVENUE BREAKDOWN ---
+def render_revenue_breakdown(df, data_hash):
+    """Stacked monthly expenses / platform fees / profit chart."""
+    st.header("7. Monthly Revenue Breakdown")
+
+    monthly_analysis, month_labels_idx = monthly_summary(data_hash, df)
+
+    fig_breakdown = go.Figure()
+
+    # 1. Expenses (Bottom)
+    fig_breakdown.add_trace(go.Bar(
+        x=month_labels_idx,
+        y=monthly_analysis['Expenses'],
+        name='Expenses (Product + Packing)',
+        marker_color='#ef4444' # Red
+    ))
+
+    # 2. Platform Fees (Middle)
+    fig_breakdown.add_trace(go.Bar(
+        x=month_labels_idx,
+        y=monthly_analysis['Platform_Fees'],
+        name='Platform Fees (Shipping + Tax + Referral)',
+        marker_color='#f59e0b' # Orange
+    ))
+
+    # 3. Profit (Top)
+    fig_breakdown.add_trace(go.Bar(
+        x=month_labels_idx,
+        y=monthly_analysis['Profit'],
+        name='Net Profit',
+        marker_color='#22c55e' # Green
+    ))
+
+    fig_breakdown.update_layout(
+        barmode='stack',
+        template="plotly_white",
+        title=dict(text='Revenue Breakdown: Where does the money go?', font=dict(size=20, color='#0e3b5e')),
+        xaxis=dict(title=dict(text='Month')),
+        yaxis=dict(
+            title=dict(text='Total Revenue (₹)', font=dict(color='#0e3b5e')),
+            showgrid=True
+        ),
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        ),
+        height=500,
+        hovermode="x unified"
+    )
+
+    st.plotly_chart(fig_breakdown, use_container_width=True)
+
+# --- 8. PROFIT DISTRIBUTION ANALYSIS ---
+def render_profit_distribution(df, data_hash):
+    """Profit distribution plots and statistics, optionally without outliers."""
+    st.header("8. Profit Distribution Analysis")
+
+    # Layout for controls
+    c1, c2 = st.columns([2, 1])
+    with c1:
+        # Visualization Selector
+        viz_type = st.selectbox(
+            "Select Visualization Type",
+            ["Box Plot (Mean & Variance)", "Histogram (Frequency Distribution)", "Violin Plot (Density)", "Cumulative (ECDF)"],
+            index=0
+        )
+    with c2:
+        # Outlier Toggle
+        st.write("") # Spacer
+        st.write("") # Spacer
+        exclude_outliers = st.checkbox("Exclude Outliers (IQR Method)")
+
+    # Data Processing based on Outlier Selection
+    profit_data = df['Profit']
+    plot_df = df.copy()
+
+    if exclude_outliers:
+        Q1 = profit_data.quantile(0.25)
+        Q3 = profit_data.quantile(0.75)
+        IQR = Q3 - Q1
+        lower_bound = Q1 - 1.5 * IQR
+        upper_bound = Q3 + 1.5 * IQR
+
+        # Filter data
+        original_count = len(profit_data)
+        profit_data = profit_data[(profit_data >= lower_bound) & (profit_data <= upper_bound)]
+        plot_df = plot_df[(plot_df['Profit'] >= lower_bound) & (plot_df['Profit'] <= upper_bound)]
+        filtered_count = len(profit_data)
+
+        st.caption(f"Showing {filtered_count} typical orders (Excluded {original_count - filtered_count} outliers).")
+
+    if "Box Plot" in viz_type:
+        st.markdown("""
+        **Understanding Mean & Variance:**
+        - **Mean (Red Line)**: The average profit per order.
+        - **Variance (The Box & Whiskers)**: Shows how spread out your profits are.
+            - The **Box** holds the middle 50% of orders.
+            - The **Whiskers** show the range of typical orders.
+        - A wider box/whisker means **higher variance** (less predictable profits).
+        """)
+    elif "Histogram" in viz_type:
+        st.markdown("""
+        **How to read this Histogram:**
+        - **Bars**: Show how many orders fall into each profit range.
+        - **Peak**: The most common profit value range.
+        - **Spread**: How wide the data is distributed around the peak.
+        """)
+    elif "Violin" in viz_type:
+        st.markdown("""
+        **How to read this Violin Plot:**
+        - **Width**: The wider the shape, the more orders have that profit value.
+        - **Shape**: Shows the probability density of the data.
+        - **Internal Box**: Similar to a box plot, shows the median and quartiles.
+        """)
+    elif "Cumulative" in viz_type:
+         st.markdown("""
+        **How to read this cumulative chart:**
+        - **Y-Axis**: Represents the percentage of orders (0 to 1).
+        - **X-Axis**: Profit value.
+        - **Usage**: Pick a profit value on X, look up to the line, then left to Y to see what % of orders are below that profit.
+        """)
+
+    # Calculate metrics on likely filtered data
+    mean_profit = profit_data.mean()
+    median_profit = profit_data.median()
+    mode_profit = profit_data.mode()[0] if not profit_data.mode().empty else 0
+
+    std_profit = profit_data.std()
+
+    q1 = profit_data.quantile(0.25)
+    q3 = profit_data.quantile(0.75)
+    iqr_profit = q3 - q1
+
+    # Key Statistical Metrics
+    st.markdown("##### Key Statistical Metrics")
+
+    # Row 1: Central Tendency
+    m_col1, m_col2, m_col3 = st.columns(3)
+    with m_col1:
+        st.metric("Mean Profit", f"₹{mean_profit:,.2f}", help="Average profit per order")
+    with m_col2:
+        st.metric("Median Profit", f"₹{median_profit:,.2f}", help="Middle value of profit (50th percentile)")
+    with m_col3:
+        st.metric("Mode Profit", f"₹{mode_profit:,.2f}", help="Most frequent profit value")
+
+    st.divider()
+
+    # Row 2: Dispersion & Spread
+    d_col1, d_col2 = st.columns(2)
+    with d_col1:
+        st.metric("Std Deviation", f"₹{std_profit:,.2f}", help="Amount of variation of range of values")
+    with d_col2:
+        st.metric("Interquartile Range (IQR)", f"₹{iqr_profit:,.2f}", help="Range between 25th and 75th percentile (middle 50%)")
+
+    # Dynamic Plotting Logic using plot_df
+    if "Box Plot" in viz_type:
+        fig_dist = px.box(
+            plot_df, 
+            x="Profit", # Changed to x-axis
+            title="Profit Value Distribution (Box Plot)" + (" (Outliers Excluded)" if exclude_outliers else ""),
+            labels={'Profit': 'Profit (₹)'},
+            color_discrete_sequence=['#0e3b5e'],
+            hover_data=plot_df.columns
+        )
+        fig_dist.add_vline(x=mean_profit, line_width=2, line_dash="dash", line_color="#ef4444", 
+                        annotation_text=f"Mean: ₹{mean_profit:.0f}", annotation_position="top right")
+        fig_dist.update_layout(xaxis_title="Profit (₹)", yaxis_title="")
+
+    elif "Histogram" in viz_type:
+        fig_dist = px.histogram(
+            plot_df, 
+            x="Profit",
+            nbins=50,
+            title="Profit Frequency Distribution" + (" (Outliers Excluded)" if exclude_outliers else ""),
+            labels={'Profit': 'Profit (₹)'},
+            color_discrete_sequence=['#0e3b5e'],
+            opacity=0.7
+        )
+        fig_dist.add_vline(x=mean_profit, line_width=2, line_dash="solid", line_color="#ef4444", 
+                        annotation_text=f"Mean: ₹{mean_profit:.0f}", annotation_position="top right")
+        fig_dist.update_layout(xaxis_title="Profit (₹)", yaxis_title="Count")
+
+    elif "Violin" in viz_type:
+        fig_dist = px.violin(
+            plot_df, 
+            y="Profit",
+            box=True, # Show internal box plot
+            points=False, # Simplify view
+            title="Profit Density Distribution" + (" (Outliers Excluded)" if exclude_outliers else ""),
+            labels={'Profit': 'Profit (₹)'},
+            color_discrete_sequence=['#0e3b5e']
+        )
+        fig_dist.add_hline(y=mean_profit, line_width=2, line_dash="dash", line_color="#ef4444", 
+                        annotation_text=f"Mean: ₹{mean_profit:.0f}", annotation_position="top left")
+        fig_dist.update_layout(yaxis_title="Profit (₹)", xaxis_title="")
+
+    elif "Cumulative" in viz_type:
+        fig_dist = px.ecdf(
+            plot_df, 
+            x="Profit",
+            title="Cumulative Probability of Profit" + (" (Outliers Excluded)" if exclude_outliers else ""),
+            labels={'Profit': 'Profit (₹)'},
+            color_discrete_sequence=['#0e3b5e']
+        )
+        fig_dist.add_vline(x=mean_profit, line_width=2, line_dash="solid", line_color="#ef4444", 
+                        annotation_text=f"Mean: ₹{mean_profit:.0f}", annotation_position="top left")
+        fig_dist.update_layout(xaxis_title="Profit (₹)", yaxis_title="Probability")
+
+    # Common Layout Updates
+    fig_dist.update_layout(
+        template="plotly_white",
+        height=550,
+        margin=dict(t=50, b=50, l=50, r=50)
+    )
+
+    st.plotly_chart(fig_dist, use_container_width=True)
+
+# --- 9. PRODUCT PERFORMANCE SUMMARY ---
+def render_product_performance(df, data_hash):
+    """Per-product sales table and the cost master data."""
+    st.header("9. Product Sales & Profit Performance")
+
+    product_performance = product_summary(data_hash, df)
+
+    # Renaming columns for display
+    product_performance.columns = [
+        'Product Name', 
+        'Total Orders', 
+        'Units Sold', 
+        'Revenue (₹)', 
+        'Expenses (₹)', 
+        'Fees (Ship+Tax+Ref) (₹)', 
+        'Profit (₹)'
+    ]
+
+    # Format currency columns for display
+    display_df = product_performance.copy()
+    for col in ['Revenue (₹)', 'Expenses (₹)', 'Fees (Ship+Tax+Ref) (₹)', 'Profit (₹)']:
+        display_df[col] = display_df[col].map('₹{:,.2f}'.format)
+
+    st.dataframe(display_df, use_container_width=True, hide_index=True)
+
+    # --- 8. MASTER DATA REFERENCE ---
+    st.divider()
+    with st.expander("📊 9. Product Cost & Reference Master Data", expanded=False):
+        st.markdown("""
+        This table shows the unit costs, referral fees, and selling prices used to calculate 
+        the profit margins for each product identified in your invoices.
+        """)
+        # Format currency for display
+        master_display = df_data_internal.copy()
+        currency_cols = ["Purchase cost", "Referral fee", "Packing cost", "Total Cost", "SP before GST", "Profit", "GST", "Final SP"]
+        for col in currency_cols:
+            if col in master_display.columns:
+                master_display[col] = master_display[col].map('₹{:,.2f}'.format)
+
+        st.dataframe(master_display, use_container_width=True, hide_index=True)
+
+# --- 10. PAYMENT METHOD PREFERENCES ---
+def render_payment_methods(df, data_hash):
+    """Payment method counts and chart."""
+    st.header("10. Payment Method Preferences")
+
+    # Data Processing
+    if 'Mode of Payment' in df.columns:
+        payment_stats = payment_summary(data_hash, df)
+
+        # Most Frequent Method for Metric
+        most_frequent = payment_stats.iloc[0]['Payment Method'] if not payment_stats.empty else "N/A"
+
+        col_m1, col_m2 = st.columns([1, 2])
+        with col_m1:
+            st.metric("Top Payment Method", most_frequent)
+            st.write("") # Spacer
+            st.dataframe(payment_stats, use_container_width=True, hide_index=True)
+
+        with col_m2:
+            fig_payment = px.bar(
+                payment_stats,
+                x='Number of Sales',
+                y='Payment Method',
+                orientation='h',
+                color='Number of Sales',
+                color_continuous_scale='Oranges', # Using Orange to match the theme accent
+                text_auto=True,
+                title="Customer Payment Preference Distribution"
+            )
+            fig_payment.update_layout(
+                showlegend=False, 
+                height=400, 
+                template="plotly_white",
+                yaxis={'categoryorder':'total ascending'}
+            )
+            st.plotly_chart(fig_payment, use_container_width=True)
+    else:
+        st.warning("Column 'Mode of Payment' not found in the uploaded data.")
+
+# Dashboard sections, in sidebar order. Only the selected section is rendered,
+# so its aggregates and figures are built only when it is opened.
+DASHBOARD_SECTIONS = {
+    "1. Basic Data Overview": render_overview,
+    "2. Data Quality Check": render_data_quality,
+    "3. Geographical Analysis": render_geography,
+    "4. Monthly sales trend and growth pattern": render_monthly_trend,
+    "5. Monthly Orders & Revenue Trend": render_orders_revenue_chart,
+    "6. Monthly Profit Trend": render_profit_chart,
+    "7. Monthly Revenue Breakdown": render_revenue_breakdown,
+    "8. Profit Distribution Analysis": render_profit_distribution,
+    "9. Product Sales & Profit Performance": render_product_performance,
+    "10. Payment Method Preferences": render_payment_methods,
+}
+
 def main():
+    # Read and validate the map geometry once, at startup
+    try:
+        load_india_geojson()
+    except FileNotFoundError as e:
+        print(f"✗ {e}")
+
     st.write("Upload your `all_invoices.csv` file below to view the analytics.")
 
     uploaded_file = st.file_uploader("Choose a CSV file", type=['csv'])
@@ -345,657 +1000,25 @@ def main():
         
     # Determine which file to process
     df = None
+    data_hash = None
     if uploaded_file is not None:
         st.session_state.load_sample = False # Reset sample state if user uploads a file
+        data_hash = rollup_key(content_hash(uploaded_file), catalogue_hash)
         with st.spinner('Processing uploaded data...'):
-            df = load_and_process_data(uploaded_file)
+            df = load_processed_data(data_hash, uploaded_file)
     elif st.session_state.load_sample:
         try:
+            data_hash = rollup_key(content_hash("all_invoices.csv"), catalogue_hash)
             with st.spinner('Loading sample data...'):
-                df = load_and_process_data("all_invoices.csv")
+                df = load_processed_data(data_hash, "all_invoices.csv")
             st.info("Using sample data: `all_invoices.csv`")
         except FileNotFoundError:
             st.error("Sample file `all_invoices.csv` not found in directory.")
 
     if df is not None:
-            # --- 1. BASIC DATA OVERVIEW ---
-            st.divider()
-            st.header("1. Basic Data Overview")
-            
-            # Key Metrics
-            col1, col2, col3, col4 = st.columns(4)
-            with col1:
-                st.metric("Total Records", f"{len(df):,}")
-            with col2:
-                total_revenue = df['Invoice Value'].sum()
-                st.metric("Total Revenue", f"₹{total_revenue:,.2f}")
-            with col3:
-                total_profit = df['Profit'].sum()
-                st.metric("Total Profit", f"₹{total_profit:,.2f}")
-            with col4:
-                st.metric("Total Columns", len(df.columns))
-
-            # Calculation Methodology Reference
-            with st.expander("ℹ️ Understanding the Business Metrics (Calculation Logic)", expanded=True):
-                st.markdown("""
-                | Category | What it represents | Items Included |
-                | :--- | :--- | :--- |
-                | **🛍️ Expenses** | Your direct sourcing/out-of-pocket spending | Purchase Cost + Packing Cost |
-                | **📦 Platform Fees** | Total deductions by Amazon / Govt | Shipping Cost + Tax (GST) + Referral Fee |
-                | **💵 Net Profit** | Your actual monthly earnings | Revenue - Expenses - Platform Fees |
-                """)
-                st.info("💡 **Note:** Net Profit is calculated on the pre-tax selling price to accurately isolate tax into the Platform Fees bucket.")
-
-            # Raw Data Expander
-            with st.expander("View Raw Data Frame"):
-                st.dataframe(df)
-                
-            # Column Types
-            with st.expander("View Column Info"):
-                dtype_df = df.dtypes.astype(str).reset_index()
-                dtype_df.columns = ["Column", "Type"]
-                st.table(dtype_df)
-
-            # --- 2. DATA QUALITY ---
-            st.divider()
-            st.header("2. Data Quality Check")
-            
-            missing = df.isnull().sum()
-            missing = missing[missing > 0]
-            if not missing.empty:
-                st.warning("Found missing values in the following columns:")
-                col_miss1, col_miss2 = st.columns([1, 2])
-                with col_miss1:
-                    missing_df = pd.DataFrame({'Missing Count': missing, 'Percentage': (missing / len(df) * 100).round(2)})
-                    st.dataframe(missing_df)
-            else:
-                st.success("No missing values found!")
-
-            # --- 3. GEOGRAPHICAL ANALYSIS ---
-            st.divider()
-            st.header("3. Geographical Analysis")
-            
-            # All India States and UTs for complete map display
-            all_india_states = [
-                'Andhra Pradesh', 'Arunachal Pradesh', 'Assam', 'Bihar', 'Chhattisgarh',
-                'Goa', 'Gujarat', 'Haryana', 'Himachal Pradesh', 'Jharkhand',
-                'Karnataka', 'Kerala', 'Madhya Pradesh', 'Maharashtra', 'Manipur',
-                'Meghalaya', 'Mizoram', 'Nagaland', 'Odisha', 'Punjab', 'Rajasthan',
-                'Sikkim', 'Tamil Nadu', 'Telangana', 'Tripura', 'Uttar Pradesh',
-                'Uttarakhand', 'West Bengal', 'Andaman and Nicobar Islands',
-                'Chandigarh', 'Dadra and Nagar Haveli and Daman and Diu',
-                'Delhi', 'Jammu and Kashmir', 'Ladakh', 'Lakshadweep', 'Puducherry'
-            ]
-            
-            state_analysis = df.groupby('State').agg(
-                Orders=('Invoice Value', 'count'),
-                Revenue=('Invoice Value', 'sum'),
-                Items_Sold=('Qty', 'sum'),
-                Profit=('Profit', 'sum')
-            )
-            
-            # Reindex to include all states and fill with 0
-            state_analysis = state_analysis.reindex(all_india_states).fillna(0)
-            
-            # Calculate Avg Order
-            state_analysis['Avg Order (₹)'] = (state_analysis['Revenue'] / state_analysis['Orders']).fillna(0).round(2)
-            
-            # Reorder and Rename columns for display
-            state_analysis = state_analysis[['Orders', 'Revenue', 'Avg Order (₹)', 'Items_Sold', 'Profit']]
-            state_analysis.columns = ['Orders', 'Revenue (₹)', 'Avg Order (₹)', 'Items Sold', 'Profit']
-            
-            state_analysis = state_analysis.sort_values('Revenue (₹)', ascending=False)
-
-            col_geo1, col_geo2 = st.columns([1, 1])
-            with col_geo1:
-                st.subheader("State-wise Table")
-                st.dataframe(state_analysis, height=400)
-            
-            with col_geo2:
-                st.subheader("Revenue by State")
-                
-                # Chart Type Selection
-                chart_type = st.radio(
-                    "Select Chart Type:",
-                    ["Map (Interactive)", "Bar Chart", "Pie Chart"],
-                    horizontal=True,
-                    label_visibility="collapsed"
-                )
-                
-                # Check if there are too many states for Pie/Treemap
-                plot_data_df = state_analysis.reset_index()
-                
-                if "Map" in chart_type:
-                    # Choropleth Map of India
-                    geojson_url = "https://gist.githubusercontent.com/jbrobst/56c13bbbf9d97d187fea01ca62ea5112/raw/e388c4cae20aa53cb5090210a42ebb9b765c0a36/india_states.geojson"
-                    
-                    fig = px.choropleth(
-                        plot_data_df,
-                        geojson=geojson_url,
-                        featureidkey='properties.ST_NM',
-                        locations='State',
-                        color='Orders',
-                        hover_name='State',
-                        hover_data={'Orders': True, 'Revenue (₹)': ':₹,.2f', 'Profit': ':₹,.2f'},
-                        color_continuous_scale=px.colors.sequential.Blues,
-                        range_color=[0, plot_data_df['Orders'].max()],
-                        labels={'Orders': 'Orders'}
-                    )
-                    
-                    fig.update_geos(
-                        visible=False, 
-                        resolution=50,
-                        showcountries=True, 
-                        countrycolor="RebeccaPurple",
-                        fitbounds="locations"
-                    )
-                    
-                    fig.update_layout(
-                        margin={"r":0,"t":0,"l":0,"b":0},
-                        height=500,
-                        coloraxis_colorbar=dict(
-                            title="Orders",
-                            thicknessmode="pixels", thickness=15,
-                            lenmode="pixels", len=200,
-                            yanchor="top", y=1,
-                            ticks="outside"
-                        )
-                    )
-                    st.plotly_chart(fig, use_container_width=True)
-
-                elif "Bar" in chart_type:
-                    # Horizontal Bar Chart - Filter out states with no orders
-                    bar_plot_df = plot_data_df[plot_data_df['Orders'] > 0].sort_values('Revenue (₹)', ascending=True)
-                    
-                    fig = px.bar(
-                        bar_plot_df, 
-                        x='Revenue (₹)', 
-                        y='State',
-                        orientation='h',
-                        text_auto='.2s',
-                        color='Revenue (₹)',
-                        color_continuous_scale='Blues'
-                    )
-                    fig.update_layout(showlegend=False, height=400)
-                    st.plotly_chart(fig, use_container_width=True)
-                    
-                elif "Pie" in chart_type:
-                    # Filter out states with no orders for Pie Chart
-                    pie_plot_df = plot_data_df[plot_data_df['Orders'] > 0]
-                    
-                    # Logic to group smaller segments for Pie Chart
-                    if len(pie_plot_df) > 10:
-                        top_9 = pie_plot_df.nlargest(9, 'Revenue (₹)')
-                        others_val = pie_plot_df.nsmallest(len(pie_plot_df) - 9, 'Revenue (₹)')['Revenue (₹)'].sum()
-                        others_row = pd.DataFrame({'State': ['OTHERS'], 'Orders': [0], 'Revenue (₹)': [others_val]})
-                        pie_plot_df = pd.concat([top_9, others_row])
-                    
-                    fig = px.pie(
-                        pie_plot_df, 
-                        values='Revenue (₹)', 
-                        names='State',
-                        hole=0.4,
-                        color_discrete_sequence=px.colors.sequential.RdBu
-                    )
-                    st.plotly_chart(fig, use_container_width=True)
-
-            # --- 4. TEMPORAL ANALYSIS ---
-            st.divider()
-            st.header("4. Monthly sales trend and growth pattern")
-
-            monthly_analysis = df.groupby(['Year', 'Month']).agg(
-                Orders=('Invoice Value', 'count'),
-                Revenue=('Invoice Value', 'sum'),
-                Units_Sold=('Qty', 'sum'),
-                Profit=('Profit', 'sum'),
-                Expenses=('Expenses', 'sum'),
-                Platform_Fees=('Platform Fees', 'sum')
-            ).round(2)
-            
-            # Calculate Avg Order
-            monthly_analysis['Avg Order (₹)'] = (monthly_analysis['Revenue'] / monthly_analysis['Orders']).fillna(0).round(2)
-            
-            # Create labels for display
-            month_labels_idx = []
-            for idx in monthly_analysis.index:
-                year, month = idx
-                month_names = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 
-                               'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
-                month_labels_idx.append(f"{month_names[month-1]} {year}")
-            
-            # Prepare display dataframe
-            monthly_analysis_display = monthly_analysis[['Orders', 'Revenue', 'Avg Order (₹)', 'Units_Sold', 'Expenses', 'Platform_Fees', 'Profit']].copy()
-            monthly_analysis_display.index = month_labels_idx
-            monthly_analysis_display.columns = ['Orders', 'Revenue (₹)', 'Avg Order (₹)', 'Units Sold', 'Expenses (₹)', 'Platform Fees (₹)', 'Profit']
-            
-            st.dataframe(monthly_analysis_display, use_container_width=True)
+        section = st.sidebar.radio("Dashboard Section", list(DASHBOARD_SECTIONS))
+        st.divider()
+        DASHBOARD_SECTIONS[section](df, data_hash)
 
-            # --- 5. MONTHLY ORDERS AND REVENUE CHART ---
-            st.divider()
-            st.header("5. Monthly Orders & Revenue Trend")
-            
-            # Create Interactive Dual-Axis Chart with Plotly
-            fig = go.Figure()
-
-            # Line Chart for Order Count (Primary Y)
-            fig.add_trace(
-                go.Scatter(
-                    x=month_labels_idx,
-                    y=monthly_analysis['Orders'],
-                    name="Orders",
-                    line=dict(color='navy', width=3),
-                    marker=dict(size=8),
-                    mode='lines+markers+text',
-                    text=[str(int(v)) for v in monthly_analysis['Orders']],
-                    textposition="top center",
-                    yaxis='y1'
-                )
-            )
-
-            # Line Chart for Revenue (Secondary Y)
-            fig.add_trace(
-                go.Scatter(
-                    x=month_labels_idx,
-                    y=monthly_analysis['Revenue'],
-                    name="Revenue",
-                    line=dict(color='darkorange', width=3),
-                    marker=dict(size=8),
-                    mode='lines+markers+text',
-                    text=[f'₹{v:,.0f}' for v in monthly_analysis['Revenue']],
-                    textposition="bottom center",
-                    yaxis='y2'
-                )
-            )
-
-            # Layout Configuration
-            fig.update_layout(
-                template="plotly_white",
-                title=dict(
-                    text='Monthly Orders & Revenue Trend', 
-                    font=dict(size=20, color='#0e3b5e')
-                ),
-                xaxis=dict(
-                    title=dict(text=''), 
-                    showgrid=False
-                ),
-                yaxis=dict(
-                    title=dict(text='Order Count', font=dict(color='navy')),
-                    tickfont=dict(color='navy'),
-                    showgrid=True,
-                    gridcolor='rgba(0,0,0,0.05)'
-                ),
-                yaxis2=dict(
-                    title=dict(text='Revenue (₹)', font=dict(color='darkorange')),
-                    tickfont=dict(color='darkorange'),
-                    overlaying='y',
-                    side='right',
-                    showgrid=False
-                ),
-                legend=dict(
-                    orientation="h",
-                    yanchor="bottom",
-                    y=1.02,
-                    xanchor="right",
-                    x=1
-                ),
-                hovermode="x unified",
-                height=500
-            )
-
-            st.plotly_chart(fig, use_container_width=True)
-
-            # --- 6. MONTHLY PROFIT CHART ---
-            st.divider()
-            st.header("6. Monthly Profit Trend")
-            
-            fig_profit = go.Figure()
-
-            # Line Chart for Profit
-            fig_profit.add_trace(
-                go.Scatter(
-                    x=month_labels_idx,
-                    y=monthly_analysis['Profit'],
-                    name="Monthly Profit",
-                    line=dict(color='green', width=4),
-                    marker=dict(size=10, symbol='diamond'),
-                    mode='lines+markers+text',
-                    text=[f'₹{v:,.0f}' for v in monthly_analysis['Profit']],
-                    textposition="top center"
-                )
-            )
-
-            # Line Chart for Expenses
-            fig_profit.add_trace(
-                go.Scatter(
-                    x=month_labels_idx,
-                    y=monthly_analysis['Expenses'],
-                    name="Expenses",
-                    line=dict(color='crimson', width=4),
-                    marker=dict(size=10, symbol='circle'),
-                    mode='lines+markers+text',
-                    text=[f'₹{v:,.0f}' for v in monthly_analysis['Expenses']],
-                    textposition="bottom center"
-                )
-            )
-
-            fig_profit.update_layout(
-                template="plotly_white",
-                title=dict(text='Monthly Profit & Expenses Trend', font=dict(size=20, color='#0e3b5e')),
-                xaxis=dict(title=dict(text='Month')),
-                yaxis=dict(
-                    title=dict(text='Amount (₹)', font=dict(color='#0e3b5e')),
-                    tickfont=dict(color='#0e3b5e'),
-                    showgrid=True
-                ),
-                hovermode="x unified",
-                height=500
-            )
-
-            st.plotly_chart(fig_profit, use_container_width=True)
-
-            # --- 7. MONTHLY REVENUE BREAKDOWN ---
-            st.divider()
-            st.header("7. Monthly Revenue Breakdown")
-
-            fig_breakdown = go.Figure()
-
-            # 1. Expenses (Bottom)
-            fig_breakdown.add_trace(go.Bar(
-                x=month_labels_idx,
-                y=monthly_analysis['Expenses'],
-                name='Expenses (Product + Packing)',
-                marker_color='#ef4444' # Red
-            ))
-
-            # 2. Platform Fees (Middle)
-            fig_breakdown.add_trace(go.Bar(
-                x=month_labels_idx,
-                y=monthly_analysis['Platform_Fees'],
-                name='Platform Fees (Shipping + Tax + Referral)',
-                marker_color='#f59e0b' # Orange
-            ))
-
-            # 3. Profit (Top)
-            fig_breakdown.add_trace(go.Bar(
-                x=month_labels_idx,
-                y=monthly_analysis['Profit'],
-                name='Net Profit',
-                marker_color='#22c55e' # Green
-            ))
-
-            fig_breakdown.update_layout(
-                barmode='stack',
-                template="plotly_white",
-                title=dict(text='Revenue Breakdown: Where does the money go?', font=dict(size=20, color='#0e3b5e')),
-                xaxis=dict(title=dict(text='Month')),
-                yaxis=dict(
-                    title=dict(text='Total Revenue (₹)', font=dict(color='#0e3b5e')),
-                    showgrid=True
-                ),
-                legend=dict(
-                    orientation="h",
-                    yanchor="bottom",
-                    y=1.02,
-                    xanchor="right",
-                    x=1
-                ),
-                height=500,
-                hovermode="x unified"
-            )
-            
-            st.plotly_chart(fig_breakdown, use_container_width=True)
-
-            # --- 8. PROFIT DISTRIBUTION ANALYSIS ---
-            st.divider()
-            st.header("8. Profit Distribution Analysis")
-            
-            # Layout for controls
-            c1, c2 = st.columns([2, 1])
-            with c1:
-                # Visualization Selector
-                viz_type = st.selectbox(
-                    "Select Visualization Type",
-                    ["Box Plot (Mean & Variance)", "Histogram (Frequency Distribution)", "Violin Plot (Density)", "Cumulative (ECDF)"],
-                    index=0
-                )
-            with c2:
-                # Outlier Toggle
-                st.write("") # Spacer
-                st.write("") # Spacer
-                exclude_outliers = st.checkbox("Exclude Outliers (IQR Method)")
-
-            # Data Processing based on Outlier Selection
-            profit_data = df['Profit']
-            plot_df = df.copy()
-
-            if exclude_outliers:
-                Q1 = profit_data.quantile(0.25)
-                Q3 = profit_data.quantile(0.75)
-                IQR = Q3 - Q1
-                lower_bound = Q1 - 1.5 * IQR
-                upper_bound = Q3 + 1.5 * IQR
-                
-                # Filter data
-                original_count = len(profit_data)
-                profit_data = profit_data[(profit_data >= lower_bound) & (profit_data <= upper_bound)]
-                plot_df = plot_df[(plot_df['Profit'] >= lower_bound) & (plot_df['Profit'] <= upper_bound)]
-                filtered_count = len(profit_data)
-                
-                st.caption(f"Showing {filtered_count} typical orders (Excluded {original_count - filtered_count} outliers).")
-
-            if "Box Plot" in viz_type:
-                st.markdown("""
-                **Understanding Mean & Variance:**
-                - **Mean (Red Line)**: The average profit per order.
-                - **Variance (The Box & Whiskers)**: Shows how spread out your profits are.
-                    - The **Box** holds the middle 50% of orders.
-                    - The **Whiskers** show the range of typical orders.
-                - A wider box/whisker means **higher variance** (less predictable profits).
-                """)
-            elif "Histogram" in viz_type:
-                st.markdown("""
-                **How to read this Histogram:**
-                - **Bars**: Show how many orders fall into each profit range.
-                - **Peak**: The most common profit value range.
-                - **Spread**: How wide the data is distributed around the peak.
-                """)
-            elif "Violin" in viz_type:
-                st.markdown("""
-                **How to read this Violin Plot:**
-                - **Width**: The wider the shape, the more orders have that profit value.
-                - **Shape**: Shows the probability density of the data.
-                - **Internal Box**: Similar to a box plot, shows the median and quartiles.
-                """)
-            elif "Cumulative" in viz_type:
-                 st.markdown("""
-                **How to read this cumulative chart:**
-                - **Y-Axis**: Represents the percentage of orders (0 to 1).
-                - **X-Axis**: Profit value.
-                - **Usage**: Pick a profit value on X, look up to the line, then left to Y to see what % of orders are below that profit.
-                """)
-
-            # Calculate metrics on likely filtered data
-            mean_profit = profit_data.mean()
-            median_profit = profit_data.median()
-            mode_profit = profit_data.mode()[0] if not profit_data.mode().empty else 0
-            
-            std_profit = profit_data.std()
-            
-            q1 = profit_data.quantile(0.25)
-            q3 = profit_data.quantile(0.75)
-            iqr_profit = q3 - q1
-            
-            # Key Statistical Metrics
-            st.markdown("##### Key Statistical Metrics")
-            
-            # Row 1: Central Tendency
-            m_col1, m_col2, m_col3 = st.columns(3)
-            with m_col1:
-                st.metric("Mean Profit", f"₹{mean_profit:,.2f}", help="Average profit per order")
-            with m_col2:
-                st.metric("Median Profit", f"₹{median_profit:,.2f}", help="Middle value of profit (50th percentile)")
-            with m_col3:
-                st.metric("Mode Profit", f"₹{mode_profit:,.2f}", help="Most frequent profit value")
-                
-            st.divider()
-            
-            # Row 2: Dispersion & Spread
-            d_col1, d_col2 = st.columns(2)
-            with d_col1:
-                st.metric("Std Deviation", f"₹{std_profit:,.2f}", help="Amount of variation of range of values")
-            with d_col2:
-                st.metric("Interquartile Range (IQR)", f"₹{iqr_profit:,.2f}", help="Range between 25th and 75th percentile (middle 50%)")
-
-            # Dynamic Plotting Logic using plot_df
-            if "Box Plot" in viz_type:
-                fig_dist = px.box(
-                    plot_df, 
-                    x="Profit", # Changed to x-axis
-                    title="Profit Value Distribution (Box Plot)" + (" (Outliers Excluded)" if exclude_outliers else ""),
-                    labels={'Profit': 'Profit (₹)'},
-                    color_discrete_sequence=['#0e3b5e'],
-                    hover_data=plot_df.columns
-                )
-                fig_dist.add_vline(x=mean_profit, line_width=2, line_dash="dash", line_color="#ef4444", 
-                                annotation_text=f"Mean: ₹{mean_profit:.0f}", annotation_position="top right")
-                fig_dist.update_layout(xaxis_title="Profit (₹)", yaxis_title="")
-
-            elif "Histogram" in viz_type:
-                fig_dist = px.histogram(
-                    plot_df, 
-                    x="Profit",
-                    nbins=50,
-                    title="Profit Frequency Distribution" + (" (Outliers Excluded)" if exclude_outliers else ""),
-                    labels={'Profit': 'Profit (₹)'},
-                    color_discrete_sequence=['#0e3b5e'],
-                    opacity=0.7
-                )
-                fig_dist.add_vline(x=mean_profit, line_width=2, line_dash="solid", line_color="#ef4444", 
-                                annotation_text=f"Mean: ₹{mean_profit:.0f}", annotation_position="top right")
-                fig_dist.update_layout(xaxis_title="Profit (₹)", yaxis_title="Count")
-
-            elif "Violin" in viz_type:
-                fig_dist = px.violin(
-                    plot_df, 
-                    y="Profit",
-                    box=True, # Show internal box plot
-                    points=False, # Simplify view
-                    title="Profit Density Distribution" + (" (Outliers Excluded)" if exclude_outliers else ""),
-                    labels={'Profit': 'Profit (₹)'},
-                    color_discrete_sequence=['#0e3b5e']
-                )
-                fig_dist.add_hline(y=mean_profit, line_width=2, line_dash="dash", line_color="#ef4444", 
-                                annotation_text=f"Mean: ₹{mean_profit:.0f}", annotation_position="top left")
-                fig_dist.update_layout(yaxis_title="Profit (₹)", xaxis_title="")
-
-            elif "Cumulative" in viz_type:
-                fig_dist = px.ecdf(
-                    plot_df, 
-                    x="Profit",
-                    title="Cumulative Probability of Profit" + (" (Outliers Excluded)" if exclude_outliers else ""),
-                    labels={'Profit': 'Profit (₹)'},
-                    color_discrete_sequence=['#0e3b5e']
-                )
-                fig_dist.add_vline(x=mean_profit, line_width=2, line_dash="solid", line_color="#ef4444", 
-                                annotation_text=f"Mean: ₹{mean_profit:.0f}", annotation_position="top left")
-                fig_dist.update_layout(xaxis_title="Profit (₹)", yaxis_title="Probability")
-
-            # Common Layout Updates
-            fig_dist.update_layout(
-                template="plotly_white",
-                height=550,
-                margin=dict(t=50, b=50, l=50, r=50)
-            )
-            
-            st.plotly_chart(fig_dist, use_container_width=True)
-
-            # --- 9. PRODUCT PERFORMANCE SUMMARY ---
-            st.divider()
-            st.header("9. Product Sales & Profit Performance")
-            
-            product_performance = df.groupby('Description').agg(
-                Total_Orders=('Invoice Value', 'count'),
-                Units_Sold=('Qty', 'sum'),
-                Revenue=('Invoice Value', 'sum'),
-                Expenses=('Expenses', 'sum'),
-                Platform_Fees=('Platform Fees', 'sum'),
-                Profit=('Profit', 'sum')
-            ).reset_index()
-            
-            # Sort by Units Sold descending
-            product_performance = product_performance.sort_values('Units_Sold', ascending=False)
-            
-            # Renaming columns for display
-            product_performance.columns = [
-                'Product Name', 
-                'Total Orders', 
-                'Units Sold', 
-                'Revenue (₹)', 
-                'Expenses (₹)', 
-                'Fees (Ship+Tax+Ref) (₹)', 
-                'Profit (₹)'
-            ]
-            
-            # Format currency columns for display
-            display_df = product_performance.copy()
-            for col in ['Revenue (₹)', 'Expenses (₹)', 'Fees (Ship+Tax+Ref) (₹)', 'Profit (₹)']:
-                display_df[col] = display_df[col].map('₹{:,.2f}'.format)
-            
-            st.dataframe(display_df, use_container_width=True, hide_index=True)
-
-            # --- 8. MASTER DATA REFERENCE ---
-            st.divider()
-            with st.expander("📊 9. Product Cost & Reference Master Data", expanded=False):
-                st.markdown("""
-                This table shows the unit costs, referral fees, and selling prices used to calculate 
-                the profit margins for each product identified in your invoices.
-                """)
-                # Format currency for display
-                master_display = df_data_internal.copy()
-                currency_cols = ["Purchase cost", "Referral fee", "Packing cost", "Total Cost", "SP before GST", "Profit", "GST", "Final SP"]
-                for col in currency_cols:
-                    if col in master_display.columns:
-                        master_display[col] = master_display[col].map('₹{:,.2f}'.format)
-                
-                st.dataframe(master_display, use_container_width=True, hide_index=True)
-
-            # --- 10. PAYMENT METHOD PREFERENCES ---
-            st.divider()
-            st.header("10. Payment Method Preferences")
-
-            # Data Processing
-            if 'Mode of Payment' in df.columns:
-                payment_stats = df['Mode of Payment'].value_counts().reset_index()
-                payment_stats.columns = ['Payment Method', 'Number of Sales']
-                
-                # Most Frequent Method for Metric
-                most_frequent = payment_stats.iloc[0]['Payment Method'] if not payment_stats.empty else "N/A"
-                
-                col_m1, col_m2 = st.columns([1, 2])
-                with col_m1:
-                    st.metric("Top Payment Method", most_frequent)
-                    st.write("") # Spacer
-                    st.dataframe(payment_stats, use_container_width=True, hide_index=True)
-                
-                with col_m2:
-                    fig_payment = px.bar(
-                        payment_stats,
-                        x='Number of Sales',
-                        y='Payment Method',
-                        orientation='h',
-                        color='Number of Sales',
-                        color_continuous_scale='Oranges', # Using Orange to match the theme accent
-                        text_auto=True,
-                        title="Customer Payment Preference Distribution"
-                    )
-                    fig_payment.update_layout(
-                        showlegend=False, 
-                        height=400, 
-                        template="plotly_white",
-                        yaxis={'categoryorder':'total ascending'}
-                    )
-                    st.plotly_chart(fig_payment, use_container_width=True)
-            else:
-                st.warning("Column 'Mode of Payment' not found in the uploaded data.")
 if __name__ == "__main__":
     main()
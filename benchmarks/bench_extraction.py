@@ -0,0 +1,266 @@
+"""
+Extraction Throughput Benchmark
+Files/sec, per-invoice latency percentiles and peak RSS of extract_invoice.py and
+extract_invoice_batch.py on a synthetic invoice corpus (see generate_invoices.py).
+
+Extractors:
+  extract_invoice        extract_invoice_data() called once per PDF, in a loop
+  extract_invoice_batch  the batch pipeline: iter_invoice_records() over the
+                         PDFs (--workers processes, no extraction cache),
+                         streamed to a CSV with InvoiceCSVWriter
+
+For extract_invoice the latency is the time of each extract_invoice_data()
+call. For extract_invoice_batch with --workers 1 it is the time
+iter_invoice_records() takes to produce each record (the CSV write is not
+included). With more workers the records come out of a pipeline of processes,
+so the gap between two of them says nothing about how long either took; only
+Files/s is reported and the latency columns show '-'.
+
+Every (extractor, corpus size) run happens in a fresh process, so each peak
+RSS is that run's own (ru_maxrss of the run, and of its largest worker
+process). Missing corpus PDFs are generated first.
+
+Usage:
+    python benchmarks/bench_extraction.py                          # 1k, 10k and 100k invoices
+    python benchmarks/bench_extraction.py --counts 1000 --workers 4
+    python benchmarks/bench_extraction.py --extractors extract_invoice --json results.json
+"""
+
+import argparse
+import contextlib
+import csv
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from generate_invoices import (DEFAULT_CORPUS_DIR, GROUND_TRUTH_FILE, find_font, generate_corpus,
+                               invoice_filename, parse_item_mix)
+
+EXTRACTORS = ['extract_invoice', 'extract_invoice_batch']
+DEFAULT_COUNTS = [1000, 10000, 100000]
+
+
+def peak_rss_mb(who):
+    """Peak resident set size in MB of this process (or of its largest waited-for child)."""
+    import resource
+    maxrss = resource.getrusage(who).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return maxrss / (1024 * 1024) if sys.platform == 'darwin' else maxrss / 1024
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = round(p / 100 * (len(sorted_values) - 1))
+    return sorted_values[min(len(sorted_values) - 1, rank)]
+
+
+def corpus_size(corpus_dir):
+    """Number of invoices listed in the corpus ground truth (0 if there is none)."""
+    path = os.path.join(corpus_dir, GROUND_TRUTH_FILE)
+    if not os.path.exists(path):
+        return 0
+    with open(path, newline='', encoding='utf-8') as f:
+        return max(sum(1 for _ in f) - 1, 0)
+
+
+def expected_invoice_numbers(corpus_dir, count):
+    """PDF filename -> Invoice Number, for the first count invoices of the corpus."""
+    expected = {}
+    with open(os.path.join(corpus_dir, GROUND_TRUTH_FILE), newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            if len(expected) >= count:
+                break
+            expected[row['PDF Filename']] = row['Invoice Number']
+    return expected
+
+
+def _time_extract_invoice(pdf_files, workers):
+    """Yield (filename, record, seconds) per PDF for extract_invoice.py."""
+    from extract_invoice import extract_invoice_data
+    for pdf_file in pdf_files:
+        start = time.perf_counter()
+        data = extract_invoice_data(pdf_file, page_number=2)
+        yield os.path.basename(pdf_file), data, time.perf_counter() - start
+
+
+def _time_extract_invoice_batch(pdf_files, workers):
+    """
+    Yield (filename, record, seconds) per PDF for extract_invoice_batch.py.
+
+    seconds is the time iter_invoice_records() took to produce the record with
+    one worker, and None with several (no per-invoice latency is measured).
+    """
+    from extract_invoice_batch import InvoiceCSVWriter, iter_invoice_records
+    fd, csv_path = tempfile.mkstemp(suffix='.csv')
+    os.close(fd)
+    try:
+        with InvoiceCSVWriter(csv_path) as writer:
+            records = iter_invoice_records(pdf_files, page_number=2, workers=workers)
+            while True:
+                start = time.perf_counter()
+                record = next(records, None)
+                seconds = time.perf_counter() - start
+                if record is None:
+                    break
+                data = record[1]
+                writer.write(data)
+                yield data['PDF Filename'], data, seconds if workers == 1 else None
+    finally:
+        os.remove(csv_path)
+
+
+def run_benchmark(extractor, corpus_dir, count, workers):
+    """
+    Run one extractor over the first count invoices of the corpus, in this process.
+
+    Returns:
+        dict: files, seconds, files_per_sec, p50_ms / p90_ms / p99_ms (None
+            when no per-invoice latency was measured), peak_rss_mb,
+            workers_peak_rss_mb and invoice_numbers_ok
+    """
+    import resource
+    time_records = {'extract_invoice': _time_extract_invoice,
+                    'extract_invoice_batch': _time_extract_invoice_batch}[extractor]
+    pdf_files = [os.path.join(corpus_dir, invoice_filename(i)) for i in range(count)]
+    expected = expected_invoice_numbers(corpus_dir, count)
+
+    files = 0
+    latencies = []
+    correct = 0
+    # The extractors print a status line per field; keep them off the timings
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        for filename, data, seconds in time_records(pdf_files, workers):
+            files += 1
+            if seconds is not None:
+                latencies.append(seconds)
+            correct += data.get('Invoice Number') == expected.get(filename)
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+
+    def latency_ms(p):
+        return round(percentile(latencies, p) * 1000, 2) if latencies else None
+
+    return {
+        'extractor': extractor,
+        'files': files,
+        'workers': workers if extractor == 'extract_invoice_batch' else 1,
+        'seconds': round(elapsed, 3),
+        'files_per_sec': round(files / elapsed, 1) if elapsed else 0.0,
+        'p50_ms': latency_ms(50),
+        'p90_ms': latency_ms(90),
+        'p99_ms': latency_ms(99),
+        'peak_rss_mb': round(peak_rss_mb(resource.RUSAGE_SELF), 1),
+        'workers_peak_rss_mb': round(peak_rss_mb(resource.RUSAGE_CHILDREN), 1),
+        'invoice_numbers_ok': correct,
+    }
+
+
+def run_in_subprocess(extractor, corpus_dir, count, workers):
+    """Run run_benchmark() in a fresh interpreter and return its result."""
+    fd, result_path = tempfile.mkstemp(suffix='.json')
+    os.close(fd)
+    try:
+        # Worker processes print to the inherited stdout, so the result goes
+        # through a file rather than the child's output
+        subprocess.run([sys.executable, os.path.abspath(__file__), '--child', extractor,
+                        '--corpus', corpus_dir, '--workers', str(workers),
+                        '--counts', str(count), '--result-file', result_path],
+                       check=True, stdout=subprocess.DEVNULL)
+        with open(result_path, encoding='utf-8') as f:
+            return json.load(f)
+    finally:
+        os.remove(result_path)
+
+
+def _ms(value):
+    """Format a latency column; '-' where no per-invoice latency was measured."""
+    return f"{value:>9.2f}" if value is not None else f"{'-':>9s}"
+
+
+def print_results(results):
+    print(f"{'Extractor':24s}{'Docs':>9s}{'Workers':>9s}{'Files/s':>10s}{'p50 ms':>9s}"
+          f"{'p90 ms':>9s}{'p99 ms':>9s}{'RSS MB':>9s}{'Wkr RSS':>9s}  Invoice # ok")
+    print("-"*110)
+    for r in results:
+        print(f"{r['extractor']:24s}{r['files']:>9,d}{r['workers']:>9d}{r['files_per_sec']:>10,.1f}"
+              f"{_ms(r['p50_ms'])}{_ms(r['p90_ms'])}{_ms(r['p99_ms'])}"
+              f"{r['peak_rss_mb']:>9.1f}{r['workers_peak_rss_mb']:>9.1f}"
+              f"  {r['invoice_numbers_ok']:,}/{r['files']:,}")
+    if any(r['p50_ms'] is None for r in results):
+        print("Latency is per invoice with 1 worker only; parallel batch runs report Files/s.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--counts', type=int, nargs='+', default=DEFAULT_COUNTS,
+                        help='Corpus sizes to benchmark')
+    parser.add_argument('--extractors', nargs='+', choices=EXTRACTORS, default=EXTRACTORS)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Worker processes for extract_invoice_batch (and corpus generation)')
+    parser.add_argument('--corpus', default=DEFAULT_CORPUS_DIR, help='Corpus directory')
+    parser.add_argument('--items', default='1:80,2:15,3:5',
+                        help='Line-item mix of generated invoices, see generate_invoices.py')
+    parser.add_argument('--font', help='TrueType font with a ₹ glyph, for generated invoices')
+    parser.add_argument('--json', help='Also write the results to this JSON file')
+    parser.add_argument('--child', choices=EXTRACTORS, help=argparse.SUPPRESS)
+    parser.add_argument('--result-file', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        result = run_benchmark(args.child, args.corpus, args.counts[0], args.workers)
+        with open(args.result_file, 'w', encoding='utf-8') as f:
+            json.dump(result, f)
+        return
+
+    print("="*80)
+    print("EXTRACTION THROUGHPUT BENCHMARK")
+    print("="*80)
+    print(f"Corpus: {args.corpus}")
+    print(f"Sizes: {', '.join(f'{count:,}' for count in args.counts)}")
+    print(f"Extractors: {', '.join(args.extractors)}")
+    print(f"Batch workers: {args.workers}")
+    print("="*80)
+
+    needed = max(args.counts)
+    available = corpus_size(args.corpus)
+    if available < needed:
+        font_path = find_font(args.font)
+        if not font_path:
+            print("✗ No font with a ₹ glyph found (use --font); amounts are rendered as 'Rs.'")
+        print(f"Generating {needed - available:,} more invoice(s)...")
+        start = time.perf_counter()
+        generate_corpus(args.corpus, needed, item_mix=parse_item_mix(args.items),
+                        font_path=font_path, workers=args.workers)
+        print(f"✓ Corpus ready in {time.perf_counter() - start:.1f}s")
+    else:
+        print(f"✓ Corpus has {available:,} invoices")
+
+    results = []
+    for count in sorted(args.counts):
+        for extractor in args.extractors:
+            print(f"Running {extractor} on {count:,} invoices...")
+            results.append(run_in_subprocess(extractor, args.corpus, count, args.workers))
+
+    print("="*80)
+    print_results(results)
+    print("="*80)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"✓ Results saved to: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""
+Pattern Registry Microbenchmark
+Measures per-invoice parse time with the precompiled registry in invoice_patterns.py
+against the old behaviour of passing raw pattern strings to re.search/re.match,
+and the single-pass header scanner (header_scanner.py) against one re.search
+per header field pattern.
+
+Usage:
+    python benchmarks/bench_patterns.py
+    python benchmarks/bench_patterns.py --pdf /path/to/invoice.pdf --page 2
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import header_scanner
+import invoice_patterns
+from extract_invoice import parse_invoice_text
+from header_scanner import scan_header_fields
+
+
+# Text of a typical Amazon invoice page (page 2), as returned by page.get_text()
+SAMPLE_INVOICE_TEXT = """Tax Invoice/Bill of Supply/Cash Memo
+(Original for Recipient)
+Sold By :
+Amudham Naturals
+Chennai, TAMIL NADU, 600001
+IN
+PAN No: ABCDE1234F
+GST Registration No: 33ABCDE1234F1Z5
+Order Number: 402-4083747-0635534
+Order Date: 11.12.2025
+Billing Address :
+Hariharasudhan Hariharasudhan
+6b/1, shibin city, padavettu amman koil st
+Kaspapuram CHENNAI, TAMIL NADU, 600126
+IN
+Shipping Address :
+Hariharasudhan Hariharasudhan
+6b/1, shibin city, padavettu amman koil st, Kaspapuram
+CHENNAI, TAMIL NADU, 600126
+IN
+Place of supply: TAMIL NADU
+Place of delivery: TAMIL NADU
+Invoice Number : IN-50
+Invoice Details : TN-1781234567-2526
+Invoice Date : 11.12.2025
+Sl.
+No
+Description
+Unit
+Price
+Qty
+Net
+Amount
+Tax
+Rate
+Tax
+Type
+Tax
+Amount
+Total
+Amount
+1
+Amudham Naturals Black Rice Porridge Mix | Karuppu Kavuni Kanji Mix | 100% Natural
+(350g) | B0FZTX33DW ( NM-8PYA-4Y4G )
+HSN:10063010
+₹237.14 1 ₹237.14 5% IGST ₹11.86 ₹249.00
+TOTAL:
+₹11.86 ₹249.00
+Amount in Words:
+Two Hundred Forty-nine only
+For Amudham Naturals:
+Authorized Signatory
+Whether tax is payable under reverse charge - No
+Payment Transaction ID:
+1112GWfDWze1AYX9hB9Cp5Trj
+Date & Time: 11/12/2025, 22:58:24
+hrs
+Invoice Value:
+249.00
+Mode of Payment: GiftCard
+"""
+
+
+class _UncompiledPattern:
+    """Stand-in for a compiled pattern that goes through the re module cache on every call."""
+
+    def __init__(self, compiled):
+        self.pattern = compiled.pattern
+        self.flags = compiled.flags
+
+    def search(self, string):
+        return re.search(self.pattern, string, self.flags)
+
+    def match(self, string, pos=0):
+        # re.match has no pos argument; re.compile goes through the same cache
+        return re.compile(self.pattern, self.flags).match(string, pos)
+
+    def findall(self, string):
+        return re.findall(self.pattern, string, self.flags)
+
+    def finditer(self, string):
+        return re.finditer(self.pattern, string, self.flags)
+
+    def sub(self, repl, string):
+        return re.sub(self.pattern, repl, string, flags=self.flags)
+
+
+@contextlib.contextmanager
+def uncompiled_registry():
+    """
+    Temporarily swap every registry entry for an _UncompiledPattern,
+    including the header scanner's LABEL_INDEX, which holds its own
+    references to the HEADER_PATTERNS entries.
+    """
+    registries = [invoice_patterns.HEADER_PATTERNS,
+                  invoice_patterns.TABLE_PATTERNS,
+                  invoice_patterns.QTY_PATTERNS,
+                  header_scanner.LABEL_INDEX]
+    saved = [dict(registry) for registry in registries]
+    try:
+        for registry in registries[:-1]:
+            for key, value in registry.items():
+                if isinstance(value, list):
+                    registry[key] = [_UncompiledPattern(p) for p in value]
+                else:
+                    registry[key] = _UncompiledPattern(value)
+        label_index = header_scanner.LABEL_INDEX
+        for word, entries in label_index.items():
+            label_index[word] = [(field, priority, _UncompiledPattern(pattern))
+                                 for field, priority, pattern in entries]
+        yield
+    finally:
+        for registry, original in zip(registries, saved):
+            registry.clear()
+            registry.update(original)
+
+
+def empty_record():
+    return {field: '' for field in ['Order Number', 'Order Date', 'Place of Delivery',
+                                    'Invoice Number', 'Invoice Value', 'Description',
+                                    'Qty', 'HSN Code', 'ASIN', 'SKU',
+                                    'Payment Transaction ID', 'Mode of Payment',
+                                    'Date & Time', 'Shipping Address']}
+
+
+def time_parse(text, iterations):
+    """Return the mean per-invoice parse time in microseconds."""
+    # parse_invoice_text prints a short status line per field; keep it off the timings
+    with contextlib.redirect_stdout(io.StringIO()):
+        parse_invoice_text(text, empty_record())  # warm-up
+        start = time.perf_counter()
+        for _ in range(iterations):
+            parse_invoice_text(text, empty_record())
+        elapsed = time.perf_counter() - start
+    return elapsed / iterations * 1e6
+
+
+def search_header_fields(text):
+    """The per-field loops the scanner replaces: ordered re.search fallbacks per field."""
+    found = {}
+    for field, patterns in invoice_patterns.HEADER_PATTERNS.items():
+        for pattern in patterns:
+            match = pattern.search(text)
+            if match:
+                found[field] = match
+                break
+    return found
+
+
+def time_call(func, text, iterations):
+    """Return the mean time of func(text) in microseconds."""
+    func(text)  # warm-up
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func(text)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def load_page_text(pdf_path, page_number):
+    import fitz  # PyMuPDF
+    with fitz.open(pdf_path) as doc:
+        page_index = min(page_number, len(doc)) - 1
+        return doc[page_index].get_text()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pdf', help='Benchmark on the text of a real invoice PDF')
+    parser.add_argument('--page', type=int, default=2, help='Page number (1-indexed)')
+    parser.add_argument('--iterations', type=int, default=5000)
+    args = parser.parse_args()
+
+    text = load_page_text(args.pdf, args.page) if args.pdf else SAMPLE_INVOICE_TEXT
+
+    # Both variants must produce the same record
+    with contextlib.redirect_stdout(io.StringIO()):
+        after_record = parse_invoice_text(text, empty_record())
+        with uncompiled_registry():
+            before_record = parse_invoice_text(text, empty_record())
+    assert before_record == after_record, "registry changed the extracted fields"
+
+    scanned = {field: m.group(1) for field, m in scan_header_fields(text).items()}
+    searched = {field: m.group(1) for field, m in search_header_fields(text).items()}
+    assert scanned == searched, "scanner disagrees with the per-field patterns"
+
+    with uncompiled_registry():
+        before = time_parse(text, args.iterations)
+    after = time_parse(text, args.iterations)
+    per_field = time_call(search_header_fields, text, args.iterations)
+    single_pass = time_call(scan_header_fields, text, args.iterations)
+
+    print("="*80)
+    print("PATTERN REGISTRY MICROBENCHMARK")
+    print("="*80)
+    print(f"Source: {args.pdf or 'built-in sample invoice text'}")
+    print(f"Iterations: {args.iterations}")
+    print(f"Before (raw pattern strings): {before:8.1f} µs/invoice")
+    print(f"After  (precompiled registry): {after:8.1f} µs/invoice")
+    print(f"Speed-up: {before / after:.2f}x")
+    print("-"*80)
+    print("Header fields only:")
+    print(f"Per-field re.search loops:    {per_field:8.1f} µs/invoice")
+    print(f"Single-pass scanner:          {single_pass:8.1f} µs/invoice")
+    print(f"Speed-up: {per_field / single_pass:.2f}x")
+    print("="*80)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,489 @@
+"""
+Synthetic Invoice Corpus Generator
+Renders Amazon-style invoice PDFs with PyMuPDF, for benchmarking the extractors
+on corpora of any size without real customer data.
+
+Each PDF has an order summary cover page and the tax invoice on page 2, laid
+out like the real downloads: seller and address blocks, the order and invoice
+header fields, a line-item table (description, ASIN, SKU, HSN, unit price,
+quantity, tax) and the payment block. Invoice i is generated from a random
+generator seeded with (seed, i), so a corpus can be extended or regenerated in
+parallel and always holds the same invoices. The expected value of every field
+is written to ground_truth.csv next to the PDFs (for the line-item fields,
+those of the first item).
+
+The ₹ sign is part of several extraction patterns, and PyMuPDF's built-in fonts
+have no glyph for it, so a TrueType font that has one is looked up (see
+FONT_CANDIDATES, or pass --font). Without one the sign is rendered as "Rs." and
+the Qty price-sandwich pattern cannot match, which changes the code paths the
+benchmark measures; a warning is printed.
+
+Usage:
+    python benchmarks/generate_invoices.py --count 1000
+    python benchmarks/generate_invoices.py --count 10000 --items 1:70,2:20,3:10 --workers 8
+"""
+
+import argparse
+import csv
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import fitz  # PyMuPDF
+
+DEFAULT_CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'corpus')
+GROUND_TRUTH_FILE = 'ground_truth.csv'
+
+# Fonts with a ₹ glyph on common systems, tried in order
+FONT_CANDIDATES = [
+    '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf',
+    '/usr/share/fonts/dejavu/DejaVuSans.ttf',
+    '/usr/share/fonts/truetype/noto/NotoSans-Regular.ttf',
+    '/usr/share/fonts/noto/NotoSans-Regular.ttf',
+    '/System/Library/Fonts/Supplemental/Arial Unicode.ttf',
+    '/Library/Fonts/Arial Unicode.ttf',
+    'C:\\Windows\\Fonts\\arial.ttf',
+]
+
+# (description, HSN code, ASIN, SKU, price per unit incl. 5% GST)
+PRODUCTS = [
+    ('Amudham Naturals 100% Pure Ragi Flour, Traditional Indian Finger Millet Flour, No Added Preservatives, Gluten-Free, 1 kg',
+     '11029090', 'B0FW7291VR', 'MS-H2GY-GWJX', 240.00),
+    ('Amudham Naturals 100% Pure Sprouted Ragi Flour, Traditional Indian Finger Millet, No Added Preservatives, Gluten-Free, 1 kg',
+     '11029090', 'B0G1BXM4TR', 'JI-QOYC-NE92', 313.00),
+    ('Amudham Naturals 100% Pure Sprouted Ragi Flour, Traditional Indian Finger Millet, No Added Preservatives, Gluten-Free, 500 g',
+     '11029090', 'B0G2JWVMC8', 'EC-HUMA-5GEH', 179.00),
+    ('Amudham Naturals 100% Pure White Rice Flour, Finely Milled Powder for Idlis, Dosas, Traditional Recipes, No Preservatives, 1 kg',
+     '11029090', 'B0G1GRTTVV', 'Y8-8ZNU-V66F', 239.00),
+    ('Amudham Naturals Black Rice Porridge Mix | Karuppu Kavuni Kanji Mix | 100% Natural (250g)',
+     '10063010', 'B0FZTR99T9', '7B-E06O-2KMT', 199.00),
+    ('Amudham Naturals Black Rice Porridge Mix | Karuppu Kavuni Kanji Mix | 100% Natural (350g)',
+     '10063010', 'B0FZTX33DW', 'NM-8PYA-4Y4G', 249.00),
+    ('Amudham Naturals Cane Jaggery Powder, Natural Sweetener, Vegetarian, 1kg Pouch',
+     '1701', 'B0FTYW76TR', 'BJ-9ADS-WQ16', 210.00),
+    ('Amudham Naturals Mappillai Samba Red Rice, Traditional Indian Bridegroom Rice, 1kg',
+     '10063090', 'B0FY34GTTY', 'P7-2A1L-3O70', 240.00),
+    ('Amudham Naturals Pesarattu Dosa Mix, Green Gram Dosa Instant Batter Mix, High Protein, Gluten-Free, 500g',
+     '21069099', 'B0G44TN82N', 'TL-FZ0S-DZYT', 259.00),
+    ('Amudham Naturals Kambu Dosa Mix, Pearl Millet, Instant Breakfast Batter, Preservative-Free, 100% Natural, 500g',
+     '21069099', 'B0G614HQV2', 'QS-CWBY-9XE1', 259.00),
+    ('Amudham Naturals Premium Whole Cashew Nuts, Raw (500g)',
+     '8013', 'B0FY419T3X', 'UB-PSYX-6700', 618.00),
+    ('Amudham Naturals Raw Peanuts, Natural Groundnuts, Unroasted, 1kg Pack',
+     '1202', 'B0FVTM53GV', '37-IXFS-951Q', 290.00),
+    ('Amudham Naturals Roasted Peanut with Skin, Unsalted, High Protein, Crunchy & Healthy, 350g',
+     '8013', 'B0G5LNQBGR', 'CX-M94O-WPVE', 189.00),
+]
+
+# (state as printed on the invoice, cities, PIN prefix)
+DESTINATIONS = [
+    ('TAMIL NADU', ['CHENNAI', 'COIMBATORE', 'MADURAI'], '600'),
+    ('KARNATAKA', ['BENGALURU', 'MYSURU'], '560'),
+    ('TELANGANA', ['HYDERABAD', 'WARANGAL'], '500'),
+    ('MAHARASHTRA', ['MUMBAI', 'PUNE'], '411'),
+    ('WEST BENGAL', ['KOLKATA', 'HOWRAH'], '700'),
+    ('KERALA', ['KOCHI', 'THIRUVANANTHAPURAM'], '695'),
+    ('DELHI', ['NEW DELHI'], '110'),
+]
+
+PAYMENT_MODES = ['UPI', 'UPI', 'UPI', 'Credit Card', 'AmazonPay', 'GiftCard',
+                 'NetBanking', 'Debit Card']
+
+FIRST_NAMES = ['Hariharasudhan', 'Priya', 'Karthik', 'Lakshmi', 'Arun', 'Divya',
+               'Suresh', 'Meena', 'Vignesh', 'Anitha']
+STREETS = ['padavettu amman koil st', 'gandhi road', 'nehru street', 'lake view colony',
+           'temple street', 'main road']
+
+ID_CHARS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789'
+
+# Ground-truth columns, in extract_invoice_batch.INVOICE_FIELDS order
+GROUND_TRUTH_FIELDS = ['PDF Filename', 'Order Number', 'Order Date', 'Place of Delivery',
+                       'Invoice Number', 'Invoice Value', 'Description', 'Qty', 'HSN Code',
+                       'ASIN', 'SKU', 'Payment Transaction ID', 'Mode of Payment',
+                       'Date & Time', 'Shipping Address']
+
+
+def parse_item_mix(spec):
+    """
+    Parse a line-item mix like "1:70,2:20,3:10" (item count: weight).
+
+    Returns:
+        tuple: (item counts, weights)
+    """
+    counts, weights = [], []
+    for part in spec.split(','):
+        count, _, weight = part.partition(':')
+        counts.append(int(count))
+        weights.append(float(weight or 1))
+    return counts, weights
+
+
+def find_font(font_path=None):
+    """Return the path of a font with a ₹ glyph, or None."""
+    for path in ([font_path] if font_path else FONT_CANDIDATES):
+        if path and os.path.exists(path) and fitz.Font(fontfile=path).has_glyph(ord('₹')):
+            return path
+    return None
+
+
+_NUMBER_WORDS = ['', 'One', 'Two', 'Three', 'Four', 'Five', 'Six', 'Seven', 'Eight', 'Nine',
+                 'Ten', 'Eleven', 'Twelve', 'Thirteen', 'Fourteen', 'Fifteen', 'Sixteen',
+                 'Seventeen', 'Eighteen', 'Nineteen']
+_TENS_WORDS = ['', '', 'Twenty', 'Thirty', 'Forty', 'Fifty', 'Sixty', 'Seventy', 'Eighty', 'Ninety']
+
+
+def amount_in_words(amount):
+    """Spell out a whole rupee amount the way the invoices do ("Two Hundred Forty-nine only")."""
+    def below_thousand(n):
+        words = []
+        if n >= 100:
+            words.append(f"{_NUMBER_WORDS[n // 100]} Hundred")
+            n %= 100
+        if n >= 20:
+            words.append(_TENS_WORDS[n // 10] + (f"-{_NUMBER_WORDS[n % 10].lower()}" if n % 10 else ''))
+        elif n:
+            words.append(_NUMBER_WORDS[n])
+        return words
+
+    n = int(amount)
+    words = []
+    for unit, size in (('Crore', 10 ** 7), ('Lakh', 10 ** 5), ('Thousand', 1000)):
+        if n >= size:
+            words += below_thousand(n // size) + [unit]
+            n %= size
+    words += below_thousand(n)
+    return ' '.join(words or ['Zero']) + ' only'
+
+
+def _random_id(rng, length):
+    return ''.join(rng.choice(ID_CHARS) for _ in range(length))
+
+
+def make_invoice(index, seed=0, item_mix=((1,), (1.0,))):
+    """
+    Generate the fields of invoice number index.
+
+    Args:
+        index (int): Invoice number within the corpus (names the PDF)
+        seed (int): Corpus seed
+        item_mix (tuple): (item counts, weights), see parse_item_mix()
+
+    Returns:
+        dict: Invoice fields, with 'items' as a list of
+            (description, hsn, asin, sku, unit price, qty) tuples
+    """
+    rng = random.Random(f"{seed}:{index}")
+    state, cities, pin_prefix = rng.choice(DESTINATIONS)
+    pin = f"{pin_prefix}{rng.randint(1, 199):03d}"
+    name = rng.choice(FIRST_NAMES)
+    city = rng.choice(cities)
+    address_lines = [f"{name} {name}",
+                     f"{rng.randint(1, 99)}b/{rng.randint(1, 9)}, {rng.choice(STREETS)}",
+                     f"{city}, {state}, {pin}",
+                     "IN"]
+
+    count = rng.choices(*item_mix)[0]
+    items = []
+    for product in rng.sample(PRODUCTS, min(count, len(PRODUCTS))):
+        qty = rng.choices([1, 2, 3, 4, 6], weights=[80, 10, 5, 3, 2])[0]
+        items.append(product[:4] + (round(product[4] / 1.05, 2), qty))
+
+    day, month = rng.randint(1, 28), rng.randint(1, 12)
+    total = sum(round(unit * 1.05, 2) * qty for *_, unit, qty in items)
+    return {
+        'index': index,
+        'order_number': f"40{rng.randint(1, 8)}-{rng.randint(0, 9999999):07d}-{rng.randint(0, 9999999):07d}",
+        'order_date': f"{day:02d}.{month:02d}.2025",
+        'date_time': f"{day:02d}/{month:02d}/2025, {rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d}",
+        'invoice_number': f"IN-{index + 1}",
+        'invoice_details': f"TN-{rng.randint(10 ** 9, 10 ** 10 - 1)}-2526",
+        'state': state,
+        'address_lines': address_lines,
+        'items': items,
+        'total': round(total, 2),
+        'transaction_id': rng.choice('0123456789') + _random_id(rng, 24),
+        'payment_mode': rng.choice(PAYMENT_MODES),
+    }
+
+
+def _money(value, currency):
+    return f"{currency}{value:,.2f}"
+
+
+_FONTS = {}
+_ADVANCES = {}  # id(font) -> {char: advance at font size 1}
+
+
+def _get_font(font_path):
+    """fitz.Font for font_path (Helvetica if None), loaded once per process."""
+    if font_path not in _FONTS:
+        _FONTS[font_path] = fitz.Font(fontfile=font_path) if font_path else fitz.Font('helv')
+    return _FONTS[font_path]
+
+
+class _PageText:
+    """Collects a page's text with one TextWriter; the text layer keeps the order of the calls."""
+
+    def __init__(self, page, font):
+        self.page = page
+        self.font = font
+        self.writer = fitz.TextWriter(page.rect)
+
+    def text(self, x, y, text, size=8):
+        self.writer.append((x, y), text, font=self.font, fontsize=size)
+
+    def lines(self, x, y, lines, size=8, leading=1.25):
+        """Write lines downwards from y; returns the y of the next line."""
+        for text in lines:
+            self.text(x, y, text, size)
+            y += size * leading
+        return y
+
+    def width(self, text, size=8):
+        """Width of text in points; glyph advances are looked up once per character."""
+        advances = _ADVANCES.setdefault(id(self.font), {})
+        total = 0.0
+        for char in text:
+            if char not in advances:
+                advances[char] = self.font.text_length(char, fontsize=1)
+            total += advances[char]
+        return total * size
+
+    def wrap(self, text, width, size=8):
+        """Split text into lines no wider than width points."""
+        lines, current = [], ''
+        for word in text.split():
+            candidate = f"{current} {word}" if current else word
+            if current and self.width(candidate, size) > width:
+                lines.append(current)
+                current = word
+            else:
+                current = candidate
+        return lines + [current] if current else lines
+
+    def finish(self):
+        self.writer.write_text(self.page)
+
+
+# Line-item table columns: (x, header lines)
+TABLE_COLUMNS = [
+    (40, ["Sl.", "No"]),
+    (62, ["Description"]),
+    (322, ["Unit", "Price"]),
+    (368, ["Qty"]),
+    (390, ["Net", "Amount"]),
+    (436, ["Tax", "Rate"]),
+    (462, ["Tax", "Type"]),
+    (490, ["Tax", "Amount"]),
+    (530, ["Total", "Amount"]),
+]
+DESCRIPTION_WIDTH = 250
+
+
+def render_cover_page(page, invoice, font, currency):
+    """Page 1: order summary (no invoice markers, so the locator skips it)."""
+    out = _PageText(page, font)
+    out.text(40, 60, "Order Summary", size=16)
+    y = out.lines(40, 90, [f"Order placed: {invoice['order_date']}",
+                           f"Amazon.in order number: {invoice['order_number']}",
+                           f"Order total: {_money(invoice['total'], currency)}"], size=9)
+    y = out.lines(40, y + 12, ["Items ordered"], size=10)
+    for title, _, _, _, _, qty in invoice['items']:
+        y = out.lines(40, y, out.wrap(f"{qty} of: {title}", 500, size=9), size=9)
+    out.lines(40, y + 12, ["Shipping to:"] + invoice['address_lines'], size=9)
+    out.finish()
+
+
+def render_invoice_page(page, invoice, font, currency):
+    """Page 2: the tax invoice, laid out (and in the text order of) a real Amazon invoice."""
+    out = _PageText(page, font)
+    out.lines(330, 50, ["Tax Invoice/Bill of Supply/Cash Memo"], size=11)
+    out.lines(380, 64, ["(Original for Recipient)"])
+
+    # Seller and order on the left, addresses and invoice on the right
+    y = out.lines(40, 100, ["Sold By :", "Amudham Naturals", "Chennai, TAMIL NADU, 600001", "IN"])
+    y = out.lines(40, y + 10, ["PAN No: ABCDE1234F", "GST Registration No: 33ABCDE1234F1Z5"])
+    out.lines(40, y + 10, [f"Order Number: {invoice['order_number']}",
+                           f"Order Date: {invoice['order_date']}"])
+    y = out.lines(330, 100, ["Billing Address :"] + invoice['address_lines'])
+    y = out.lines(330, y + 6, ["Shipping Address :"] + invoice['address_lines'])
+    y = out.lines(330, y + 6, [f"Place of supply: {invoice['state']}",
+                               f"Place of delivery: {invoice['state']}"])
+    y = out.lines(330, y + 6, [f"Invoice Number : {invoice['invoice_number']}",
+                               f"Invoice Details : {invoice['invoice_details']}",
+                               f"Invoice Date : {invoice['order_date']}"])
+
+    # Line-item table
+    top = y + 12
+    for x, header in TABLE_COLUMNS:
+        out.lines(x, top + 10, header, size=7)
+    page.draw_rect(fitz.Rect(36, top, 565, top + 24), color=(0, 0, 0), width=0.5)
+    y = top + 36
+    total_tax = 0.0
+    for n, (title, hsn, asin, sku, unit, qty) in enumerate(invoice['items'], start=1):
+        net = round(unit * qty, 2)
+        tax = round(net * 0.05, 2)
+        total_tax += tax
+        out.text(40, y, str(n), size=7)
+        cell = out.wrap(f"{title} | {asin} ( {sku} )", DESCRIPTION_WIDTH, size=7) + [f"HSN:{hsn}"]
+        row_end = out.lines(62, y, cell, size=7)
+        for (x, _), value in zip(TABLE_COLUMNS[2:], [_money(unit, currency), str(qty),
+                                                     _money(net, currency), "5%", "IGST",
+                                                     _money(tax, currency),
+                                                     _money(net + tax, currency)]):
+            out.text(x, y, value, size=7)
+        y = row_end + 6
+    out.text(40, y + 4, "TOTAL:", size=7)
+    out.text(490, y + 4, _money(total_tax, currency), size=7)
+    out.text(530, y + 4, _money(invoice['total'], currency), size=7)
+    page.draw_rect(fitz.Rect(36, top, 565, y + 8), color=(0, 0, 0), width=0.5)
+
+    y = out.lines(40, y + 22, ["Amount in Words:", amount_in_words(invoice['total'])])
+    y = out.lines(420, y + 6, ["For Amudham Naturals:", "", "Authorized Signatory"])
+    y = out.lines(40, y + 6, ["Whether tax is payable under reverse charge - No"])
+
+    # Payment block: one row of label / value cells
+    y += 10
+    out.lines(40, y, ["Payment Transaction ID:", invoice['transaction_id']], size=7)
+    out.lines(170, y, [f"Date & Time: {invoice['date_time']}", "hrs"], size=7)
+    out.lines(300, y, ["Invoice Value:", f"{invoice['total']:.2f}"], size=7)
+    out.lines(400, y, [f"Mode of Payment: {invoice['payment_mode']}"], size=7)
+    page.draw_rect(fitz.Rect(36, y - 10, 565, y + 12), color=(0, 0, 0), width=0.5)
+    out.finish()
+
+
+def ground_truth_row(invoice, filename):
+    """Fields an extractor should find in the generated invoice."""
+    first = invoice['items'][0]
+    return {
+        'PDF Filename': filename,
+        'Order Number': invoice['order_number'],
+        'Order Date': invoice['order_date'],
+        'Place of Delivery': invoice['state'],
+        'Invoice Number': invoice['invoice_number'],
+        'Invoice Value': f"{invoice['total']:.2f}",
+        'Description': first[0],
+        'Qty': str(first[5]),
+        'HSN Code': first[1],
+        'ASIN': first[2],
+        'SKU': first[3],
+        'Payment Transaction ID': invoice['transaction_id'],
+        'Mode of Payment': invoice['payment_mode'],
+        'Date & Time': f"{invoice['date_time']} hrs",
+        'Shipping Address': ' '.join(invoice['address_lines']),
+    }
+
+
+def invoice_filename(index):
+    return f"invoice_{index + 1:06d}.pdf"
+
+
+def write_invoice_pdf(path, invoice, font_path=None):
+    """Render one invoice to a two-page PDF."""
+    currency = '₹' if font_path else 'Rs.'
+    font = _get_font(font_path)
+    doc = fitz.open()
+    for render in (render_cover_page, render_invoice_page):
+        render(doc.new_page(width=595, height=842), invoice, font, currency)  # A4
+    if font_path:
+        # Embed only the glyphs used, not the whole font, in every PDF
+        doc.subset_fonts()
+    doc.save(path, garbage=3, deflate=True)
+    doc.close()
+
+
+def _generate_range(output_dir, start, stop, seed, item_mix, font_path, overwrite):
+    """Generate invoices start..stop-1; runs in a worker process. Returns their ground-truth rows."""
+    rows = []
+    for index in range(start, stop):
+        invoice = make_invoice(index, seed, item_mix)
+        filename = invoice_filename(index)
+        path = os.path.join(output_dir, filename)
+        if overwrite or not os.path.exists(path):
+            write_invoice_pdf(path, invoice, font_path)
+        rows.append(ground_truth_row(invoice, filename))
+    return rows
+
+
+def generate_corpus(output_dir, count, seed=0, item_mix=((1,), (1.0,)), font_path=None,
+                    workers=1, overwrite=False, chunk_size=500):
+    """
+    Generate invoice_000001.pdf ... in output_dir, plus ground_truth.csv.
+
+    PDFs that already exist are kept unless overwrite is set, so a corpus can
+    be grown from 1k to 100k invoices without redoing the first ones (with the
+    same seed and item mix they would come out the same anyway).
+
+    Args:
+        output_dir (str): Corpus directory (created if missing)
+        count (int): Number of invoices
+        seed (int): Corpus seed
+        item_mix (tuple): (item counts, weights), see parse_item_mix()
+        font_path (str): TrueType font with a ₹ glyph; None renders "Rs."
+        workers (int): Worker processes
+        overwrite (bool): Re-render existing PDFs
+        chunk_size (int): Invoices per worker task
+
+    Returns:
+        int: Number of invoices in the corpus
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    ranges = [(start, min(start + chunk_size, count)) for start in range(0, count, chunk_size)]
+    args = (seed, item_mix, font_path, overwrite)
+
+    with open(os.path.join(output_dir, GROUND_TRUTH_FILE), 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=GROUND_TRUTH_FIELDS)
+        writer.writeheader()
+        if workers <= 1:
+            chunks = (_generate_range(output_dir, start, stop, *args) for start, stop in ranges)
+            for rows in chunks:
+                writer.writerows(rows)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(_generate_range, output_dir, start, stop, *args)
+                           for start, stop in ranges]
+                for future in futures:
+                    writer.writerows(future.result())
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--count', type=int, default=1000, help='Number of invoices')
+    parser.add_argument('--output', default=DEFAULT_CORPUS_DIR, help='Corpus directory')
+    parser.add_argument('--items', default='1:80,2:15,3:5',
+                        help='Line items per invoice as count:weight pairs')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--font', help='TrueType font with a ₹ glyph')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--overwrite', action='store_true', help='Re-render existing PDFs')
+    args = parser.parse_args()
+
+    font_path = find_font(args.font)
+
+    print("="*80)
+    print("SYNTHETIC INVOICE CORPUS")
+    print("="*80)
+    print(f"Output: {args.output}")
+    print(f"Invoices: {args.count:,}")
+    print(f"Line items: {args.items}")
+    print(f"Seed: {args.seed}")
+    print(f"Workers: {args.workers}")
+    if font_path:
+        print(f"✓ Font: {font_path}")
+    else:
+        print("✗ No font with a ₹ glyph found (use --font); amounts are rendered as 'Rs.'")
+    print("="*80)
+
+    start = time.perf_counter()
+    generate_corpus(args.output, args.count, args.seed, parse_item_mix(args.items), font_path,
+                    workers=args.workers, overwrite=args.overwrite)
+    elapsed = time.perf_counter() - start
+    print(f"✓ {args.count:,} invoices in {elapsed:.1f}s ({args.count / elapsed:,.0f}/s)")
+    print(f"✓ Expected fields: {os.path.join(args.output, GROUND_TRUTH_FILE)}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+"""
+Checkpoint Manifest
+Append-only record of the PDFs a batch run has already written to its CSV, so
+an interrupted run (OOM, reboot, Ctrl-C) can be resumed instead of restarted.
+
+The manifest is a JSON-lines file next to the output CSV. Entries are only
+written after the matching CSV rows have been flushed to disk, so every PDF
+listed in the manifest is guaranteed to be in the CSV. A line torn by a crash
+is ignored when the manifest is read back.
+"""
+
+import json
+import os
+
+from invoice_archive import source_name, source_stat
+
+
+class CheckpointManifest:
+    """
+    Checkpoint log of completed PDFs.
+
+    Usage:
+        with CheckpointManifest(output_file + '.manifest.jsonl', resume=True) as manifest:
+            pdf_files = (p for p in pdf_files if not manifest.is_done(p))
+            ...
+            manifest.add(pdf_path, content_hash, 'ok')
+            manifest.commit()  # once the CSV rows are on disk
+
+    A PDF counts as done while its path, size and modification time match the
+    manifest entry; a file that was replaced since is processed again. A PDF
+    inside an archive (see invoice_archive.py) is done while its archive is
+    unchanged.
+    """
+
+    def __init__(self, manifest_path, resume=False):
+        """
+        Args:
+            manifest_path (str): Path of the JSON-lines manifest
+            resume (bool): Load and extend an existing manifest. Otherwise any
+                existing manifest is discarded and a new one is started.
+        """
+        self.manifest_path = manifest_path
+        self.done = {}  # absolute path -> (size, mtime_ns)
+        self._pending = []
+
+        if resume and os.path.exists(manifest_path):
+            self._load()
+            self._file = open(manifest_path, 'ab')
+            # Start after a line torn by a previous crash, if any
+            if self._file.tell() > 0:
+                with open(manifest_path, 'rb') as f:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b'\n':
+                        self._file.write(b'\n')
+        else:
+            self._file = open(manifest_path, 'wb')
+
+    def _load(self):
+        with open(self.manifest_path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    self.done[entry['path']] = (entry['size'], entry['mtime_ns'])
+                except (ValueError, KeyError, TypeError):
+                    continue  # torn or foreign line
+
+    def is_done(self, pdf_path):
+        """Return True if pdf_path was already completed and has not changed since."""
+        path = os.path.abspath(pdf_path)
+        if path not in self.done:
+            return False
+        stat = source_stat(path)
+        return self.done[path] == (stat.st_size, stat.st_mtime_ns)
+
+    def add(self, pdf_path, content_hash, status):
+        """
+        Queue a completed PDF; it is written to the manifest by the next commit().
+
+        Args:
+            pdf_path (str): Path of the PDF
+            content_hash (str): SHA-256 of the PDF contents
+            status (str): 'ok', 'empty' (no invoice fields found) or 'duplicate'
+        """
+        path = os.path.abspath(pdf_path)
+        stat = source_stat(path)
+        self._pending.append({
+            'path': path,
+            'filename': source_name(path),
+            'sha256': content_hash,
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'status': status,
+        })
+
+    def commit(self):
+        """Append the queued entries to the manifest and fsync it."""
+        if not self._pending:
+            return
+        lines = ''.join(json.dumps(entry, ensure_ascii=False) + '\n' for entry in self._pending)
+        self._file.write(lines.encode('utf-8'))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        for entry in self._pending:
+            self.done[entry['path']] = (entry['size'], entry['mtime_ns'])
+        self._pending = []
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
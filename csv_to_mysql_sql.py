@@ -1,4 +1,8 @@
+import numpy as np
 import pandas as pd
+from pandas.api.types import is_bool_dtype, is_numeric_dtype
+
+from invoice_store import InvoiceStore
 
 # -----------------------------
 # CONFIG
@@ -7,6 +11,28 @@ CSV_FILE = "invoice_data_with_profit.csv"
 SQL_FILE = "invoice_data_mysql.sql"
 TABLE_NAME = "invoices"
 
+# "sql": INSERT statements in SQL_FILE
+# "tsv": rows in TSV_FILE, loaded by a LOAD DATA statement in SQL_FILE
+# "db":  no file; rows are upserted by invoice number straight into the
+#        DB_BACKEND database
+EXPORT_FORMAT = "sql"
+TSV_FILE = "invoice_data_mysql.tsv"
+
+# "db" export: "sqlite" (SQLITE_FILE) or "mysql" (MYSQL_CONNECTION, needs PyMySQL)
+DB_BACKEND = "sqlite"
+SQLITE_FILE = "food_business.sqlite"
+MYSQL_CONNECTION = {
+    "host": "localhost",
+    "user": "root",
+    "password": "",
+    "database": "food_business",
+}
+
+# Rows per multi-row INSERT / executemany() (1 writes one INSERT per row), and
+# INSERTs per transaction
+BATCH_SIZE = 1000
+BATCHES_PER_TRANSACTION = 10
+
 # -----------------------------
 # READ CSV
 # -----------------------------
@@ -59,19 +85,81 @@ df["WeekOfYear"] = pd.to_numeric(df["WeekOfYear"], errors="coerce").fillna(0).as
 df = df.where(pd.notnull(df), None)
 
 # -----------------------------
-# WRITE MYSQL SQL FILE
+# VALUE FORMATTING
 # -----------------------------
-with open(SQL_FILE, "w", encoding="utf-8") as f:
-
-    # CREATE DATABASE (optional)
-    f.write("CREATE DATABASE IF NOT EXISTS food_business;\n")
-    f.write("USE food_business;\n\n")
-
-    # DROP + CREATE TABLE
-    f.write(f"DROP TABLE IF EXISTS `{TABLE_NAME}`;\n")
-    f.write(f"""
+# Values are formatted a whole column at a time, and each distinct value in a
+# column is formatted only once (invoice exports repeat the same products,
+# states, dates and payment modes across many rows).
+
+def format_distinct(column, format_value, null):
+    """Format each distinct value of a column once and map the results back to its rows."""
+    codes, uniques = pd.factorize(column)
+    # Extra slot at the end for the -1 code of missing values
+    formatted = np.array([format_value(value) for value in uniques] + [null], dtype=object)
+    return formatted[codes]
+
+
+def sql_literal(value):
+    """Format one value for MySQL: numbers as-is, anything else quoted and escaped (backslash is MySQL's string escape character)."""
+    if isinstance(value, (int, float)):
+        return str(value)
+    return "'" + str(value).replace("\\", "\\\\").replace("'", "''") + "'"
+
+
+def tsv_field(value):
+    """Escape a value for LOAD DATA's default TSV dialect."""
+    return (str(value).replace("\\", "\\\\").replace("\t", "\\t")
+            .replace("\n", "\\n").replace("\r", "\\r"))
+
+
+def sql_literals(column):
+    """Format a column as MySQL literals: numbers as-is, text quoted, missing values as NULL."""
+    if is_numeric_dtype(column) and not is_bool_dtype(column):
+        return format_distinct(column, str, "NULL")
+    return format_distinct(column, sql_literal, "NULL")
+
+
+def tsv_fields(column):
+    """Format a column as TSV fields, with \\N for missing values."""
+    return format_distinct(column, tsv_field, "\\N")
+
+
+def join_columns(columns, separator):
+    """Join formatted columns into one string per row."""
+    return [separator.join(fields) for fields in zip(*columns)]
+
+
+if EXPORT_FORMAT == "db":
+    # -----------------------------
+    # LOAD STRAIGHT INTO THE DATABASE
+    # -----------------------------
+    if DB_BACKEND == "mysql":
+        store = InvoiceStore.mysql(TABLE_NAME, **MYSQL_CONNECTION)
+    else:
+        store = InvoiceStore.sqlite(SQLITE_FILE, TABLE_NAME)
+    with store:
+        inserted, updated, skipped = store.upsert(df, BATCH_SIZE, BATCHES_PER_TRANSACTION)
+        total = store.count()
+
+    print(f"Loaded into {DB_BACKEND} table {TABLE_NAME}"
+          + (f" ({SQLITE_FILE})" if DB_BACKEND == "sqlite" else ""))
+    print(f"New invoices: {inserted}, updated: {updated}, without invoice number (skipped): {skipped}")
+    print(f"Total invoices stored: {total}")
+else:
+    # -----------------------------
+    # WRITE MYSQL SQL FILE
+    # -----------------------------
+    with open(SQL_FILE, "w", encoding="utf-8") as f:
+
+        # CREATE DATABASE (optional)
+        f.write("CREATE DATABASE IF NOT EXISTS food_business;\n")
+        f.write("USE food_business;\n\n")
+
+        # DROP + CREATE TABLE
+        f.write(f"DROP TABLE IF EXISTS `{TABLE_NAME}`;\n")
+        f.write(f"""
 CREATE TABLE `{TABLE_NAME}` (
-    pdf_filename VARCHAR(50),
+    pdf_filename VARCHAR(255),
     order_number VARCHAR(50),
     order_date DATE,
     place_of_delivery VARCHAR(50),
@@ -96,22 +184,37 @@ CREATE TABLE `{TABLE_NAME}` (
 );
 \n""")
 
-    # INSERT STATEMENTS
-    for _, row in df.iterrows():
-        values = []
-        for val in row:
-            if val is None:
-                values.append("NULL")
-            elif isinstance(val, (int, float)):
-                values.append(str(val))
-            else:
-                # Escape single quotes by doubling them
-                escaped = str(val).replace("'", "''")
-                values.append(f"'{escaped}'")
-
-        f.write(
-            f"INSERT INTO `{TABLE_NAME}` VALUES ({', '.join(values)});\n"
-        )
-
-print(f"MySQL SQL file created successfully: {SQL_FILE}")
-print(f"Total records converted: {len(df)}")
+        if EXPORT_FORMAT == "tsv":
+            # LOAD DATA INFILE-ready rows; the defaults (tab-separated, newline
+            # terminated, backslash escapes, \N for NULL) match tsv_fields()
+            rows = join_columns([tsv_fields(df[col]) for col in df.columns], "\t")
+            with open(TSV_FILE, "w", encoding="utf-8", newline="\n") as tsv:
+                for row in rows:
+                    tsv.write(row + "\n")
+
+            f.write(
+                f"LOAD DATA LOCAL INFILE '{TSV_FILE}' INTO TABLE `{TABLE_NAME}`\n"
+                f"CHARACTER SET utf8mb4\n"
+                f"FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\'\n"
+                f"LINES TERMINATED BY '\\n';\n"
+            )
+        else:
+            # Multi-row INSERT STATEMENTS, BATCH_SIZE rows each, committed every
+            # BATCHES_PER_TRANSACTION statements
+            rows = join_columns([sql_literals(df[col]) for col in df.columns], ", ")
+            statements = 0
+            for start in range(0, len(rows), BATCH_SIZE):
+                if statements % BATCHES_PER_TRANSACTION == 0:
+                    f.write("START TRANSACTION;\n")
+                values = "),\n    (".join(rows[start:start + BATCH_SIZE])
+                f.write(f"INSERT INTO `{TABLE_NAME}` VALUES ({values});\n")
+                statements += 1
+                if statements % BATCHES_PER_TRANSACTION == 0:
+                    f.write("COMMIT;\n")
+            if statements % BATCHES_PER_TRANSACTION:
+                f.write("COMMIT;\n")
+
+    print(f"MySQL SQL file created successfully: {SQL_FILE}")
+    if EXPORT_FORMAT == "tsv":
+        print(f"Data file for LOAD DATA: {TSV_FILE}")
+    print(f"Total records converted: {len(df)}")
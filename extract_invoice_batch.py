@@ -4,665 +4,805 @@ Extracts clean Description (without serial number, ASIN, SKU), HSN Code, ASIN, a
 Filters out serial numbers, table headers, and all numeric columns.
 """
 
-import fitz  # PyMuPDF
+import argparse
 import csv
-import re
+import io
 import os
 import glob
+import hashlib
+import itertools
+import tarfile
+import zipfile
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
+from invoice_parser import parse_invoice_text
+from invoice_csv import invoice_key, load_invoice_keys, save_to_csv
+from extraction_profile import ExtractionProfile, NULL_PROFILE
+from pdf_loader import open_pdf
+from page_locator import find_invoice_page, read_invoice_pages, group_invoice_pages
+from extraction_cache import ExtractionCache, file_sha256
+from checkpoint_manifest import CheckpointManifest
+from pdf_prefetch import iter_prefetched
+from invoice_archive import is_archive, iter_archive_pdfs, source_name
 
-def extract_description_hsn_asin_sku(text, debug=False):
-    """
-    Extract description, HSN code, ASIN, and SKU from table format.
-    Filters out serial numbers, table column headers and labels.
-    
-    ASIN format: B0FW7291VR (starts with B0, followed by alphanumeric)
-    SKU format: MS-H2GY-GWJX (alphanumeric with hyphens, in parentheses)
-    
-    Args:
-        text (str): Full page text
-        debug (bool): Print debug info
-        
-    Returns:
-        tuple: (description, hsn_code, asin, sku)
-    """
-    description = ""
-    hsn_code = ""
-    asin = ""
-    sku = ""
-    
-    if debug:
-        print("\n" + "-"*80)
-        print("DESCRIPTION EXTRACTION DEBUG:")
-        print("-"*80)
-    
-    # Split text into lines
-    lines = text.split('\n')
-    
-    # Find the Description column header
-    desc_start_index = -1
-    for i, line in enumerate(lines):
-        if re.search(r'\bDescription\b', line, re.IGNORECASE):
-            desc_start_index = i
-            if debug:
-                print(f"Found 'Description' header at line {i}: {line}")
-            break
-    
-    if desc_start_index != -1:
-        # Collect description lines (text only, no numbers or headers)
-        desc_lines = []
-        raw_text = []  # Keep raw text for ASIN/SKU extraction
-        
-        # Keywords that indicate we've moved past the description section
-        stop_keywords = ['TOTAL:', 'Subtotal', 'Grand Total', 
-                        'Mode of Payment', 'Date & Time', 'Transaction']
-        
-        # Start from the line after "Description" header
-        for i in range(desc_start_index + 1, min(desc_start_index + 30, len(lines))):
-            line = lines[i].strip()
-            
-            # Skip empty lines
-            if not line:
-                continue
-            
-            # Stop if we hit total or other sections
-            if any(keyword in line for keyword in stop_keywords):
-                if debug:
-                    print(f"Stopping at line {i}: {line}")
-                break
-            
-            # Keep raw text for ASIN/SKU extraction
-            raw_text.append(line)
-            
-            # CRITICAL FILTERS - Skip all numeric/table data and headers:
-            
-            # 1. Skip lines that are just a single digit or small number (serial numbers like "1", "2", etc.)
-            if re.match(r'^\d{1,3}$', line):
-                if debug:
-                    print(f"Skipping serial number {i}: {line}")
-                continue
-            
-            # 2. Skip lines that are repetitions of "Amount" or similar column headers
-            if re.match(r'^(Amount\s*){2,}', line, re.IGNORECASE):
-                if debug:
-                    print(f"Skipping repeated 'Amount' header {i}: {line}")
-                continue
-            
-            # 3. Skip lines like "Amount Amount Amount 1" or similar table artifacts
-            if re.match(r'^(Amount|Net|Tax|Total|Type|Rate|Qty|Price)\s+(Amount|Net|Tax|Total|Type|Rate|Qty|Price)', line, re.IGNORECASE):
-                if debug:
-                    print(f"Skipping table header line {i}: {line}")
-                continue
-            
-            # 4. Skip pure numbers (prices, quantities, amounts)
-            if re.match(r'^[\d,.\s₹$€£%]+$', line):
-                if debug:
-                    print(f"Skipping numeric line {i}: {line}")
-                continue
-            
-            # 5. Skip currency amounts with symbols
-            if re.match(r'^[₹$€£]\s*[\d,]+\.?\d*$', line):
-                if debug:
-                    print(f"Skipping currency amount {i}: {line}")
-                continue
-            
-            # 6. Skip lines that are ONLY numbers, percentages, or currency
-            if re.match(r'^(\d+%?|[\d,]+\.?\d*|[₹$€£][\d,]+\.?\d*)$', line):
-                if debug:
-                    print(f"Skipping number/percentage {i}: {line}")
-                continue
-            
-            # 7. Skip tax type indicators
-            if re.match(r'^(IGST|CGST|SGST|GST)$', line, re.IGNORECASE):
-                if debug:
-                    print(f"Skipping tax type {i}: {line}")
-                continue
-            
-            # 8. Skip standard column headers
-            if re.match(r'^(Sl\.?\s*No|Unit\s+Price|Qty|Net\s+Amount|Tax\s+Rate|Tax\s+Type|Tax\s+Amount|Total\s+Amount)$', line, re.IGNORECASE):
-                if debug:
-                    print(f"Skipping column header {i}: {line}")
-                continue
-            
-            # 9. Skip lines with mostly numbers and currency symbols
-            num_count = len(re.findall(r'[\d₹$€£,%.]', line))
-            letter_count = len(re.findall(r'[a-zA-Z]', line))
-            if num_count > letter_count and num_count > 5:
-                if debug:
-                    print(f"Skipping numeric-heavy line {i}: {line}")
-                continue
-            
-            # 10. Skip lines that look like just "Amount 1" or "Net 1" etc.
-            if re.match(r'^(Amount|Net|Tax|Total|Price|Rate)\s+\d+$', line, re.IGNORECASE):
-                if debug:
-                    print(f"Skipping column label with number {i}: {line}")
-                continue
-            
-            # Check if this line contains HSN code
-            hsn_match = re.search(r'HSN\s*:?\s*(\d+)', line, re.IGNORECASE)
-            if hsn_match:
-                hsn_code = hsn_match.group(1)
-                # Extract description part before HSN (if any on same line)
-                desc_part = re.sub(r'HSN\s*:?\s*\d+', '', line, flags=re.IGNORECASE).strip()
-                if desc_part and len(desc_part) > 3:
-                    # Only add if it doesn't look like a header or serial number
-                    if not re.match(r'^(Amount|Net|Tax|Total|\d{1,3})$', desc_part, re.IGNORECASE):
-                        desc_lines.append(desc_part)
-                if debug:
-                    print(f"Found HSN code at line {i}: {hsn_code}")
-                    if desc_part:
-                        print(f"  Description part: {desc_part}")
-                continue
-            
-            # Add to description if it contains actual text (product description)
-            # Must have at least some letters and be reasonably long
-            if len(line) > 5 and re.search(r'[a-zA-Z]{3,}', line):
-                # Additional check: make sure it's not just a serial number pattern
-                if not re.match(r'^[A-Z0-9\-]{8,}$', line):
-                    # Skip if it looks like a column header
-                    if not re.match(r'^(Amount|Net|Tax|Total|Type|Rate|Qty|Price)', line, re.IGNORECASE):
-                        desc_lines.append(line)
-                        if debug:
-                            print(f"✓ Adding description line {i}: {line}")
-        
-        # Combine description lines
-        description = ' '.join(desc_lines).strip()
-        
-        # Extract ASIN and SKU from the raw text
-        full_raw_text = ' '.join(raw_text)
-        
-        # Extract ASIN (format: B0 followed by alphanumeric characters, typically 10 chars total)
-        asin_match = re.search(r'\b(B0[A-Z0-9]{8})\b', full_raw_text)
-        if asin_match:
-            asin = asin_match.group(1)
-            if debug:
-                print(f"Found ASIN: {asin}")
-            # Remove ASIN from description
-            description = description.replace(asin, '').strip()
-        
-        # Extract SKU (format: alphanumeric with hyphens, in parentheses)
-        # Pattern: ( XXXXX-XXXXX-XXXXX ) or similar
-        sku_match = re.search(r'\(\s*([A-Z0-9\-]+)\s*\)', full_raw_text)
-        if sku_match:
-            potential_sku = sku_match.group(1)
-            # Make sure it's not the ASIN (ASIN doesn't have hyphens typically)
-            if potential_sku != asin and '-' in potential_sku:
-                sku = potential_sku
-                if debug:
-                    print(f"Found SKU: {sku}")
-                # Remove SKU and parentheses from description
-                description = re.sub(r'\(\s*' + re.escape(sku) + r'\s*\)', '', description).strip()
-        
-        # Clean up description
-        if description:
-            # Remove any leading serial numbers (single digits at the start)
-            description = re.sub(r'^\d{1,3}\s+', '', description)
-            
-            # Remove extra whitespace
-            description = ' '.join(description.split())
-            
-            # Remove trailing punctuation artifacts
-            description = description.rstrip('|,;')
-            
-            # Remove any remaining numeric artifacts at the end
-            description = re.sub(r'\s+[\d,]+\.?\d*\s*$', '', description)
-            
-            # Clean up extra pipes and spaces
-            description = re.sub(r'\s*\|\s*$', '', description)
-            description = re.sub(r'\s+', ' ', description)
-            
-            # Remove any remaining "Amount" or similar artifacts
-            description = re.sub(r'\b(Amount|Net|Tax|Total|Type|Rate)\s+\d*\s*$', '', description, flags=re.IGNORECASE).strip()
-    
-    # Alternative method if table parsing didn't work
-    if not description:
-        if debug:
-            print("\nTrying alternative description extraction...")
-        
-        # Look for product description pattern (after serial number)
-        pattern = r'\d+\s+([A-Za-z][^₹\d\n]{20,}?)(?:\s*HSN\s*:?\s*(\d+)|\s*₹|\s+\d+\.\d{2})'
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            description = match.group(1).strip()
-            if match.lastindex >= 2 and match.group(2):
-                hsn_code = match.group(2)
-            # Clean up
-            description = ' '.join(description.split())
-            if debug:
-                print(f"Alternative method found: {description}")
-    
-    # Extract HSN if not found yet
-    if not hsn_code:
-        hsn_match = re.search(r'HSN\s*:?\s*(\d{6,10})', text, re.IGNORECASE)
-        if hsn_match:
-            hsn_code = hsn_match.group(1)
-            if debug:
-                print(f"Found HSN code via alternative search: {hsn_code}")
-    
-    # Extract ASIN if not found yet
-    if not asin:
-        asin_match = re.search(r'\b(B0[A-Z0-9]{8})\b', text)
-        if asin_match:
-            asin = asin_match.group(1)
-            if debug:
-                print(f"Found ASIN via alternative search: {asin}")
-    
-    # Extract SKU if not found yet
-    if not sku:
-        sku_match = re.search(r'\(\s*([A-Z0-9]+-[A-Z0-9]+-[A-Z0-9]+)\s*\)', text)
-        if sku_match:
-            sku = sku_match.group(1)
-            if debug:
-                print(f"Found SKU via alternative search: {sku}")
-    
-    if debug:
-        print("-"*80)
-        print(f"FINAL Description: {description}")
-        print(f"FINAL HSN Code: {hsn_code}")
-        print(f"FINAL ASIN: {asin}")
-        print(f"FINAL SKU: {sku}")
-        print("-"*80 + "\n")
-    
-    return description, hsn_code, asin, sku
+# Bump whenever a change to the extraction logic changes its output, so that
+# results cached by an older version are re-extracted
+EXTRACTOR_VERSION = '2'
 
+# Output columns, in CSV order
+INVOICE_FIELDS = [
+    'PDF Filename',
+    'Order Number',
+    'Order Date',
+    'Place of Delivery',
+    'Invoice Number',
+    'Invoice Value',
+    'Description',
+    'Qty',
+    'HSN Code',
+    'ASIN',
+    'SKU',
+    'Payment Transaction ID',
+    'Mode of Payment',
+    'Date & Time',
+    'Shipping Address'
+]
 
-def extract_qty(text, debug=False, hsn_code=None, asin=None):
-    """
-    Extract quantity (Qty) from the invoice table.
-    Uses a 'price-sandwich' strategy: looking for an integer between two currency amounts.
-    """
-    qty = ""
-    
-    if debug:
-        print("\n" + "-"*80)
-        print("QTY EXTRACTION DEBUG:")
-        print(f"Context - HSN: {hsn_code}, ASIN: {asin}")
-        print("-"*80)
-    
-    # Strategy 1: Price-Sandwich Pattern (MOST RELIABLE)
-    # Looking for: ₹UnitPrice Qty ₹NetAmount
-    # Example: ₹189.52 8 ₹1,516.16
-    price_pattern = r'₹\s*[\d,]+\.\d{2}\s+(\d{1,3})\s+₹\s*[\d,]+\.\d{2}'
-    match = re.search(price_pattern, text)
-    if match:
-        qty = match.group(1)
-        if debug: print(f"Found Qty '{qty}' using Price-Sandwich pattern")
-    
-    # Strategy 2: Look for numbers specifically after HSN or ASIN (LANDMARK)
-    if not qty:
-        search_terms = []
-        if hsn_code: search_terms.append(hsn_code)
-        if asin: search_terms.append(asin)
-        
-        for term in search_terms:
-            pos = text.find(term)
-            if pos != -1:
-                after_text = text[pos + len(term):pos + len(term) + 150]
-                # Filter for standalone integers 1-3 digits, not followed by . or , (to avoid decimals)
-                matches = re.finditer(r'(?<![.,\d])\b(\d{1,3})\b(?![.,\d])', after_text)
-                for m in matches:
-                    val = m.group(1)
-                    if val != term:
-                        qty = val
-                        if debug: print(f"Found Qty '{qty}' following landmark '{term}'")
-                        break
-                if qty: break
-
-    # Strategy 3: Find "Qty" column header and get the value below it
-    if not qty:
-        qty_patterns = [
-            r'Qty\s*:?\s*(\d+)',
-            r'Quantity\s*:?\s*(\d+)',
-            r'\bQty\b[^\d]*(\d+)',
-        ]
-        for pattern in qty_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                qty = match.group(1)
-                if debug: print(f"Found Qty using 'Qty' header pattern: {qty}")
-                break
-    
-    if debug:
-        print("-"*80)
-        print(f"FINAL Qty: {qty}")
-        print("-"*80 + "\n")
-    
-    return qty
-
-
-def extract_invoice_data(pdf_path, page_number=2, debug=False):
+
+def extract_invoice_data(pdf_path, page_number=2, debug=False, table_engine='text', profiler=None,
+                         pdf_bytes=None, loader='file'):
     """
     Extract invoice attributes from PDF.
     
     Args:
         pdf_path (str): Path to the PDF file
-        page_number (int): Page number (1-indexed)
+        page_number (int): Page to look at first (1-indexed). The first page
+            that looks like an invoice is used if this one does not.
         debug (bool): Enable debug output
+        table_engine (str): 'text' reads the line-item table from the page
+            text, 'words' from the positioned words (see word_table.py)
+        profiler (ExtractionProfile): Opt-in per-stage timers and counters,
+            accumulated over every call it is passed to
+        pdf_bytes (bytes): Contents of pdf_path if already read (e.g. by
+            pdf_prefetch.iter_prefetched); the PDF is then opened from memory
+            and pdf_path is only used in messages
+        loader (str): 'file' opens pdf_path, 'mmap' memory-maps it (see
+            pdf_loader.py)
         
     Returns:
         dict: Extracted invoice data
     """
-    invoice_data = {
-        'PDF Filename': '',
-        'Order Number': '',
-        'Order Date': '',
-        'Place of Delivery': '',
-        'Invoice Number': '',
-        'Invoice Value': '',
-        'Description': '',
-        'Qty': '',
-        'HSN Code': '',
-        'ASIN': '',
-        'SKU': '',
-        'Payment Transaction ID': '',
-        'Mode of Payment': '',
-        'Date & Time': '',
-        'Shipping Address': ''
-    }
+    profile = profiler if profiler is not None else NULL_PROFILE
+    profile.count('invoices')
+    invoice_data = _empty_invoice_data()
     
     try:
-        doc = fitz.open(pdf_path)
-        
-        if len(doc) < page_number:
-            print(f"Warning: PDF has only {len(doc)} page(s).")
-            page_index = min(len(doc) - 1, 0)
-        else:
-            page_index = page_number - 1
-        
-        page = doc[page_index]
-        text = page.get_text()
+        with profile.stage('fitz.open'):
+            doc = open_pdf(pdf_path, pdf_bytes, loader)
+        
+        # Probe the pages lazily, starting with page_number, and stop at the
+        # first one that looks like an invoice
+        with profile.stage('find_invoice_page'):
+            page, textpage, found = find_invoice_page(doc, page_number)
+        page_index = page.number
+        with profile.stage('page.get_text'):
+            text = page.get_text(textpage=textpage)
+        words = None
+        if table_engine == 'words':
+            with profile.stage('page.get_text_words'):
+                words = page.get_text("words", textpage=textpage)
+        page_count = len(doc)
         doc.close()
         
+        if not found:
+            profile.count('invoice_page.not_found')
+            if page_count < page_number:
+                print(f"Warning: PDF has only {page_count} page(s).")
+            print(f"Warning: No invoice page found, using page {page_index + 1}.")
+        elif page_index != page_number - 1:
+            profile.count('invoice_page.not_on_hinted_page')
+            if debug:
+                print(f"Invoice found on page {page_index + 1} instead of page {page_number}.")
+        
         if debug:
             print("\n" + "="*80)
-            print(f"RAW TEXT FROM PAGE {page_number}:")
+            print(f"RAW TEXT FROM PAGE {page_index + 1}:")
             print("="*80)
             print(text)
             print("="*80 + "\n")
             print("EXTRACTING FIELDS...")
             print("="*80)
         
-        # 1. Order Number
-        patterns = [
-            r'Order\s+(?:Number|No\.?|#)\s*:?\s*([A-Z0-9\-]+)',
-            r'Order\s+ID\s*:?\s*([A-Z0-9\-]+)',
-            r'Order\s*#?\s*:?\s*([A-Z0-9\-]+)',
-        ]
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                invoice_data['Order Number'] = match.group(1).strip()
-                if debug: print(f"✓ Order Number: {invoice_data['Order Number']}")
-                break
-        if debug and not invoice_data['Order Number']:
-            print("✗ Order Number: Not found")
-        
-        # 2. Order Date (Format: DD.MM.YYYY like 02.11.2025)
-        patterns = [
-            r'Order\s+Date\s*:?\s*(\d{2}\.\d{2}\.\d{4})',
-            r'Order\s+Date\s*:?\s*(\d{1,2}[./]\d{1,2}[./]\d{2,4})',
-            r'Ordered\s+on\s*:?\s*(\d{1,2}[./]\d{1,2}[./]\d{2,4})',
-        ]
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                invoice_data['Order Date'] = match.group(1).strip()
-                if debug: print(f"✓ Order Date: {invoice_data['Order Date']}")
-                break
-        if debug and not invoice_data['Order Date']:
-            print("✗ Order Date: Not found")
-        
-        # 3. Place of Delivery
-        patterns = [
-            r'Place\s+of\s+Delivery\s*:?\s*([^\n]+)',
-            r'Delivery\s+(?:Location|Place)\s*:?\s*([^\n]+)',
-            r'Deliver\s+to\s*:?\s*([^\n]+)',
-        ]
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                invoice_data['Place of Delivery'] = match.group(1).strip()
-                if debug: print(f"✓ Place of Delivery: {invoice_data['Place of Delivery']}")
-                break
-        if debug and not invoice_data['Place of Delivery']:
-            print("✗ Place of Delivery: Not found")
-        
-        # 4. Invoice Number
-        patterns = [
-            r'Invoice\s+(?:Number|No\.?|#)\s*:?\s*([A-Z0-9\-]+)',
-            r'Invoice\s+ID\s*:?\s*([A-Z0-9\-]+)',
-            r'Invoice\s*#?\s*:?\s*([A-Z0-9\-]+)',
-        ]
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                invoice_data['Invoice Number'] = match.group(1).strip()
-                if debug: print(f"✓ Invoice Number: {invoice_data['Invoice Number']}")
-                break
-        if debug and not invoice_data['Invoice Number']:
-            print("✗ Invoice Number: Not found")
-        
-        # 5. Invoice Value / Total Amount
-        patterns = [
-            r'TOTAL\s*:?\s*[₹$€£]?\s*[\d,]+\.?\d*\s*[₹$€£]?\s*([\d,]+\.?\d*)',
-            r'Grand\s+Total\s*:?\s*[₹$€£]?\s*([\d,]+\.?\d*)',
-            r'Total\s+Amount\s*:?\s*[₹$€£]?\s*([\d,]+\.?\d*)',
-            r'Invoice\s+(?:Value|Amount|Total)\s*:?\s*[₹$€£]?\s*([\d,]+\.?\d*)',
-        ]
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                invoice_data['Invoice Value'] = match.group(1).strip()
-                if debug: print(f"✓ Invoice Value: {invoice_data['Invoice Value']}")
-                break
-        if debug and not invoice_data['Invoice Value']:
-            print("✗ Invoice Value: Not found")
-        
-        # 6, 7, 8, 9. Description, HSN Code, ASIN, and SKU - Extract together
-        description, hsn_code, asin, sku = extract_description_hsn_asin_sku(text, debug)
-        invoice_data['Description'] = description
-        invoice_data['HSN Code'] = hsn_code
-        invoice_data['ASIN'] = asin
-        invoice_data['SKU'] = sku
-        
-        # Extract Qty
-        qty = extract_qty(text, debug, hsn_code=hsn_code, asin=asin)
-        invoice_data['Qty'] = qty
-        
-        if not debug:
-            # Only print in non-debug mode
-            if description:
-                print(f"✓ Description: {description}")
-            else:
-                print("✗ Description: Not found")
-            if qty:
-                print(f"✓ Qty: {qty}")
-            else:
-                print("✗ Qty: Not found")
-            if hsn_code:
-                print(f"✓ HSN Code: {hsn_code}")
-            else:
-                print("✗ HSN Code: Not found")
-            if asin:
-                print(f"✓ ASIN: {asin}")
-            else:
-                print("✗ ASIN: Not found")
-            if sku:
-                print(f"✓ SKU: {sku}")
-            else:
-                print("✗ SKU: Not found")
-        
-        # 10. Payment Transaction ID
-        patterns = [
-            r'(?:Payment\s+)?Transaction\s+(?:ID|No\.?|#)\s*:?\s*([A-Z0-9\-]+)',
-            r'Transaction\s+Reference\s*:?\s*([A-Z0-9\-]+)',
-            r'Payment\s+ID\s*:?\s*([A-Z0-9\-]+)',
-            r'UTR\s*(?:Number|No\.?)?\s*:?\s*([A-Z0-9\-]+)',
-        ]
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                invoice_data['Payment Transaction ID'] = match.group(1).strip()
-                if debug: print(f"✓ Payment Transaction ID: {invoice_data['Payment Transaction ID']}")
-                break
-        if debug and not invoice_data['Payment Transaction ID']:
-            print("✗ Payment Transaction ID: Not found")
-        
-        # 11. Mode of Payment (e.g., "NetBanking")
-        patterns = [
-            r'Mode\s+of\s+Payment\s*:?\s*([^\n]+)',
-            r'Payment\s+(?:Mode|Method)\s*:?\s*([^\n]+)',
-            r'Payment\s+Type\s*:?\s*([^\n]+)',
-        ]
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                invoice_data['Mode of Payment'] = match.group(1).strip()
-                if debug: print(f"✓ Mode of Payment: {invoice_data['Mode of Payment']}")
-                break
-        if debug and not invoice_data['Mode of Payment']:
-            print("✗ Mode of Payment: Not found")
-        
-        # 12. Date & Time (Format: 02/11/2025,12:58:05 hrs)
-        patterns = [
-            r'Date\s+(?:&|and)\s+Time\s*:?\s*(\d{2}/\d{2}/\d{4},\s*\d{2}:\d{2}:\d{2}\s*hrs?)',
-            r'Date\s+(?:&|and)\s+Time\s*:?\s*(\d{1,2}/\d{1,2}/\d{4},\s*\d{1,2}:\d{2}:\d{2}\s*hrs?)',
-            r'Date\s*&\s*Time\s*:?\s*(\d{1,2}/\d{1,2}/\d{4},\s*\d{1,2}:\d{2}:\d{2})',
-        ]
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                invoice_data['Date & Time'] = match.group(1).strip()
-                if debug: print(f"✓ Date & Time: {invoice_data['Date & Time']}")
-                break
-        if debug and not invoice_data['Date & Time']:
-            print("✗ Date & Time: Not found")
-        
-        # 13. Shipping Address
-        patterns = [
-            r'Shipping\s+Address\s*:?\s*([^\n]+(?:\n(?!\s*(?:Order|Invoice|Payment|Mode|Date|TOTAL))[^\n]+){0,5})',
-            r'Delivery\s+Address\s*:?\s*([^\n]+(?:\n(?!\s*(?:Order|Invoice|Payment|Mode|Date|TOTAL))[^\n]+){0,5})',
-            r'Ship\s+To\s*:?\s*([^\n]+(?:\n(?!\s*(?:Order|Invoice|Payment|Mode|Date|TOTAL))[^\n]+){0,5})',
-        ]
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                address = match.group(1).strip()
-                invoice_data['Shipping Address'] = ' '.join(address.split())
-                if debug: print(f"✓ Shipping Address: {invoice_data['Shipping Address']}")
-                break
-        if debug and not invoice_data['Shipping Address']:
-            print("✗ Shipping Address: Not found")
+        parse_invoice_text(text, invoice_data, debug, words=words, profile=profile)
         
         return invoice_data
         
     except Exception as e:
+        profile.count('errors')
         print(f"Error: {str(e)}")
         import traceback
         traceback.print_exc()
         return invoice_data
 
 
-def save_to_csv(data, csv_path='invoice_data.csv'):
-    """Save extracted data to CSV."""
-    try:
-        if isinstance(data, dict):
-            data = [data]
+def _empty_invoice_data():
+    """Blank record used when a PDF could not be processed at all."""
+    return {field: '' for field in INVOICE_FIELDS}
+
+
+class InvoiceCSVWriter:
+    """
+    Row-at-a-time CSV writer for the streaming batch pipeline.
+    
+    Rows are formatted into a small in-memory buffer and written to disk every
+    flush_every rows (and on close), followed by an fsync. The file therefore
+    only ever holds whole rows, and everything up to the last flush survives
+    a crash.
+    
+    Usage:
+        with InvoiceCSVWriter(output_file, append=True) as writer:
+            for data in iter_invoice_records(iter_pdf_files(directory_path)):
+                writer.write(data)
+    """
+    
+    def __init__(self, csv_path, fieldnames=INVOICE_FIELDS, append=False, flush_every=50,
+                 on_flush=None):
+        """
+        Args:
+            csv_path (str): Output CSV path
+            fieldnames (list): Columns of a new file. When appending to an
+                existing file its own header is used instead.
+            append (bool): Keep the existing rows and skip records whose
+                Invoice Number (or Order Number) is already in the file
+            flush_every (int): Number of rows buffered between writes to disk
+            on_flush (callable): Called with no arguments each time the rows
+                written so far are safely on disk (e.g. CheckpointManifest.commit)
+        """
+        self.csv_path = csv_path
+        self.flush_every = flush_every
+        self.on_flush = on_flush
+        self.written = 0
+        self.skipped = 0
+        self._pending = 0
+        self._keys = None  # invoice keys seen so far, only tracked in append mode
+        
+        existing = append and os.path.exists(csv_path) and os.path.getsize(csv_path) > 0
+        if existing:
+            existing_fields, self._keys = load_invoice_keys(csv_path)
+            fieldnames = existing_fields or fieldnames
+        elif append:
+            self._keys = set()
+        self.fieldnames = list(fieldnames)
+        
+        self._buffer = io.StringIO()
+        self._writer = csv.DictWriter(self._buffer, fieldnames=self.fieldnames,
+                                      restval='', extrasaction='ignore')
+        self._file = open(csv_path, 'ab' if existing else 'wb')
+        if existing:
+            # Make sure the first new row starts on its own line
+            with open(csv_path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) not in (b'\n', b'\r'):
+                    self._buffer.write('\r\n')
+        else:
+            self._writer.writeheader()
+        self.flush()
+    
+    def write(self, data):
+        """
+        Queue one record for writing.
+        
+        Returns:
+            bool: False if the record was skipped as a duplicate
+        """
+        if self._keys is not None:
+            key = invoice_key(data)
+            if key is not None:
+                if key in self._keys:
+                    self.skipped += 1
+                    return False
+                self._keys.add(key)
+        
+        self._writer.writerow(data)
+        self.written += 1
+        self._pending += 1
+        if self._pending >= self.flush_every:
+            self.flush()
+        return True
+    
+    def flush(self):
+        """Write the buffered rows to disk and fsync the file."""
+        chunk = self._buffer.getvalue()
+        if chunk:
+            self._file.write(chunk.encode('utf-8'))
+            self._buffer.seek(0)
+            self._buffer.truncate()
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._pending = 0
+        if self.on_flush is not None:
+            self.on_flush()
+    
+    def close(self):
+        self.flush()
+        self._file.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def iter_pdf_files(directory_path):
+    """
+    Lazily yield the paths of the PDF files in a directory.
+    
+    Unlike glob.glob, the directory listing is never materialised, so folders
+    with hundreds of thousands of invoices start processing immediately.
+    
+    Args:
+        directory_path (str): Directory to scan (not recursive)
         
-        if not data:
-            print("No data to save!")
+    Yields:
+        str: Path of each *.pdf file, in directory order
+    """
+    with os.scandir(directory_path) as entries:
+        for entry in entries:
+            if entry.name.endswith('.pdf') and not entry.name.startswith('.') and entry.is_file():
+                yield entry.path
+
+
+def iter_pdf_sources(directory_path, archives=False):
+    """
+    Lazily yield the PDFs of a directory, optionally including the PDFs inside
+    its ZIP / TAR archives, which are streamed without unpacking them.
+    
+    Args:
+        directory_path (str): Directory to scan (not recursive)
+        archives (bool): Also read *.zip, *.tar, *.tar.gz, ... files (see
+            invoice_archive.py). An archive that cannot be read is reported
+            and skipped, after the members read before the error.
+        
+    Yields:
+        str or tuple: The path of each *.pdf file, and (member path, bytes)
+            for each PDF inside an archive, in directory order. Both forms are
+            accepted by iter_invoice_records().
+    """
+    if not archives:
+        yield from iter_pdf_files(directory_path)
+        return
+    
+    with os.scandir(directory_path) as entries:
+        for entry in entries:
+            if entry.name.startswith('.') or not entry.is_file():
+                continue
+            if entry.name.endswith('.pdf'):
+                yield entry.path
+            elif is_archive(entry.name):
+                try:
+                    yield from iter_archive_pdfs(entry.path)
+                except (OSError, zipfile.BadZipFile, tarfile.TarError) as e:
+                    print(f"✗ Could not read archive {entry.name}: {e}")
+
+
+def source_path(source):
+    """Path of an iter_pdf_sources() item."""
+    return source[0] if isinstance(source, tuple) else source
+
+
+def _hash_members(sources, hashes):
+    """Pass sources through, noting the SHA-256 of every archive member in hashes while its bytes are at hand."""
+    for source in sources:
+        if isinstance(source, tuple):
+            hashes[source[0]] = hashlib.sha256(source[1]).hexdigest()
+        yield source
+
+
+def _extract_with_profile(pdf_path, page_number, debug, table_engine, pdf_bytes=None, loader='file'):
+    """extract_invoice_data with a fresh profile; runs in a worker process and returns (data, profile dict)."""
+    profile = ExtractionProfile()
+    data = extract_invoice_data(pdf_path, page_number, debug, table_engine, profiler=profile,
+                                pdf_bytes=pdf_bytes, loader=loader)
+    return data, profile.to_dict()
+
+
+def _read_ahead(pdf_files, prefetch, cache, page_number):
+    """
+    Pair every PDF with its contents, read ahead by prefetch threads.
+
+    PDFs already in memory (archive members) keep their bytes. PDFs the cache
+    already holds are not read (their bytes are None), and with prefetch=0
+    nothing is read ahead: every PDF file is read when it is opened.
+
+    Yields:
+        tuple: (pdf_file, bytes or None), in the same order as pdf_files
+    """
+    sources = (source if isinstance(source, tuple) else (source, None) for source in pdf_files)
+    if not prefetch:
+        return sources
+    
+    def path(source):
+        pdf_file, pdf_bytes = source
+        if pdf_bytes is not None or (cache is not None and cache.peek(pdf_file, page_number)):
+            return None
+        return pdf_file
+    
+    return ((pdf_file, pdf_bytes if pdf_bytes is not None else read)
+            for (pdf_file, pdf_bytes), read in iter_prefetched(sources, path, threads=prefetch))
+
+
+def _finish_record(pdf_file, content_hash, pending, page_number, cache, failed, progress,
+                   profiler=None):
+    """Turn a queued parallel-mode entry into its record, waiting for the worker if needed."""
+    filename = source_name(pdf_file)
+    if isinstance(pending, Future):
+        try:
+            data = pending.result()
+            if profiler is not None:
+                data, worker_profile = data
+                profiler.merge(worker_profile)
+            if cache is not None:
+                cache.put(content_hash, page_number, data)
+        except Exception as e:
+            print(f"Error processing {filename}: {str(e)}")
+            data = _empty_invoice_data()
+            failed.append(filename)
+        print(f"[{progress}] Done: {filename}")
+    else:
+        data = pending
+    
+    data['PDF Filename'] = filename
+    return pdf_file, data
+
+
+def _rerun_one_by_one(window, submit):
+    """
+    Re-extract the files a broken process pool lost, each in a fresh
+    single-worker pool, so that only a PDF that crashes its own worker fails.
+    
+    Args:
+        window (deque): Parallel-mode entries (pdf_file, content_hash, pending,
+            pdf_bytes); lost entries get their new Future in place
+        submit (callable): (executor, pdf_file, pdf_bytes) -> Future
+    """
+    executor = ProcessPoolExecutor(max_workers=1)
+    try:
+        for i, (pdf_file, content_hash, pending, pdf_bytes) in enumerate(window):
+            if not (isinstance(pending, Future) and isinstance(pending.exception(), BrokenProcessPool)):
+                continue
+            future = submit(executor, pdf_file, pdf_bytes)
+            if isinstance(future.exception(), BrokenProcessPool):
+                # This is the PDF that kills its worker
+                future = Future()
+                future.set_exception(RuntimeError("the worker process died while extracting this PDF"))
+                executor.shutdown(wait=True)
+                executor = ProcessPoolExecutor(max_workers=1)
+            window[i] = (pdf_file, content_hash, future, pdf_bytes)
+    finally:
+        executor.shutdown(wait=True)
+
+
+def iter_invoice_records(pdf_files, page_number=2, debug=False, workers=1, cache=None,
+                         table_engine='text', profiler=None, prefetch=0, loader='file'):
+    """
+    Extract invoices one by one, yielding each record as soon as it is ready.
+    
+    pdf_files can be any iterable, including the lazy iter_pdf_files() and
+    iter_pdf_sources(), and is consumed as processing goes. In parallel mode at
+    most workers * 4 PDFs are queued at any time, so memory use does not
+    depend on the number of files.
+    
+    Args:
+        pdf_files (iterable): Paths of the PDF files to process, or
+            (path, bytes) pairs for PDFs already in memory, such as archive
+            members (see invoice_archive.py). PDF Filename is the file name,
+            or "<archive file name>!<member name>" for an archive member.
+        page_number (int): Page number (1-indexed)
+        debug (bool): Enable debug output
+        workers (int): Number of worker processes. 1 keeps the original
+            sequential loop, None uses every available CPU core.
+        cache (ExtractionCache): Optional extraction cache. PDFs already
+            extracted by this EXTRACTOR_VERSION are served from it, and newly
+            extracted ones are added to it.
+        table_engine (str): 'text' or 'words', see extract_invoice_data
+        profiler (ExtractionProfile): Opt-in per-stage timers and counters for
+            the whole batch. In parallel mode every worker profiles its own
+            invoices and the totals are merged in here.
+        prefetch (int): Threads reading PDFs ahead of the extraction (see
+            pdf_prefetch.py), so that slow reads, e.g. from a network share,
+            overlap with parsing. Up to prefetch * 4 PDFs are held in memory;
+            in parallel mode they are handed to the workers as bytes. 0 lets
+            every PDF be read when it is opened. Not used with loader='mmap'.
+        loader (str): How PDFs that were not read ahead are opened: 'file'
+            or 'mmap', see pdf_loader.py
+        
+    Yields:
+        tuple: (pdf_file, record) for every PDF, in the same order as pdf_files
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    total = len(pdf_files) if hasattr(pdf_files, '__len__') else None
+    cached = 0
+    extracted = 0
+    
+    def progress(n):
+        return f"{n}/{total}" if total is not None else str(n)
+    
+    # Mapped PDFs are paged in by the parser itself; reading them ahead
+    # would only add a full copy of every file
+    sources = _read_ahead(pdf_files, prefetch if loader == 'file' else 0, cache, page_number)
+    
+    if workers <= 1:
+        for n, (pdf_file, pdf_bytes) in enumerate(sources, 1):
+            filename = source_name(pdf_file)
+            content_hash, data = None, None
+            if cache is not None:
+                content_hash, data = cache.get(pdf_file, page_number, pdf_bytes)
+            
+            if data is not None:
+                cached += 1
+            else:
+                print(f"\n{'='*80}")
+                print(f"[{progress(n)}] Processing: {filename}")
+                print(f"{'='*80}")
+                
+                data = extract_invoice_data(pdf_file, page_number, debug, table_engine, profiler,
+                                            pdf_bytes, loader)
+                extracted += 1
+                if cache is not None:
+                    cache.put(content_hash, page_number, data)
+            
+            data['PDF Filename'] = filename
+            yield pdf_file, data
+    else:
+        # Parallel mode: fan the files out over a process pool through a bounded
+        # window. Results are yielded in submission order so the output stays
+        # deterministic, and a failed file (e.g. a worker crashing on a corrupt
+        # PDF) becomes a blank record instead of aborting the whole run.
+        print(f"\nProcessing with {workers} worker processes")
+        max_in_flight = workers * 4
+        window = deque()  # (pdf_file, content_hash, Future or cached record, pdf_bytes)
+        failed = []
+        done = 0
+        
+        def submit(pool, pdf_file, pdf_bytes):
+            if profiler is not None:
+                return pool.submit(_extract_with_profile, pdf_file, page_number, debug,
+                                   table_engine, pdf_bytes, loader)
+            return pool.submit(extract_invoice_data, pdf_file, page_number, debug,
+                               table_engine, pdf_bytes=pdf_bytes, loader=loader)
+        
+        def restart_pool():
+            # A worker died (segfault, OOM...) and took the pool down with every
+            # file still queued on it. Those files are re-run one at a time, so
+            # only the PDF that kills its worker becomes a failed record.
+            nonlocal executor
+            executor.shutdown(wait=True)
+            print("\n✗ A worker process died; re-running the unfinished PDFs one at a time")
+            _rerun_one_by_one(window, submit)
+            executor = ProcessPoolExecutor(max_workers=workers)
+        
+        executor = ProcessPoolExecutor(max_workers=workers)
+        try:
+            for pdf_file, pdf_bytes in itertools.chain(sources, [(None, None)]):
+                if pdf_file is not None:
+                    content_hash, data = None, None
+                    if cache is not None:
+                        content_hash, data = cache.get(pdf_file, page_number, pdf_bytes)
+                    if data is not None:
+                        cached += 1
+                    else:
+                        try:
+                            data = submit(executor, pdf_file, pdf_bytes)
+                        except BrokenProcessPool:
+                            restart_pool()
+                            data = submit(executor, pdf_file, pdf_bytes)
+                        extracted += 1
+                    window.append((pdf_file, content_hash, data, pdf_bytes))
+                
+                # Drain down to the window size, or completely once the input is exhausted
+                while window and (pdf_file is None or len(window) >= max_in_flight):
+                    pending = window[0][2]
+                    if isinstance(pending, Future) and isinstance(pending.exception(), BrokenProcessPool):
+                        restart_pool()
+                    done += 1
+                    entry_file, content_hash, pending, _ = window.popleft()
+                    yield _finish_record(entry_file, content_hash, pending, page_number, cache, failed,
+                                         progress(done), profiler)
+        finally:
+            # Also reached when the consumer stops early: drop the queued work
+            executor.shutdown(wait=True, cancel_futures=True)
+        
+        if failed:
+            print(f"\n✗ {len(failed)} file(s) failed: {', '.join(failed)}")
+    
+    if profiler is not None:
+        profiler.count('cache.hits', cached)
+    if cache is not None:
+        print(f"\nCache: {cached} PDF(s) unchanged, {extracted} extracted")
+
+
+def _batched(iterable, size):
+    """Yield lists of up to size consecutive items."""
+    iterator = iter(iterable)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
             return
-        
-        with open(csv_path, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=data[0].keys())
-            writer.writeheader()
-            writer.writerows(data)
-        
-        print(f"\n{'='*80}")
-        print(f"✓ SUCCESS: Data saved to {csv_path}")
-        print(f"  Total records: {len(data)}")
-        print(f"{'='*80}")
-        
-    except Exception as e:
-        print(f"Error saving CSV: {str(e)}")
+        yield batch
+
+
+def _results_ahead(futures, depth):
+    """
+    Yield the results of lazily submitted futures in order, keeping up to
+    depth of them submitted ahead so the process pool never runs dry.
+    """
+    window = deque()
+    for future in futures:
+        window.append(future)
+        if len(window) >= depth:
+            yield window.popleft().result()
+    while window:
+        yield window.popleft().result()
+
+
+def _parse_invoice_pages(invoices, debug=False):
+    """Parse a batch of (first page index, text) invoices; runs in a worker process."""
+    return [(first_page, parse_invoice_text(text, _empty_invoice_data(), debug))
+            for first_page, text in invoices]
+
+
+def iter_document_invoices(pdf_path, debug=False, workers=1, pages_per_task=25, loader='file'):
+    """
+    Extract every invoice of a multi-invoice PDF, e.g. a Seller Central bulk
+    download with hundreds of invoices in one file.
+    
+    Every page is classified with the page locator's invoice markers and the
+    pages are grouped into invoices (see group_invoice_pages). In parallel mode
+    the document is read in ranges of pages_per_task pages by several worker
+    processes, and the grouped invoices are parsed in batches on the same pool.
+    
+    Args:
+        pdf_path (str): Path to the PDF file
+        debug (bool): Enable debug output
+        workers (int): Number of worker processes. None uses every available
+            CPU core.
+        pages_per_task (int): Pages read, and invoices parsed, per worker task
+        loader (str): 'file' or 'mmap', see pdf_loader.py. With 'mmap' the
+            workers reading page ranges share the mapped pages of the file.
+        
+    Yields:
+        dict: One record per invoice, in page order. PDF Filename is
+            "<file>.pdf#page=<first page of the invoice>".
+    
+    Raises:
+        Exception: Whatever reading or parsing the document raised, after the
+            records of the invoices before the failure were yielded. The
+            caller decides whether the partly extracted document is done.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    filename = os.path.basename(pdf_path)
+    
+    with open_pdf(pdf_path, loader=loader) as doc:
+        page_count = len(doc)
+    ranges = [(start, min(start + pages_per_task, page_count))
+              for start in range(0, page_count, pages_per_task)]
+    
+    if workers <= 1:
+        pages = itertools.chain.from_iterable(
+            read_invoice_pages(pdf_path, start, stop, loader) for start, stop in ranges)
+        for first_page, text in group_invoice_pages(pages):
+            data = parse_invoice_text(text, _empty_invoice_data(), debug)
+            data['PDF Filename'] = f"{filename}#page={first_page + 1}"
+            yield data
+    else:
+        # Page ranges are read and invoice batches parsed on the same pool;
+        # both stages keep workers * 2 tasks queued ahead of the consumer
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pages = itertools.chain.from_iterable(_results_ahead(
+                (executor.submit(read_invoice_pages, pdf_path, start, stop, loader)
+                 for start, stop in ranges),
+                workers * 2))
+            parsed = _results_ahead(
+                (executor.submit(_parse_invoice_pages, batch, debug)
+                 for batch in _batched(group_invoice_pages(pages), pages_per_task)),
+                workers * 2)
+            for batch in parsed:
+                for first_page, data in batch:
+                    data['PDF Filename'] = f"{filename}#page={first_page + 1}"
+                    yield data
 
 
-def process_multiple_pdfs(pdf_files, page_number=2, debug=False):
-    """Process multiple PDF files."""
-    results = []
+def process_multiple_pdfs(pdf_files, page_number=2, debug=False, workers=1, cache=None,
+                          table_engine='text', profiler=None, prefetch=0, loader='file'):
+    """
+    Process multiple PDF files.
     
-    for i, pdf_file in enumerate(pdf_files, 1):
-        filename = os.path.basename(pdf_file)
-        print(f"\n{'='*80}")
-        print(f"[{i}/{len(pdf_files)}] Processing: {filename}")
-        print(f"{'='*80}")
+    Args:
+        pdf_files (list): Paths of the PDF files to process
+        page_number (int): Page number (1-indexed)
+        debug (bool): Enable debug output
+        workers (int): Number of worker processes. 1 keeps the original
+            sequential loop, None uses every available CPU core.
+        cache (ExtractionCache): Optional extraction cache. PDFs already
+            extracted by this EXTRACTOR_VERSION are served from it, and newly
+            extracted ones are added to it.
+        table_engine (str): 'text' or 'words', see extract_invoice_data
+        profiler (ExtractionProfile): Opt-in per-stage timers and counters
+        prefetch (int): Threads reading PDFs ahead of the extraction
+        loader (str): 'file' or 'mmap', see pdf_loader.py
         
-        data = extract_invoice_data(pdf_file, page_number, debug)
-        data['PDF Filename'] = filename
-        results.append(data)
+    Returns:
+        list: One dict per PDF, in the same order as pdf_files
+    """
+    records = iter_invoice_records(pdf_files, page_number, debug, workers=workers, cache=cache,
+                                   table_engine=table_engine, profiler=profiler, prefetch=prefetch, loader=loader)
+    return [data for _, data in records]
+
+
+def print_record_summary(n, data):
+    """Print the key fields of one extracted record."""
+    print(f"\n[{n}] {data.get('PDF Filename', 'Unknown')}")
+    print("-"*80)
+    
+    # Show key fields
+    fields_to_show = ['Order Number', 'Invoice Number', 'Invoice Value', 
+                     'Description', 'Qty', 'ASIN', 'SKU', 'HSN Code']
     
-    return results
+    for key in fields_to_show:
+        value = data.get(key, '')
+        status = "✓" if value else "✗"
+        display_value = value if value else "(not found)"
+        
+        # Truncate long descriptions
+        if key == "Description" and len(display_value) > 60:
+            display_value = display_value[:60] + "..."
+        
+        print(f"  {status} {key:20s}: {display_value}")
 
 
 def main():
     """Main function."""
+    parser = argparse.ArgumentParser(description="Extract Amazon invoice PDFs in a directory to CSV.")
+    parser.add_argument('--resume', action='store_true',
+                        help="Skip the PDFs an interrupted run already wrote to the output CSV")
+    args = parser.parse_args()
+    
     # Configuration
     directory_path = "/Users/senthilpalanivelu/Desktop/amazon_invoice"  # Change to your directory path
+    output_file = '/Users/senthilpalanivelu/Desktop/google_analytics/new_invoices.csv'
+    manifest_path = output_file + '.manifest.jsonl'  # Checkpoint log used by --resume
     page_number = 2  # Page to extract from (1-indexed)
     debug_mode = False  # Set to True to see detailed extraction info for each PDF
+    table_engine = 'text'  # 'words' reads the item table from word positions instead
+    num_workers = os.cpu_count() or 1  # Set to 1 to process PDFs one at a time
+    prefetch_threads = 4  # Threads reading PDFs ahead of the parser (0 = read each PDF when it is opened)
+    pdf_loader = 'file'  # 'mmap' memory-maps each PDF instead (large multi-invoice PDFs)
+    cache_path = os.path.join(directory_path, '.invoice_cache.sqlite')  # Set to None to re-extract every PDF
+    append_mode = False  # Set to True to add new invoices to an existing CSV (skips duplicates)
+    multi_invoice_mode = False  # Set to True for PDFs holding many invoices (one CSV row per invoice)
+    include_archives = False  # Set to True to also read the PDFs inside *.zip / *.tar.gz files, without unpacking
+    profile_path = None  # Set to e.g. output_file + '.profile.json' for per-stage timings and counters
+    
+    # A resumed run always continues the existing CSV
+    append_mode = append_mode or args.resume
     
     print("="*80)
     print("INVOICE DATA EXTRACTOR - BATCH PROCESSING")
     print("Extracts clean Description (without serial numbers), HSN, ASIN, and SKU")
     print("="*80)
     print(f"Directory: {directory_path}")
+    print(f"Output: {output_file}")
     print(f"Page: {page_number}")
     print(f"Debug: {debug_mode}")
+    print(f"Table engine: {table_engine}")
+    print(f"Workers: {num_workers}")
+    print(f"Prefetch threads: {prefetch_threads}")
+    print(f"PDF loader: {pdf_loader}")
+    print(f"Cache: {cache_path}")
+    print(f"Multi-invoice PDFs: {multi_invoice_mode}")
+    print(f"Archives: {include_archives}")
+    print(f"Profile: {profile_path}")
+    print(f"Resume: {args.resume}")
     print("="*80)
     
-    # Find all PDF files in the directory
-    import glob
-    pdf_files = glob.glob(os.path.join(directory_path, "*.pdf"))
-    
-    if not pdf_files:
+    # Find the PDF files lazily; only check that there is at least one.
+    # Archive members are single-invoice PDFs, so multi-invoice mode skips archives.
+    pdf_files = iter_pdf_sources(directory_path, archives=include_archives and not multi_invoice_mode)
+    first_pdf = next(pdf_files, None)
+    if first_pdf is None:
         print(f"\nNo PDF files found in: {directory_path}")
         return
+    pdf_files = itertools.chain([first_pdf], pdf_files)
     
-    print(f"\nFound {len(pdf_files)} PDF file(s)")
-    print("="*80)
-    
-    # Process all PDFs
-    all_data = process_multiple_pdfs(pdf_files, page_number, debug_mode)
-    
-    # Display summary for each file
-    print("\n" + "="*80)
-    print("EXTRACTION SUMMARY:")
-    print("="*80)
-    for i, data in enumerate(all_data, 1):
-        print(f"\n[{i}/{len(all_data)}] {data.get('PDF Filename', 'Unknown')}")
-        print("-"*80)
-        
-        # Show key fields
-        fields_to_show = ['Order Number', 'Invoice Number', 'Invoice Value', 
-                         'Description', 'Qty', 'ASIN', 'SKU', 'HSN Code']
-        
-        for key in fields_to_show:
-            value = data.get(key, '')
-            status = "✓" if value else "✗"
-            display_value = value if value else "(not found)"
+    # Stream every record straight to the CSV as it is extracted (unchanged
+    # PDFs come straight from the cache). The manifest records each PDF once
+    # its row is on disk, so --resume can skip it next time.
+    n = 0
+    resumed = 0
+    failed = 0
+    # Each table engine gets its own cache entries
+    cache = ExtractionCache(cache_path, f"{EXTRACTOR_VERSION}/{table_engine}") if cache_path else None
+    # Multi-invoice PDFs are parsed page group by page group and not profiled
+    profiler = ExtractionProfile() if profile_path else None
+    member_hashes = {}
+    try:
+        with CheckpointManifest(manifest_path, resume=args.resume) as manifest, \
+             InvoiceCSVWriter(output_file, append=append_mode, on_flush=manifest.commit) as writer:
+            if args.resume:
+                resumed = len(manifest.done)
+                print(f"\nResuming: {resumed} PDF(s) already done")
+                pdf_files = (source for source in pdf_files if not manifest.is_done(source_path(source)))
             
-            # Truncate long descriptions
-            if key == "Description" and len(display_value) > 60:
-                display_value = display_value[:60] + "..."
+            if cache is None:
+                # Archive members are hashed for the manifest as they stream
+                # past instead of being read from their archive a second time
+                pdf_files = _hash_members(pdf_files, member_hashes)
             
-            print(f"  {status} {key:20s}: {display_value}")
+            if multi_invoice_mode:
+                # Every PDF yields any number of invoices; extracted records
+                # are not cached (the cache holds one page per PDF) and the
+                # table is read from the page text, as invoices can span pages
+                documents = ((pdf_file, iter_document_invoices(pdf_file, debug_mode, workers=num_workers,
+                                                                 loader=pdf_loader))
+                             for pdf_file in pdf_files)
+            else:
+                records = iter_invoice_records(pdf_files, page_number, debug_mode,
+                                               workers=num_workers, cache=cache,
+                                               table_engine=table_engine, profiler=profiler,
+                                               prefetch=prefetch_threads, loader=pdf_loader)
+                documents = ((pdf_file, [data]) for pdf_file, data in records)
+            
+            for pdf_file, records in documents:
+                statuses = set()
+                try:
+                    for data in records:
+                        n += 1
+                        if writer.write(data):
+                            statuses.add('ok' if invoice_key(data) else 'empty')
+                        else:
+                            statuses.add('duplicate')
+                        print_record_summary(n, data)
+                except Exception as e:
+                    # Only multi-invoice documents raise here. The invoices
+                    # before the failure are kept, but the document is left
+                    # out of the manifest so --resume extracts it again (its
+                    # rows already in the CSV are then skipped as duplicates).
+                    failed += 1
+                    print(f"✗ Error processing {os.path.basename(pdf_file)}: {str(e)}")
+                    continue
+                
+                # Committed by the writer's next flush, i.e. never before every
+                # row of the PDF is on disk
+                status = next((status for status in ('ok', 'duplicate') if status in statuses), 'empty')
+                if cache is not None:
+                    content_hash = cache.file_hash(pdf_file)
+                else:
+                    content_hash = member_hashes.pop(pdf_file, None) or file_sha256(pdf_file)
+                manifest.add(pdf_file, content_hash, status)
+    finally:
+        if cache is not None:
+            cache.close()
     
-    # Save all data to CSV
-    print("\n" + "="*80)
-    output_file = '/Users/senthilpalanivelu/Desktop/google_analytics/new_invoices.csv'
-    save_to_csv(all_data, output_file)
-    print(f"\n✓ Processed {len(all_data)} invoice(s)")
+    print(f"\n{'='*80}")
+    print(f"✓ SUCCESS: Data saved to {output_file}")
+    print(f"  New records: {writer.written}")
+    if append_mode:
+        print(f"  Duplicates skipped: {writer.skipped}")
+    print(f"{'='*80}")
+    print(f"\n✓ Processed {n} invoice(s)")
+    if failed:
+        print(f"✗ {failed} PDF(s) failed part-way and were not marked done; run with --resume to retry them")
+    if args.resume:
+        print(f"✓ Skipped {resumed} PDF(s) finished by an earlier run")
     print(f"✓ Results saved to: {output_file}")
+    if profiler is not None:
+        profiler.write_json(profile_path)
+        print(f"✓ Extraction profile saved to: {profile_path}")
 
 
 if __name__ == "__main__":
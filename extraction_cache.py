@@ -0,0 +1,166 @@
+"""
+Extraction Cache
+Persistent on-disk cache of extracted invoice data, keyed by PDF content hash.
+
+Invoices never change after they are issued, so a PDF whose bytes have already
+been parsed by the current extractor version does not need to be opened again.
+To avoid even reading unchanged files, the SHA-256 of each path is remembered
+together with its size and modification time; the file is only re-hashed when
+one of those changes. PDFs inside archives (see invoice_archive.py) are
+remembered by member path, with the size and modification time of their archive.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+
+from invoice_archive import source_stat
+
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    """Return the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """
+    SQLite-backed cache of extract_invoice_data results.
+
+    Usage:
+        with ExtractionCache('invoices.cache.sqlite', EXTRACTOR_VERSION) as cache:
+            content_hash, data = cache.get(pdf_path, page_number)
+            if data is None:
+                data = extract_invoice_data(pdf_path, page_number)
+                cache.put(content_hash, page_number, data)
+
+    Entries written by a different extractor version are treated as misses and
+    overwritten on the next put.
+    """
+
+    def __init__(self, db_path, extractor_version, commit_every=500):
+        self.db_path = db_path
+        self.extractor_version = str(extractor_version)
+        self.commit_every = commit_every
+        self.hits = 0
+        self.misses = 0
+        self._pending_writes = 0
+
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                sha256 TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS extractions (
+                sha256 TEXT NOT NULL,
+                page_number INTEGER NOT NULL,
+                extractor_version TEXT NOT NULL,
+                data TEXT NOT NULL,
+                PRIMARY KEY (sha256, page_number)
+            );
+        """)
+
+    def _known_hash(self, path, stat):
+        """Return the remembered hash of a file if its size and mtime are unchanged, else None."""
+        row = self.conn.execute(
+            "SELECT size, mtime_ns, sha256 FROM files WHERE path = ?", (path,)
+        ).fetchone()
+        if row and row[0] == stat.st_size and row[1] == stat.st_mtime_ns:
+            return row[2]
+        return None
+
+    def file_hash(self, path, content=None):
+        """
+        Return the content hash of a file, re-hashing only if its size or mtime changed.
+
+        Args:
+            path (str): File path
+            content (bytes): The file's contents, if already read; hashed
+                instead of reading the file again
+        """
+        path = os.path.abspath(path)
+        stat = source_stat(path)
+        content_hash = self._known_hash(path, stat)
+        if content_hash is not None:
+            return content_hash
+
+        content_hash = hashlib.sha256(content).hexdigest() if content is not None else file_sha256(path)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO files (path, size, mtime_ns, sha256) VALUES (?, ?, ?, ?)",
+            (path, stat.st_size, stat.st_mtime_ns, content_hash)
+        )
+        self._wrote()
+        return content_hash
+
+    def peek(self, path, page_number):
+        """
+        Check, without reading the file, whether get() would be a hit.
+
+        Returns:
+            bool: True if the file's size and mtime are unchanged and its
+                extraction by this extractor version is cached
+        """
+        path = os.path.abspath(path)
+        content_hash = self._known_hash(path, source_stat(path))
+        if content_hash is None:
+            return False
+        return self.conn.execute(
+            "SELECT 1 FROM extractions WHERE sha256 = ? AND page_number = ? AND extractor_version = ?",
+            (content_hash, page_number, self.extractor_version)
+        ).fetchone() is not None
+
+    def get(self, path, page_number, content=None):
+        """
+        Look up the cached extraction for a PDF.
+
+        Args:
+            path (str): PDF path
+            page_number (int): Page number the extraction started from
+            content (bytes): The PDF's contents, if already read (see file_hash)
+
+        Returns:
+            tuple: (content_hash, data) where data is None on a cache miss
+        """
+        content_hash = self.file_hash(path, content)
+        row = self.conn.execute(
+            "SELECT data FROM extractions WHERE sha256 = ? AND page_number = ? AND extractor_version = ?",
+            (content_hash, page_number, self.extractor_version)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return content_hash, None
+        self.hits += 1
+        return content_hash, json.loads(row[0])
+
+    def put(self, content_hash, page_number, data):
+        """Store the extracted data for a PDF's content hash."""
+        self.conn.execute(
+            "INSERT OR REPLACE INTO extractions (sha256, page_number, extractor_version, data) VALUES (?, ?, ?, ?)",
+            (content_hash, page_number, self.extractor_version, json.dumps(data, ensure_ascii=False))
+        )
+        self._wrote()
+
+    def _wrote(self):
+        self._pending_writes += 1
+        if self._pending_writes >= self.commit_every:
+            self.conn.commit()
+            self._pending_writes = 0
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,129 @@
+"""
+Extraction Profile
+Opt-in per-stage timers and counters for extract_invoice_data.
+
+Pass an ExtractionProfile as profiler= to extract_invoice_data (or to
+extract_invoice_batch.iter_invoice_records, which merges the profiles of its
+worker processes) and it accumulates, over every invoice extracted with it:
+
+  - stages: wall time and call count of each step (opening the PDF, locating
+    the invoice page, reading its text, the header scan, the line-item table,
+    the Qty strategies...)
+  - counters: which fallback pattern found each header field, how many
+    description lines were scanned, which Qty strategy won, and so on
+
+to_dict() / write_json() emit the totals as a JSON profile, stages sorted by
+total time, so the expensive fields and fallback paths of a real corpus show
+up without attaching a profiler. Without a profiler the extractors use
+NULL_PROFILE, whose methods do nothing.
+"""
+
+import json
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+
+
+class ExtractionProfile:
+    """
+    Stage timers and counters, aggregated over any number of invoices.
+
+    Usage:
+        profile = ExtractionProfile()
+        for pdf_file in pdf_files:
+            extract_invoice_data(pdf_file, profiler=profile)
+        profile.write_json('extraction_profile.json')
+    """
+
+    def __init__(self):
+        self.stage_seconds = Counter()
+        self.stage_calls = Counter()
+        self.counters = Counter()
+
+    @contextmanager
+    def stage(self, name):
+        """Time the enclosed block under name."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage_seconds[name] += time.perf_counter() - start
+            self.stage_calls[name] += 1
+
+    def count(self, name, n=1):
+        """Add n to a counter."""
+        self.counters[name] += n
+
+    def count_matches(self, prefix, matches, patterns):
+        """
+        Count which fallback pattern found each field.
+
+        Args:
+            prefix (str): Counter name prefix, e.g. 'header'
+            matches (dict): field -> re.Match of the fields found
+            patterns (dict): field -> ordered list of compiled patterns
+                (e.g. HEADER_PATTERNS)
+
+        Adds '<prefix>.<field>.pattern<i>' (i: 0-based priority of the pattern
+        that matched) or '<prefix>.<field>.not_found' for every field.
+        """
+        for field, field_patterns in patterns.items():
+            match = matches.get(field)
+            if match is None:
+                self.counters[f'{prefix}.{field}.not_found'] += 1
+            else:
+                self.counters[f'{prefix}.{field}.pattern{field_patterns.index(match.re)}'] += 1
+
+    def merge(self, other):
+        """
+        Add another profile's totals to this one.
+
+        Args:
+            other (ExtractionProfile or dict): A profile, or its to_dict()
+                (e.g. returned by a worker process)
+        """
+        if isinstance(other, ExtractionProfile):
+            other = other.to_dict()
+        for name, stage in other['stages'].items():
+            self.stage_seconds[name] += stage['total_ms'] / 1000
+            self.stage_calls[name] += stage['calls']
+        self.counters.update(other['counters'])
+
+    def to_dict(self):
+        """
+        Returns:
+            dict: 'stages' (name -> calls, total_ms, mean_ms; slowest first)
+                and 'counters' (name -> count, sorted by name)
+        """
+        stages = {}
+        for name, seconds in self.stage_seconds.most_common():
+            calls = self.stage_calls[name]
+            stages[name] = {
+                'calls': calls,
+                'total_ms': round(seconds * 1000, 3),
+                'mean_ms': round(seconds * 1000 / calls, 4) if calls else 0.0,
+            }
+        return {'stages': stages, 'counters': dict(sorted(self.counters.items()))}
+
+    def write_json(self, path):
+        """Write to_dict() to a JSON file."""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+
+class _NullProfile:
+    """Stand-in used when profiling is off: no timing, no counting."""
+
+    _NO_STAGE = nullcontext()
+
+    def stage(self, name):
+        return self._NO_STAGE
+
+    def count(self, name, n=1):
+        pass
+
+    def count_matches(self, prefix, matches, patterns):
+        pass
+
+
+NULL_PROFILE = _NullProfile()
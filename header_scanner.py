@@ -0,0 +1,106 @@
+"""
+Single-Pass Header Scanner
+Finds every header field of an invoice page (Order Number, Invoice Number,
+Transaction ID, Mode of Payment, Date & Time, Shipping Address...) in one walk
+over the text instead of one re.search per field pattern.
+
+Every pattern in HEADER_PATTERNS starts with a fixed label word ("Order",
+"Invoice", "Payment", ...). The scanner first lists every position where one of
+those label words occurs, then walks them in text order and tries only the
+field patterns that can start with that word, anchored with pattern.match().
+The first anchored match of a pattern is the same match re.search() would
+return, so the ordered-fallback priority of HEADER_PATTERNS is kept: the
+lowest-numbered pattern that matches anywhere wins.
+"""
+
+import re
+
+from invoice_patterns import HEADER_PATTERNS
+
+
+# Label word(s) each pattern in HEADER_PATTERNS can start with, in the same order
+HEADER_LABELS = {
+    'Order Number': [('order',), ('order',), ('order',)],
+    'Order Date': [('order',), ('order',), ('order',)],  # "Ordered on" starts with "order"
+    'Place of Delivery': [('place',), ('deliver',), ('deliver',)],
+    'Invoice Number': [('invoice',), ('invoice',), ('invoice',)],
+    'Invoice Value': [('total',), ('grand',), ('total',), ('invoice',)],
+    'Payment Transaction ID': [('payment', 'transaction'), ('transaction',), ('payment',), ('utr',)],
+    'Mode of Payment': [('mode',), ('payment',), ('payment',)],
+    'Date & Time': [('date',), ('date',), ('date',)],
+    'Shipping Address': [('ship',), ('deliver',), ('ship',)],
+}
+
+
+def _build_label_index():
+    """Map each label word to the (field, priority, pattern) triples that can start with it."""
+    index = {}
+    for field, labels in HEADER_LABELS.items():
+        patterns = HEADER_PATTERNS[field]
+        assert len(labels) == len(patterns), f"HEADER_LABELS out of sync for {field}"
+        for priority, (words, pattern) in enumerate(zip(labels, patterns)):
+            for word in words:
+                index.setdefault(word, []).append((field, priority, pattern))
+    return index
+
+
+LABEL_INDEX = _build_label_index()
+
+# One named group per label word; the zero-width lookahead makes finditer visit
+# every position where a label word starts, even if label words overlap
+LABEL_SCANNER = re.compile(
+    '(?=' + '|'.join(f'(?P<{word}>{word})' for word in LABEL_INDEX) + ')',
+    re.IGNORECASE
+)
+
+
+# Characters that re.IGNORECASE matches against ASCII label letters (i, s, k)
+# but that str.lower() does not turn into those letters
+_CASE_FOLD_EXCEPTIONS = '\u0130\u0131\u017f\u212a'
+
+
+def _label_positions(text):
+    """
+    Return (position, label word) for every label word in the text, in text order.
+    
+    The label words are located with str.find on a lower-cased copy of the text,
+    which CPython runs far faster than the equivalent regex alternation. Text
+    where lower-casing would shift positions or miss a case-insensitive match
+    goes through LABEL_SCANNER instead.
+    """
+    lowered = text.lower()
+    if len(lowered) != len(text) or any(c in text for c in _CASE_FOLD_EXCEPTIONS):
+        return [(label.start(), label.lastgroup) for label in LABEL_SCANNER.finditer(text)]
+    
+    positions = []
+    for word in LABEL_INDEX:
+        pos = lowered.find(word)
+        while pos != -1:
+            positions.append((pos, word))
+            pos = lowered.find(word, pos + 1)
+    positions.sort()
+    return positions
+
+
+def scan_header_fields(text):
+    """
+    Find every header field in a single pass over the page text.
+
+    Args:
+        text (str): Full page text
+
+    Returns:
+        dict: field name -> re.Match for every field that was found. match.re is
+            the winning pattern from HEADER_PATTERNS[field].
+    """
+    found = {}
+    priorities = {}
+    for pos, word in _label_positions(text):
+        for field, priority, pattern in LABEL_INDEX[word]:
+            if priorities.get(field, len(HEADER_PATTERNS[field])) <= priority:
+                continue
+            match = pattern.match(text, pos)
+            if match:
+                found[field] = match
+                priorities[field] = priority
+    return found
@@ -0,0 +1,101 @@
+"""
+Invoice Archive
+Reads the invoice PDFs inside ZIP and TAR archives without unpacking them.
+
+Amazon's bulk invoice downloads arrive as ZIP files holding thousands of PDFs.
+iter_archive_pdfs() streams the PDF members of a .zip, .tar, .tar.gz / .tgz,
+.tar.bz2 or .tar.xz archive one at a time as bytes, ready for
+extract_invoice_data(..., pdf_bytes=...), so nothing is written to disk and
+every PDF is read exactly once. TAR archives are read in a single sequential
+pass (compressed TARs have no random access); ZIP members are read through
+the archive's central directory.
+
+Each member is identified by a member path, "<archive path>!<member name>".
+The extraction cache and the checkpoint manifest treat it like a file path,
+using the archive's size and modification time (see source_stat), and the
+record's PDF Filename becomes "<archive file name>!<member name>" (see
+source_name).
+"""
+
+import os
+import re
+import tarfile
+import zipfile
+
+ARCHIVE_SUFFIXES = ('.zip', '.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tar.xz')
+MEMBER_SEPARATOR = '!'
+
+_MEMBER_PATH = re.compile(
+    r'^(.*?(?:' + '|'.join(re.escape(suffix) for suffix in ARCHIVE_SUFFIXES) + r'))'
+    + re.escape(MEMBER_SEPARATOR) + r'(.+)$',
+    re.IGNORECASE
+)
+
+
+def is_archive(path):
+    """Check whether a file name has one of the ARCHIVE_SUFFIXES."""
+    return path.lower().endswith(ARCHIVE_SUFFIXES)
+
+
+def member_path(archive_path, name):
+    """Return the member path of an archive member."""
+    return f"{archive_path}{MEMBER_SEPARATOR}{name}"
+
+
+def split_member_path(path):
+    """
+    Split a member path into its archive and member name.
+
+    Returns:
+        tuple: (archive path, member name), or (path, None) for a plain file
+    """
+    match = _MEMBER_PATH.match(path)
+    if match is None:
+        return path, None
+    return match.group(1), match.group(2)
+
+
+def source_name(path):
+    """PDF Filename of a PDF: its file name, or "<archive file name>!<member name>"."""
+    archive_path, name = split_member_path(path)
+    if name is None:
+        return os.path.basename(path)
+    return member_path(os.path.basename(archive_path), name)
+
+
+def source_stat(path):
+    """os.stat() of a file, or of the archive holding an archive member."""
+    return os.stat(split_member_path(path)[0])
+
+
+def _is_pdf_member(name):
+    """Same rule as for PDFs on disk: *.pdf, not hidden (e.g. __MACOSX/._*.pdf)."""
+    base_name = name.rsplit('/', 1)[-1]
+    return base_name.endswith('.pdf') and not base_name.startswith('.')
+
+
+def iter_archive_pdfs(archive_path):
+    """
+    Stream the PDF members of an archive, one member in memory at a time.
+
+    Args:
+        archive_path (str): Path of a ZIP or (optionally compressed) TAR archive
+
+    Yields:
+        tuple: (member path, bytes) per PDF member, in archive order
+
+    Raises:
+        zipfile.BadZipFile, tarfile.TarError, OSError: If the archive is
+            corrupt or cannot be read
+    """
+    if archive_path.lower().endswith('.zip'):
+        with zipfile.ZipFile(archive_path) as archive:
+            for info in archive.infolist():
+                if not info.is_dir() and _is_pdf_member(info.filename):
+                    yield member_path(archive_path, info.filename), archive.read(info)
+    else:
+        # 'r|*': a single forward pass, decompressed on the fly
+        with tarfile.open(archive_path, mode='r|*') as archive:
+            for member in archive:
+                if member.isfile() and _is_pdf_member(member.name):
+                    yield member_path(archive_path, member.name), archive.extractfile(member).read()
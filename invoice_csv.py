@@ -0,0 +1,163 @@
+"""
+Invoice CSV
+Writes invoice records to CSV; shared by extract_invoice.py and
+extract_invoice_batch.py.
+
+With append=True, save_to_csv() adds only the records whose Invoice Number
+(or Order Number, when the invoice number is missing) is not in the file yet.
+The existing rows are never rewritten: the new ones are appended to the end of
+the file, so a daily ingest costs the new rows, not the size of the archive.
+"""
+
+import csv
+import io
+import os
+
+
+def invoice_key(row):
+    """
+    Dedupe key for an invoice row: its Invoice Number, or its Order Number
+    when the invoice number is missing. Rows with neither have no key.
+    """
+    invoice_number = (row.get('Invoice Number') or '').strip()
+    if invoice_number:
+        return ('Invoice Number', invoice_number)
+    order_number = (row.get('Order Number') or '').strip()
+    if order_number:
+        return ('Order Number', order_number)
+    return None
+
+
+def load_invoice_keys(csv_path):
+    """
+    Read the header and the invoice keys of an existing CSV.
+    
+    The file is streamed row by row and only the Invoice Number and Order
+    Number columns are kept, so large archives are never loaded into memory.
+    
+    Returns:
+        tuple: (fieldnames, set of invoice keys); (None, empty set) if the
+            file does not exist or is empty
+    """
+    if not os.path.exists(csv_path):
+        return None, set()
+    
+    with open(csv_path, newline='', encoding='utf-8') as csvfile:
+        reader = csv.reader(csvfile)
+        fieldnames = next(reader, None)
+        if fieldnames is None:
+            return None, set()
+        
+        invoice_col = fieldnames.index('Invoice Number') if 'Invoice Number' in fieldnames else None
+        order_col = fieldnames.index('Order Number') if 'Order Number' in fieldnames else None
+        keys = set()
+        for values in reader:
+            key = invoice_key({
+                'Invoice Number': values[invoice_col] if invoice_col is not None and invoice_col < len(values) else '',
+                'Order Number': values[order_col] if order_col is not None and order_col < len(values) else '',
+            })
+            if key:
+                keys.add(key)
+    
+    return fieldnames, keys
+
+
+def _drop_known_invoices(data, keys):
+    """Return the rows whose invoice key is not in keys (keys is updated in place)."""
+    new_rows = []
+    for row in data:
+        key = invoice_key(row)
+        if key is not None:
+            if key in keys:
+                continue
+            keys.add(key)
+        new_rows.append(row)
+    return new_rows
+
+
+def _append_to_csv(data, csv_path):
+    """
+    Append the rows of data that are not in csv_path yet.
+    
+    Only the new rows are written, at the end of the file opened in append
+    mode, so an append costs the new rows plus one read of the invoice keys
+    (see load_invoice_keys), however large the existing file is. The rows are
+    formatted in memory and written in one go, then flushed and fsynced; if
+    the write fails the file is truncated back to its old size, so it never
+    keeps part of a batch.
+    
+    Returns:
+        tuple: (rows appended, duplicates skipped)
+    """
+    fieldnames, keys = load_invoice_keys(csv_path)
+    new_rows = _drop_known_invoices(data, keys)
+    skipped = len(data) - len(new_rows)
+    
+    if not new_rows:
+        return 0, skipped
+    
+    buffer = io.StringIO()
+    with open(csv_path, 'rb') as existing:
+        # Make sure the first new row starts on its own line
+        existing.seek(-1, os.SEEK_END)
+        if existing.read(1) not in (b'\n', b'\r'):
+            buffer.write('\r\n')
+    writer = csv.DictWriter(buffer, fieldnames=fieldnames, restval='', extrasaction='ignore')
+    writer.writerows(new_rows)
+    
+    with open(csv_path, 'ab') as csvfile:
+        size = csvfile.tell()
+        try:
+            csvfile.write(buffer.getvalue().encode('utf-8'))
+            csvfile.flush()
+            os.fsync(csvfile.fileno())
+        except BaseException:
+            csvfile.truncate(size)
+            raise
+    
+    return len(new_rows), skipped
+
+
+def save_to_csv(data, csv_path='invoice_data.csv', append=False):
+    """
+    Save extracted data to CSV.
+    
+    Args:
+        data (dict or list): One record or a list of records
+        csv_path (str): Output CSV path
+        append (bool): Add only the records whose Invoice Number (or Order
+            Number) is not in csv_path yet, instead of overwriting the file
+    """
+    try:
+        if isinstance(data, dict):
+            data = [data]
+        
+        if not data:
+            print("No data to save!")
+            return
+        
+        if append and os.path.exists(csv_path) and os.path.getsize(csv_path) > 0:
+            appended, skipped = _append_to_csv(data, csv_path)
+            print(f"\n{'='*80}")
+            print(f"✓ SUCCESS: Data appended to {csv_path}")
+            print(f"  New records: {appended}")
+            print(f"  Duplicates skipped: {skipped}")
+            print(f"{'='*80}")
+            return
+        
+        if append:
+            # New file: still drop duplicates within the batch itself
+            data = _drop_known_invoices(data, set())
+        
+        with open(csv_path, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=data[0].keys())
+            writer.writeheader()
+            writer.writerows(data)
+        
+        print(f"\n{'='*80}")
+        print(f"✓ SUCCESS: Data saved to {csv_path}")
+        print(f"  Total records: {len(data)}")
+        print(f"{'='*80}")
+        
+    except Exception as e:
+        print(f"Error saving CSV: {str(e)}")
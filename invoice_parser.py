@@ -0,0 +1,483 @@
+"""
+Invoice Text Parser
+Turns the text of an Amazon invoice page into an invoice record; shared by
+extract_invoice.py and extract_invoice_batch.py.
+
+parse_invoice_text() reads the header fields with the single-pass header
+scanner, the line-item table (Description, HSN Code, ASIN, SKU) with
+extract_description_hsn_asin_sku() or, given the page's positioned words, with
+the word-based table reader, and the Qty with extract_qty()'s strategies.
+"""
+
+import re
+
+from invoice_patterns import HEADER_PATTERNS, TABLE_PATTERNS, TABLE_STOP_KEYWORDS, QTY_PATTERNS
+from header_scanner import scan_header_fields
+from word_table import extract_table_fields
+from extraction_profile import NULL_PROFILE
+
+
+def extract_description_hsn_asin_sku(text, debug=False, profile=NULL_PROFILE):
+    """
+    Extract description, HSN code, ASIN, and SKU from table format.
+    Filters out serial numbers, table column headers and labels.
+    
+    ASIN format: B0FW7291VR (starts with B0, followed by alphanumeric)
+    SKU format: MS-H2GY-GWJX (alphanumeric with hyphens, in parentheses)
+    
+    Args:
+        text (str): Full page text
+        debug (bool): Print debug info
+        profile (ExtractionProfile): Counters for the lines scanned and the
+            fallbacks taken
+        
+    Returns:
+        tuple: (description, hsn_code, asin, sku)
+    """
+    description = ""
+    hsn_code = ""
+    asin = ""
+    sku = ""
+    
+    if debug:
+        print("\n" + "-"*80)
+        print("DESCRIPTION EXTRACTION DEBUG:")
+        print("-"*80)
+    
+    # Split text into lines
+    lines = text.split('\n')
+    
+    # Find the Description column header
+    desc_start_index = -1
+    for i, line in enumerate(lines):
+        if TABLE_PATTERNS['Description Header'].search(line):
+            desc_start_index = i
+            if debug:
+                print(f"Found 'Description' header at line {i}: {line}")
+            break
+    
+    if desc_start_index != -1:
+        # Collect description lines (text only, no numbers or headers)
+        desc_lines = []
+        raw_text = []  # Keep raw text for ASIN/SKU extraction
+        
+        # Start from the line after "Description" header
+        for i in range(desc_start_index + 1, min(desc_start_index + 30, len(lines))):
+            line = lines[i].strip()
+            
+            # Skip empty lines
+            if not line:
+                continue
+            
+            # Stop if we hit total or other sections
+            if any(keyword in line for keyword in TABLE_STOP_KEYWORDS):
+                if debug:
+                    print(f"Stopping at line {i}: {line}")
+                break
+            
+            # Keep raw text for ASIN/SKU extraction
+            raw_text.append(line)
+            
+            # CRITICAL FILTERS - Skip all numeric/table data and headers:
+            
+            # 1. Skip lines that are just a single digit or small number (serial numbers like "1", "2", etc.)
+            if TABLE_PATTERNS['Serial Number'].match(line):
+                if debug:
+                    print(f"Skipping serial number {i}: {line}")
+                continue
+            
+            # 2. Skip lines that are repetitions of "Amount" or similar column headers
+            if TABLE_PATTERNS['Repeated Amount'].match(line):
+                if debug:
+                    print(f"Skipping repeated 'Amount' header {i}: {line}")
+                continue
+            
+            # 3. Skip lines like "Amount Amount Amount 1" or similar table artifacts
+            if TABLE_PATTERNS['Header Pair'].match(line):
+                if debug:
+                    print(f"Skipping table header line {i}: {line}")
+                continue
+            
+            # 4. Skip pure numbers (prices, quantities, amounts)
+            if TABLE_PATTERNS['Numeric Line'].match(line):
+                if debug:
+                    print(f"Skipping numeric line {i}: {line}")
+                continue
+            
+            # 5. Skip currency amounts with symbols
+            if TABLE_PATTERNS['Currency Amount'].match(line):
+                if debug:
+                    print(f"Skipping currency amount {i}: {line}")
+                continue
+            
+            # 6. Skip lines that are ONLY numbers, percentages, or currency
+            if TABLE_PATTERNS['Number or Percentage'].match(line):
+                if debug:
+                    print(f"Skipping number/percentage {i}: {line}")
+                continue
+            
+            # 7. Skip tax type indicators
+            if TABLE_PATTERNS['Tax Type'].match(line):
+                if debug:
+                    print(f"Skipping tax type {i}: {line}")
+                continue
+            
+            # 8. Skip standard column headers
+            if TABLE_PATTERNS['Column Header'].match(line):
+                if debug:
+                    print(f"Skipping column header {i}: {line}")
+                continue
+            
+            # 9. Skip lines with mostly numbers and currency symbols
+            num_count = len(TABLE_PATTERNS['Numeric Char'].findall(line))
+            letter_count = len(TABLE_PATTERNS['Letter Char'].findall(line))
+            if num_count > letter_count and num_count > 5:
+                if debug:
+                    print(f"Skipping numeric-heavy line {i}: {line}")
+                continue
+            
+            # 10. Skip lines that look like just "Amount 1" or "Net 1" etc.
+            if TABLE_PATTERNS['Label with Number'].match(line):
+                if debug:
+                    print(f"Skipping column label with number {i}: {line}")
+                continue
+            
+            # Check if this line contains HSN code
+            hsn_match = TABLE_PATTERNS['HSN'].search(line)
+            if hsn_match:
+                hsn_code = hsn_match.group(1)
+                # Extract description part before HSN (if any on same line)
+                desc_part = TABLE_PATTERNS['HSN Label'].sub('', line).strip()
+                if desc_part and len(desc_part) > 3:
+                    # Only add if it doesn't look like a header or serial number
+                    if not TABLE_PATTERNS['Label or Serial'].match(desc_part):
+                        desc_lines.append(desc_part)
+                if debug:
+                    print(f"Found HSN code at line {i}: {hsn_code}")
+                    if desc_part:
+                        print(f"  Description part: {desc_part}")
+                continue
+            
+            # Add to description if it contains actual text (product description)
+            # Must have at least some letters and be reasonably long
+            if len(line) > 5 and TABLE_PATTERNS['Word'].search(line):
+                # Additional check: make sure it's not just a serial number pattern
+                if not TABLE_PATTERNS['Code Line'].match(line):
+                    # Skip if it looks like a column header
+                    if not TABLE_PATTERNS['Header Prefix'].match(line):
+                        desc_lines.append(line)
+                        if debug:
+                            print(f"✓ Adding description line {i}: {line}")
+        
+        profile.count('description.lines_scanned', len(raw_text))
+        
+        # Combine description lines
+        description = ' '.join(desc_lines).strip()
+        
+        # Extract ASIN and SKU from the raw text
+        full_raw_text = ' '.join(raw_text)
+        
+        # Extract ASIN (format: B0 followed by alphanumeric characters, typically 10 chars total)
+        asin_match = TABLE_PATTERNS['ASIN'].search(full_raw_text)
+        if asin_match:
+            asin = asin_match.group(1)
+            if debug:
+                print(f"Found ASIN: {asin}")
+            # Remove ASIN from description
+            description = description.replace(asin, '').strip()
+        
+        # Extract SKU (format: alphanumeric with hyphens, in parentheses)
+        # Pattern: ( XXXXX-XXXXX-XXXXX ) or similar
+        sku_match = TABLE_PATTERNS['SKU'].search(full_raw_text)
+        if sku_match:
+            potential_sku = sku_match.group(1)
+            # Make sure it's not the ASIN (ASIN doesn't have hyphens typically)
+            if potential_sku != asin and '-' in potential_sku:
+                sku = potential_sku
+                if debug:
+                    print(f"Found SKU: {sku}")
+                # Remove SKU and parentheses from description
+                description = re.sub(r'\(\s*' + re.escape(sku) + r'\s*\)', '', description).strip()
+        
+        # Clean up description
+        if description:
+            # Remove any leading serial numbers (single digits at the start)
+            description = TABLE_PATTERNS['Leading Serial'].sub('', description)
+            
+            # Remove extra whitespace
+            description = ' '.join(description.split())
+            
+            # Remove trailing punctuation artifacts
+            description = description.rstrip('|,;')
+            
+            # Remove any remaining numeric artifacts at the end
+            description = TABLE_PATTERNS['Trailing Number'].sub('', description)
+            
+            # Clean up extra pipes and spaces
+            description = TABLE_PATTERNS['Trailing Pipe'].sub('', description)
+            description = TABLE_PATTERNS['Whitespace'].sub(' ', description)
+            
+            # Remove any remaining "Amount" or similar artifacts
+            description = TABLE_PATTERNS['Trailing Label'].sub('', description).strip()
+    
+    # Alternative method if table parsing didn't work
+    if not description:
+        if debug:
+            print("\nTrying alternative description extraction...")
+        
+        # Look for product description pattern (after serial number)
+        match = TABLE_PATTERNS['Description Fallback'].search(text)
+        if match:
+            profile.count('description.fallback')
+            description = match.group(1).strip()
+            if match.lastindex >= 2 and match.group(2):
+                hsn_code = match.group(2)
+            # Clean up
+            description = ' '.join(description.split())
+            if debug:
+                print(f"Alternative method found: {description}")
+    
+    # Extract HSN if not found yet
+    if not hsn_code:
+        hsn_match = TABLE_PATTERNS['HSN Fallback'].search(text)
+        if hsn_match:
+            profile.count('hsn.fallback')
+            hsn_code = hsn_match.group(1)
+            if debug:
+                print(f"Found HSN code via alternative search: {hsn_code}")
+    
+    # Extract ASIN if not found yet
+    if not asin:
+        asin_match = TABLE_PATTERNS['ASIN'].search(text)
+        if asin_match:
+            profile.count('asin.fallback')
+            asin = asin_match.group(1)
+            if debug:
+                print(f"Found ASIN via alternative search: {asin}")
+    
+    # Extract SKU if not found yet
+    if not sku:
+        sku_match = TABLE_PATTERNS['SKU Fallback'].search(text)
+        if sku_match:
+            profile.count('sku.fallback')
+            sku = sku_match.group(1)
+            if debug:
+                print(f"Found SKU via alternative search: {sku}")
+    
+    if debug:
+        print("-"*80)
+        print(f"FINAL Description: {description}")
+        print(f"FINAL HSN Code: {hsn_code}")
+        print(f"FINAL ASIN: {asin}")
+        print(f"FINAL SKU: {sku}")
+        print("-"*80 + "\n")
+    
+    return description, hsn_code, asin, sku
+
+
+def extract_qty(text, debug=False, hsn_code=None, asin=None, profile=NULL_PROFILE):
+    """
+    Extract quantity (Qty) from the invoice table.
+    Uses a 'price-sandwich' strategy: looking for an integer between two currency amounts.
+    The strategy that found the Qty is counted in profile.
+    """
+    qty = ""
+    
+    if debug:
+        print("\n" + "-"*80)
+        print("QTY EXTRACTION DEBUG:")
+        print(f"Context - HSN: {hsn_code}, ASIN: {asin}")
+        print("-"*80)
+    
+    # Strategy 1: Price-Sandwich Pattern (MOST RELIABLE)
+    # Looking for: ₹UnitPrice Qty ₹NetAmount
+    # Example: ₹189.52 8 ₹1,516.16
+    match = QTY_PATTERNS['Price Sandwich'].search(text)
+    if match:
+        qty = match.group(1)
+        profile.count('qty.price_sandwich')
+        if debug: print(f"Found Qty '{qty}' using Price-Sandwich pattern")
+    
+    # Strategy 2: Look for numbers specifically after HSN or ASIN (LANDMARK)
+    if not qty:
+        search_terms = []
+        if hsn_code: search_terms.append(hsn_code)
+        if asin: search_terms.append(asin)
+        
+        for term in search_terms:
+            pos = text.find(term)
+            if pos != -1:
+                after_text = text[pos + len(term):pos + len(term) + 150]
+                # Filter for standalone integers 1-3 digits, not followed by . or , (to avoid decimals)
+                matches = QTY_PATTERNS['Landmark Integer'].finditer(after_text)
+                for m in matches:
+                    val = m.group(1)
+                    if val != term:
+                        qty = val
+                        profile.count('qty.landmark')
+                        if debug: print(f"Found Qty '{qty}' following landmark '{term}'")
+                        break
+                if qty: break
+
+    # Strategy 3: Find "Qty" column header and get the value below it
+    if not qty:
+        for priority, pattern in enumerate(QTY_PATTERNS['Header']):
+            match = pattern.search(text)
+            if match:
+                qty = match.group(1)
+                profile.count(f'qty.header.pattern{priority}')
+                if debug: print(f"Found Qty using 'Qty' header pattern: {qty}")
+                break
+    
+    if not qty:
+        profile.count('qty.not_found')
+    
+    if debug:
+        print("-"*80)
+        print(f"FINAL Qty: {qty}")
+        print("-"*80 + "\n")
+    
+    return qty
+
+
+def parse_invoice_text(text, invoice_data, debug=False, words=None, profile=NULL_PROFILE):
+    """
+    Extract invoice attributes from the text of an invoice page.
+    
+    Args:
+        text (str): Full page text
+        invoice_data (dict): Record to fill in; fields that are not found are left as-is
+        debug (bool): Enable debug output
+        words (list): page.get_text("words") of the same page. When given, the
+            line-item table is read by the word engine (word_table.py), with
+            the text engine as the fallback.
+        profile (ExtractionProfile): Stage timers and counters to add to
+        
+    Returns:
+        dict: invoice_data, filled in
+    """
+    # Header fields are found in one pass over the text (see header_scanner.py)
+    with profile.stage('header_scan'):
+        header_fields = scan_header_fields(text)
+    profile.count_matches('header', header_fields, HEADER_PATTERNS)
+    
+    # 1. Order Number
+    match = header_fields.get('Order Number')
+    if match:
+        invoice_data['Order Number'] = match.group(1).strip()
+        if debug: print(f"✓ Order Number: {invoice_data['Order Number']}")
+    if debug and not invoice_data['Order Number']:
+        print("✗ Order Number: Not found")
+    
+    # 2. Order Date (Format: DD.MM.YYYY like 02.11.2025)
+    match = header_fields.get('Order Date')
+    if match:
+        invoice_data['Order Date'] = match.group(1).strip()
+        if debug: print(f"✓ Order Date: {invoice_data['Order Date']}")
+    if debug and not invoice_data['Order Date']:
+        print("✗ Order Date: Not found")
+    
+    # 3. Place of Delivery
+    match = header_fields.get('Place of Delivery')
+    if match:
+        invoice_data['Place of Delivery'] = match.group(1).strip()
+        if debug: print(f"✓ Place of Delivery: {invoice_data['Place of Delivery']}")
+    if debug and not invoice_data['Place of Delivery']:
+        print("✗ Place of Delivery: Not found")
+    
+    # 4. Invoice Number
+    match = header_fields.get('Invoice Number')
+    if match:
+        invoice_data['Invoice Number'] = match.group(1).strip()
+        if debug: print(f"✓ Invoice Number: {invoice_data['Invoice Number']}")
+    if debug and not invoice_data['Invoice Number']:
+        print("✗ Invoice Number: Not found")
+    
+    # 5. Invoice Value / Total Amount
+    match = header_fields.get('Invoice Value')
+    if match:
+        invoice_data['Invoice Value'] = match.group(1).strip()
+        if debug: print(f"✓ Invoice Value: {invoice_data['Invoice Value']}")
+    if debug and not invoice_data['Invoice Value']:
+        print("✗ Invoice Value: Not found")
+    
+    # 6, 7, 8, 9. Description, HSN Code, ASIN, and SKU - Extract together
+    table_fields = None
+    if words is not None:
+        with profile.stage('word_table'):
+            table_fields = extract_table_fields(words, debug)
+        profile.count('table.words' if table_fields else 'table.words_failed')
+    if table_fields:
+        description, hsn_code, asin, sku, qty = table_fields
+    else:
+        with profile.stage('description_hsn_asin_sku'):
+            description, hsn_code, asin, sku = extract_description_hsn_asin_sku(text, debug, profile)
+        qty = ""
+    invoice_data['Description'] = description
+    invoice_data['HSN Code'] = hsn_code
+    invoice_data['ASIN'] = asin
+    invoice_data['SKU'] = sku
+    
+    # Extract Qty
+    if not qty:
+        with profile.stage('qty'):
+            qty = extract_qty(text, debug, hsn_code=hsn_code, asin=asin, profile=profile)
+    invoice_data['Qty'] = qty
+    
+    if not debug:
+        # Only print in non-debug mode
+        if description:
+            print(f"✓ Description: {description}")
+        else:
+            print("✗ Description: Not found")
+        if qty:
+            print(f"✓ Qty: {qty}")
+        else:
+            print("✗ Qty: Not found")
+        if hsn_code:
+            print(f"✓ HSN Code: {hsn_code}")
+        else:
+            print("✗ HSN Code: Not found")
+        if asin:
+            print(f"✓ ASIN: {asin}")
+        else:
+            print("✗ ASIN: Not found")
+        if sku:
+            print(f"✓ SKU: {sku}")
+        else:
+            print("✗ SKU: Not found")
+    
+    # 10. Payment Transaction ID
+    match = header_fields.get('Payment Transaction ID')
+    if match:
+        invoice_data['Payment Transaction ID'] = match.group(1).strip()
+        if debug: print(f"✓ Payment Transaction ID: {invoice_data['Payment Transaction ID']}")
+    if debug and not invoice_data['Payment Transaction ID']:
+        print("✗ Payment Transaction ID: Not found")
+    
+    # 11. Mode of Payment (e.g., "NetBanking")
+    match = header_fields.get('Mode of Payment')
+    if match:
+        invoice_data['Mode of Payment'] = match.group(1).strip()
+        if debug: print(f"✓ Mode of Payment: {invoice_data['Mode of Payment']}")
+    if debug and not invoice_data['Mode of Payment']:
+        print("✗ Mode of Payment: Not found")
+    
+    # 12. Date & Time (Format: 02/11/2025,12:58:05 hrs)
+    match = header_fields.get('Date & Time')
+    if match:
+        invoice_data['Date & Time'] = match.group(1).strip()
+        if debug: print(f"✓ Date & Time: {invoice_data['Date & Time']}")
+    if debug and not invoice_data['Date & Time']:
+        print("✗ Date & Time: Not found")
+    
+    # 13. Shipping Address
+    match = header_fields.get('Shipping Address')
+    if match:
+        address = match.group(1).strip()
+        invoice_data['Shipping Address'] = ' '.join(address.split())
+        if debug: print(f"✓ Shipping Address: {invoice_data['Shipping Address']}")
+    if debug and not invoice_data['Shipping Address']:
+        print("✗ Shipping Address: Not found")
+    
+    return invoice_data
@@ -0,0 +1,141 @@
+"""
+Invoice Pattern Registry
+Precompiled regular expressions shared by extract_invoice.py and extract_invoice_batch.py.
+
+Every pattern is compiled once at import time, so the extractors never go
+through the `re` module cache on the hot path.
+"""
+
+import re
+
+
+def _compile_all(patterns, flags=0):
+    """Compile a list of pattern strings with the same flags."""
+    return [re.compile(pattern, flags) for pattern in patterns]
+
+
+# Header fields: ordered fallbacks, the first pattern that matches wins
+HEADER_PATTERNS = {
+    'Order Number': _compile_all([
+        r'Order\s+(?:Number|No\.?|#)\s*:?\s*([A-Z0-9\-]+)',
+        r'Order\s+ID\s*:?\s*([A-Z0-9\-]+)',
+        r'Order\s*#?\s*:?\s*([A-Z0-9\-]+)',
+    ], re.IGNORECASE),
+
+    # Format: DD.MM.YYYY like 02.11.2025
+    'Order Date': _compile_all([
+        r'Order\s+Date\s*:?\s*(\d{2}\.\d{2}\.\d{4})',
+        r'Order\s+Date\s*:?\s*(\d{1,2}[./]\d{1,2}[./]\d{2,4})',
+        r'Ordered\s+on\s*:?\s*(\d{1,2}[./]\d{1,2}[./]\d{2,4})',
+    ], re.IGNORECASE),
+
+    'Place of Delivery': _compile_all([
+        r'Place\s+of\s+Delivery\s*:?\s*([^\n]+)',
+        r'Delivery\s+(?:Location|Place)\s*:?\s*([^\n]+)',
+        r'Deliver\s+to\s*:?\s*([^\n]+)',
+    ], re.IGNORECASE),
+
+    'Invoice Number': _compile_all([
+        r'Invoice\s+(?:Number|No\.?|#)\s*:?\s*([A-Z0-9\-]+)',
+        r'Invoice\s+ID\s*:?\s*([A-Z0-9\-]+)',
+        r'Invoice\s*#?\s*:?\s*([A-Z0-9\-]+)',
+    ], re.IGNORECASE),
+
+    'Invoice Value': _compile_all([
+        r'TOTAL\s*:?\s*[₹$€£]?\s*[\d,]+\.?\d*\s*[₹$€£]?\s*([\d,]+\.?\d*)',
+        r'Grand\s+Total\s*:?\s*[₹$€£]?\s*([\d,]+\.?\d*)',
+        r'Total\s+Amount\s*:?\s*[₹$€£]?\s*([\d,]+\.?\d*)',
+        r'Invoice\s+(?:Value|Amount|Total)\s*:?\s*[₹$€£]?\s*([\d,]+\.?\d*)',
+    ], re.IGNORECASE),
+
+    'Payment Transaction ID': _compile_all([
+        r'(?:Payment\s+)?Transaction\s+(?:ID|No\.?|#)\s*:?\s*([A-Z0-9\-]+)',
+        r'Transaction\s+Reference\s*:?\s*([A-Z0-9\-]+)',
+        r'Payment\s+ID\s*:?\s*([A-Z0-9\-]+)',
+        r'UTR\s*(?:Number|No\.?)?\s*:?\s*([A-Z0-9\-]+)',
+    ], re.IGNORECASE),
+
+    # e.g. "NetBanking"
+    'Mode of Payment': _compile_all([
+        r'Mode\s+of\s+Payment\s*:?\s*([^\n]+)',
+        r'Payment\s+(?:Mode|Method)\s*:?\s*([^\n]+)',
+        r'Payment\s+Type\s*:?\s*([^\n]+)',
+    ], re.IGNORECASE),
+
+    # Format: 02/11/2025,12:58:05 hrs
+    'Date & Time': _compile_all([
+        r'Date\s+(?:&|and)\s+Time\s*:?\s*(\d{2}/\d{2}/\d{4},\s*\d{2}:\d{2}:\d{2}\s*hrs?)',
+        r'Date\s+(?:&|and)\s+Time\s*:?\s*(\d{1,2}/\d{1,2}/\d{4},\s*\d{1,2}:\d{2}:\d{2}\s*hrs?)',
+        r'Date\s*&\s*Time\s*:?\s*(\d{1,2}/\d{1,2}/\d{4},\s*\d{1,2}:\d{2}:\d{2})',
+    ], re.IGNORECASE),
+
+    'Shipping Address': _compile_all([
+        r'Shipping\s+Address\s*:?\s*([^\n]+(?:\n(?!\s*(?:Order|Invoice|Payment|Mode|Date|TOTAL))[^\n]+){0,5})',
+        r'Delivery\s+Address\s*:?\s*([^\n]+(?:\n(?!\s*(?:Order|Invoice|Payment|Mode|Date|TOTAL))[^\n]+){0,5})',
+        r'Ship\s+To\s*:?\s*([^\n]+(?:\n(?!\s*(?:Order|Invoice|Payment|Mode|Date|TOTAL))[^\n]+){0,5})',
+    ], re.IGNORECASE),
+}
+
+
+# Line-item table: Description, HSN Code, ASIN, SKU and the line filters
+TABLE_PATTERNS = {
+    'Description Header': re.compile(r'\bDescription\b', re.IGNORECASE),
+
+    # Line filters, applied in this order to every line below the header
+    'Serial Number': re.compile(r'^\d{1,3}$'),
+    'Repeated Amount': re.compile(r'^(Amount\s*){2,}', re.IGNORECASE),
+    'Header Pair': re.compile(r'^(Amount|Net|Tax|Total|Type|Rate|Qty|Price)\s+(Amount|Net|Tax|Total|Type|Rate|Qty|Price)', re.IGNORECASE),
+    'Numeric Line': re.compile(r'^[\d,.\s₹$€£%]+$'),
+    'Currency Amount': re.compile(r'^[₹$€£]\s*[\d,]+\.?\d*$'),
+    'Number or Percentage': re.compile(r'^(\d+%?|[\d,]+\.?\d*|[₹$€£][\d,]+\.?\d*)$'),
+    'Tax Type': re.compile(r'^(IGST|CGST|SGST|GST)$', re.IGNORECASE),
+    'Column Header': re.compile(r'^(Sl\.?\s*No|Unit\s+Price|Qty|Net\s+Amount|Tax\s+Rate|Tax\s+Type|Tax\s+Amount|Total\s+Amount)$', re.IGNORECASE),
+    'Numeric Char': re.compile(r'[\d₹$€£,%.]'),
+    'Letter Char': re.compile(r'[a-zA-Z]'),
+    'Label with Number': re.compile(r'^(Amount|Net|Tax|Total|Price|Rate)\s+\d+$', re.IGNORECASE),
+
+    # Description line checks
+    'Word': re.compile(r'[a-zA-Z]{3,}'),
+    'Code Line': re.compile(r'^[A-Z0-9\-]{8,}$'),
+    'Header Prefix': re.compile(r'^(Amount|Net|Tax|Total|Type|Rate|Qty|Price)', re.IGNORECASE),
+    'Label or Serial': re.compile(r'^(Amount|Net|Tax|Total|\d{1,3})$', re.IGNORECASE),
+
+    # Identifiers
+    'HSN': re.compile(r'HSN\s*:?\s*(\d+)', re.IGNORECASE),
+    'HSN Label': re.compile(r'HSN\s*:?\s*\d+', re.IGNORECASE),
+    'HSN Fallback': re.compile(r'HSN\s*:?\s*(\d{6,10})', re.IGNORECASE),
+    # ASIN format: B0FW7291VR (starts with B0, followed by alphanumeric)
+    'ASIN': re.compile(r'\b(B0[A-Z0-9]{8})\b'),
+    # SKU format: MS-H2GY-GWJX (alphanumeric with hyphens, in parentheses)
+    'SKU': re.compile(r'\(\s*([A-Z0-9\-]+)\s*\)'),
+    'SKU Fallback': re.compile(r'\(\s*([A-Z0-9]+-[A-Z0-9]+-[A-Z0-9]+)\s*\)'),
+
+    # Alternative description (after serial number) when table parsing fails
+    'Description Fallback': re.compile(r'\d+\s+([A-Za-z][^₹\d\n]{20,}?)(?:\s*HSN\s*:?\s*(\d+)|\s*₹|\s+\d+\.\d{2})', re.IGNORECASE),
+
+    # Description clean-up
+    'Leading Serial': re.compile(r'^\d{1,3}\s+'),
+    'Trailing Number': re.compile(r'\s+[\d,]+\.?\d*\s*$'),
+    'Trailing Pipe': re.compile(r'\s*\|\s*$'),
+    'Whitespace': re.compile(r'\s+'),
+    'Trailing Label': re.compile(r'\b(Amount|Net|Tax|Total|Type|Rate)\s+\d*\s*$', re.IGNORECASE),
+}
+
+# A line of the page holding any of these ends the line-item table
+TABLE_STOP_KEYWORDS = ('TOTAL:', 'Subtotal', 'Grand Total', 'Amount in Words',
+                       'Mode of Payment', 'Date & Time', 'Transaction')
+
+
+# Qty strategies
+QTY_PATTERNS = {
+    # Strategy 1: ₹UnitPrice Qty ₹NetAmount, e.g. ₹189.52 8 ₹1,516.16
+    'Price Sandwich': re.compile(r'₹\s*[\d,]+\.\d{2}\s+(\d{1,3})\s+₹\s*[\d,]+\.\d{2}'),
+    # Strategy 2: standalone 1-3 digit integer after the HSN/ASIN landmark
+    'Landmark Integer': re.compile(r'(?<![.,\d])\b(\d{1,3})\b(?![.,\d])'),
+    # Strategy 3: value next to the "Qty" column header
+    'Header': _compile_all([
+        r'Qty\s*:?\s*(\d+)',
+        r'Quantity\s*:?\s*(\d+)',
+        r'\bQty\b[^\d]*(\d+)',
+    ], re.IGNORECASE),
+}
@@ -0,0 +1,227 @@
+"""
+Invoice Store
+Loads the processed invoice table straight into a database through DB-API.
+
+csv_to_mysql_sql.py writes a SQL script that recreates the invoices table from
+scratch, and that script then has to be replayed by a client. InvoiceStore
+instead keeps one table up to date in place: rows are upserted by invoice
+number with executemany() in batches, so loading a newer CSV inserts the new
+invoices and refreshes the ones already stored, and the sql_query/ reports
+always see the current data.
+
+Backends:
+  - SQLite (standard library), for a local store
+  - MySQL, through PyMySQL if it is installed
+
+The table has the columns of the CREATE TABLE in csv_to_mysql_sql.py, a
+unique index on invoice_number (the upsert key) and indexes on order_date,
+state and asin.
+"""
+
+import sqlite3
+
+TABLE_NAME = "invoices"
+
+# (CSV column, table column, MySQL type), in table order
+INVOICE_COLUMNS = [
+    ("PDF Filename", "pdf_filename", "VARCHAR(255)"),
+    ("Order Number", "order_number", "VARCHAR(50)"),
+    ("Order Date", "order_date", "DATE"),
+    ("Place of Delivery", "place_of_delivery", "VARCHAR(50)"),
+    ("Invoice Number", "invoice_number", "VARCHAR(50)"),
+    ("Invoice Value", "invoice_value", "DECIMAL(12,2)"),
+    ("Description", "description", "TEXT"),
+    ("Qty", "qty", "INT"),
+    ("HSN Code", "hsn_code", "INT"),
+    ("ASIN", "asin", "VARCHAR(20)"),
+    ("SKU", "sku", "VARCHAR(50)"),
+    ("Payment Transaction ID", "payment_transaction_id", "VARCHAR(100)"),
+    ("Mode of Payment", "mode_of_payment", "VARCHAR(30)"),
+    ("Date & Time", "date_time", "DATETIME"),
+    ("Shipping Address", "shipping_address", "TEXT"),
+    ("Year", "year", "INT"),
+    ("Month", "month", "INT"),
+    ("Day", "day", "INT"),
+    ("DayOfWeek", "day_of_week", "VARCHAR(20)"),
+    ("WeekOfYear", "week_of_year", "INT"),
+    ("State", "state", "VARCHAR(50)"),
+    ("Profit", "profit", "DECIMAL(12,2)"),
+]
+
+KEY_COLUMN = "invoice_number"
+INDEXED_COLUMNS = ["order_date", "state", "asin"]
+
+
+def _sqlite_type(mysql_type):
+    """SQLite column affinity for a MySQL column type."""
+    if mysql_type == "INT":
+        return "INTEGER"
+    if mysql_type.startswith("DECIMAL"):
+        return "REAL"
+    return "TEXT"
+
+
+def invoice_rows(df):
+    """
+    Convert the invoice table to DB-API parameter tuples in INVOICE_COLUMNS order.
+
+    Args:
+        df (pd.DataFrame): Cleaned invoice table (CSV column names)
+
+    Returns:
+        list: One tuple of Python values per row, with None for missing
+            values (and for INVOICE_COLUMNS the table lacks)
+    """
+    columns = []
+    for csv_column, _, _ in INVOICE_COLUMNS:
+        if csv_column not in df.columns:
+            columns.append([None] * len(df))
+            continue
+        # astype(object) turns NumPy scalars into Python ints / floats, which
+        # every driver accepts
+        column = df[csv_column].astype(object)
+        columns.append(column.where(column.notna(), None).tolist())
+    return list(zip(*columns))
+
+
+class InvoiceStore:
+    """
+    Invoices table behind a DB-API connection, upserted by invoice number.
+
+    Usage:
+        with InvoiceStore.sqlite('food_business.sqlite') as store:
+            inserted, updated, skipped = store.upsert(df)
+
+        with InvoiceStore.mysql(host='localhost', user='root', password='',
+                                database='food_business') as store:
+            store.upsert(df)
+
+    The table and its indexes are created if they do not exist yet.
+    """
+
+    def __init__(self, conn, dialect, table_name=TABLE_NAME):
+        if dialect not in ("sqlite", "mysql"):
+            raise ValueError(f"Unsupported dialect: {dialect}")
+        self.conn = conn
+        self.dialect = dialect
+        self.table_name = table_name
+        self.create_table()
+
+    @classmethod
+    def sqlite(cls, db_path, table_name=TABLE_NAME):
+        """Open (or create) a SQLite store."""
+        conn = sqlite3.connect(db_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return cls(conn, "sqlite", table_name)
+
+    @classmethod
+    def mysql(cls, table_name=TABLE_NAME, **connect_args):
+        """
+        Open a MySQL store through PyMySQL.
+
+        Args:
+            table_name (str): Table to load
+            **connect_args: pymysql.connect() arguments (host, user, password,
+                database, ...); the database must exist
+
+        Raises:
+            ImportError: If PyMySQL is not installed
+        """
+        try:
+            import pymysql
+        except ImportError as e:
+            raise ImportError("The MySQL backend needs PyMySQL: pip install PyMySQL") from e
+        connect_args.setdefault("charset", "utf8mb4")
+        return cls(pymysql.connect(**connect_args), "mysql", table_name)
+
+    def _quote(self, name):
+        return f"`{name}`" if self.dialect == "mysql" else f'"{name}"'
+
+    def create_table(self):
+        """Create the table, its unique invoice_number key and its indexes if missing."""
+        table = self._quote(self.table_name)
+        cursor = self.conn.cursor()
+        if self.dialect == "mysql":
+            # MySQL has no CREATE INDEX IF NOT EXISTS; declare them with the table
+            columns = [f"{column} {mysql_type}" for _, column, mysql_type in INVOICE_COLUMNS]
+            columns.append(f"UNIQUE KEY uq_{KEY_COLUMN} ({KEY_COLUMN})")
+            columns += [f"KEY idx_{column} ({column})" for column in INDEXED_COLUMNS]
+            cursor.execute(f"CREATE TABLE IF NOT EXISTS {table} (\n    "
+                           + ",\n    ".join(columns) + "\n) CHARACTER SET utf8mb4")
+        else:
+            columns = [f"{column} {_sqlite_type(mysql_type)}" for _, column, mysql_type in INVOICE_COLUMNS]
+            cursor.execute(f"CREATE TABLE IF NOT EXISTS {table} (\n    "
+                           + ",\n    ".join(columns) + "\n)")
+            cursor.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS "
+                           f"{self._quote(f'uq_{self.table_name}_{KEY_COLUMN}')} "
+                           f"ON {table} ({KEY_COLUMN})")
+            for column in INDEXED_COLUMNS:
+                cursor.execute(f"CREATE INDEX IF NOT EXISTS "
+                               f"{self._quote(f'idx_{self.table_name}_{column}')} "
+                               f"ON {table} ({column})")
+        self.conn.commit()
+
+    def _upsert_sql(self):
+        """INSERT statement that updates every other column when the invoice number exists."""
+        columns = [column for _, column, _ in INVOICE_COLUMNS]
+        updated = [column for column in columns if column != KEY_COLUMN]
+        if self.dialect == "mysql":
+            placeholders = ", ".join(["%s"] * len(columns))
+            assignments = ", ".join(f"{column} = VALUES({column})" for column in updated)
+            conflict = f"ON DUPLICATE KEY UPDATE {assignments}"
+        else:
+            placeholders = ", ".join(["?"] * len(columns))
+            assignments = ", ".join(f"{column} = excluded.{column}" for column in updated)
+            conflict = f"ON CONFLICT ({KEY_COLUMN}) DO UPDATE SET {assignments}"
+        return (f"INSERT INTO {self._quote(self.table_name)} ({', '.join(columns)}) "
+                f"VALUES ({placeholders}) {conflict}")
+
+    def count(self):
+        """Return the number of stored invoices."""
+        cursor = self.conn.cursor()
+        cursor.execute(f"SELECT COUNT(*) FROM {self._quote(self.table_name)}")
+        return cursor.fetchone()[0]
+
+    def upsert(self, df, batch_size=1000, batches_per_transaction=10):
+        """
+        Insert new invoices and update the stored ones, keyed on Invoice Number.
+
+        Args:
+            df (pd.DataFrame): Cleaned invoice table (CSV column names)
+            batch_size (int): Rows per executemany() call
+            batches_per_transaction (int): executemany() calls per commit
+
+        Returns:
+            tuple: (inserted, updated, skipped) row counts. Rows without an
+                Invoice Number cannot be keyed and are skipped; if an Invoice
+                Number repeats, its last row is the one stored.
+        """
+        key_index = [column for _, column, _ in INVOICE_COLUMNS].index(KEY_COLUMN)
+        rows = [row for row in invoice_rows(df) if row[key_index] is not None]
+        skipped = len(df) - len(rows)
+
+        before = self.count()
+        sql = self._upsert_sql()
+        cursor = self.conn.cursor()
+        try:
+            for batch, start in enumerate(range(0, len(rows), batch_size), start=1):
+                cursor.executemany(sql, rows[start:start + batch_size])
+                if batch % batches_per_transaction == 0:
+                    self.conn.commit()
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+
+        inserted = self.count() - before
+        return inserted, len(rows) - inserted, skipped
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
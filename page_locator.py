@@ -0,0 +1,147 @@
+"""
+Invoice Page Locator
+Finds the page of a PDF that holds the invoice instead of trusting a fixed
+page number.
+
+Amazon invoice PDFs usually have the invoice on page 2, but some downloads put
+it on page 1 or behind extra pages. Pages are probed lazily: the hinted page
+first, then the others in order, and probing stops at the first page whose
+text layer contains every marker in INVOICE_PAGE_MARKERS. Each probe builds the
+page's TextPage once and the winning page's full text is read from that same
+TextPage, so no page is parsed twice and pages after the invoice page are never
+parsed at all.
+
+Bulk downloads that hold many invoices in one PDF are handled by
+read_invoice_pages() and group_invoice_pages(), which classify every page and
+split the document into one page group per invoice.
+"""
+
+from invoice_patterns import HEADER_PATTERNS
+from pdf_loader import open_pdf
+
+# Text that every invoice page carries (searched case-insensitively)
+INVOICE_PAGE_MARKERS = ('Invoice Number', 'Description')
+
+
+def is_invoice_page(page, textpage=None):
+    """
+    Check whether a page's text layer contains every invoice marker.
+
+    Args:
+        page (fitz.Page): Page to probe
+        textpage (fitz.TextPage): Already extracted text layer of the page, if any
+
+    Returns:
+        bool: True if the page looks like an invoice page
+    """
+    if textpage is None:
+        textpage = page.get_textpage()
+    return all(page.search_for(marker, textpage=textpage) for marker in INVOICE_PAGE_MARKERS)
+
+
+def probe_order(page_count, page_number=2):
+    """
+    Return the 0-based page indexes in the order they should be probed:
+    the hinted page (or the first page, if the document is shorter), then
+    every other page from the start of the document.
+    """
+    hint = page_number - 1 if 0 < page_number <= page_count else 0
+    return [hint] + [i for i in range(page_count) if i != hint]
+
+
+def find_invoice_page(doc, page_number=2):
+    """
+    Find the invoice page of an open document.
+
+    Args:
+        doc (fitz.Document): Open PDF
+        page_number (int): Page to try first (1-indexed)
+
+    Returns:
+        tuple: (page, textpage, found). textpage is the page's extracted text
+            layer, to pass to page.get_text(..., textpage=textpage). If no page
+            carries the invoice markers, found is False and the hinted page
+            (or the first page, if the document is shorter) is returned, as
+            before the locator existed.
+    """
+    fallback = None
+    for page_index in probe_order(len(doc), page_number):
+        page = doc[page_index]
+        textpage = page.get_textpage()
+        if is_invoice_page(page, textpage):
+            return page, textpage, True
+        if fallback is None:
+            fallback = (page, textpage)
+
+    if fallback is None:
+        raise ValueError("PDF has no pages")
+    return fallback[0], fallback[1], False
+
+
+def _invoice_number(text):
+    """Return the Invoice Number on a page, or None."""
+    for pattern in HEADER_PATTERNS['Invoice Number']:
+        match = pattern.search(text)
+        if match:
+            return match.group(1)
+    return None
+
+
+def read_invoice_pages(pdf_path, start=0, stop=None, loader='file'):
+    """
+    Read and classify a range of pages of a PDF.
+
+    Opens the document itself so that page ranges of one large PDF can be read
+    by several worker processes at once.
+
+    Args:
+        pdf_path (str): Path to the PDF file
+        start (int): First page index (0-based)
+        stop (int): Page index to stop before; None reads to the end
+        loader (str): 'file' or 'mmap', see pdf_loader.py
+
+    Returns:
+        list: (page_index, is_invoice_page, invoice_number, text) per page
+    """
+    pages = []
+    with open_pdf(pdf_path, loader=loader) as doc:
+        stop = len(doc) if stop is None else min(stop, len(doc))
+        for page_index in range(start, stop):
+            page = doc[page_index]
+            textpage = page.get_textpage()
+            text = page.get_text(textpage=textpage)
+            if is_invoice_page(page, textpage):
+                pages.append((page_index, True, _invoice_number(text), text))
+            else:
+                pages.append((page_index, False, None, text))
+    return pages
+
+
+def group_invoice_pages(pages):
+    """
+    Split classified pages into invoices.
+
+    An invoice page starts a new invoice, unless it repeats the Invoice Number
+    of the invoice before it (a multi-page invoice that repeats its header).
+    Pages without the invoice markers continue the current invoice, and pages
+    before the first invoice are skipped.
+
+    Args:
+        pages (iterable): (page_index, is_invoice_page, invoice_number, text)
+            tuples in page order, as returned by read_invoice_pages()
+
+    Yields:
+        tuple: (first page index, text of all the invoice's pages)
+    """
+    first_page = None
+    texts = []
+    current_number = None
+    for page_index, is_invoice, invoice_number, text in pages:
+        if is_invoice and not (texts and invoice_number and invoice_number == current_number):
+            if texts:
+                yield first_page, '\n'.join(texts)
+            first_page, texts, current_number = page_index, [text], invoice_number
+        elif texts:
+            texts.append(text)
+    if texts:
+        yield first_page, '\n'.join(texts)
@@ -0,0 +1,58 @@
+"""
+PDF Loader
+Opens PDFs for the extractors, from a path, from bytes already in memory, or
+through a read-only memory map.
+
+Loaders:
+  - 'file': fitz.open(path). MuPDF reads the objects it needs from the file
+    as pages are parsed; nothing is kept in Python memory.
+  - 'mmap': the file is memory-mapped and PyMuPDF gets a memoryview of the
+    map with fitz.open(stream=..., filetype="pdf"). PyMuPDF keeps a reference
+    to bytes / memoryview streams instead of copying them (bytearray and
+    BytesIO streams are copied), so nothing is read up front and only the
+    parts of the file that parsing touches are faulted in. These are clean,
+    file-backed pages, shared with every other process mapping the same PDF
+    (e.g. workers reading page ranges of one large document) and dropped by
+    the kernel under memory pressure; they do count towards RSS as
+    file-backed memory, which 'file' reads never do.
+
+Prefetched bytes (see pdf_prefetch.py) are opened from memory whatever the
+loader; they hold a private copy of the whole file for as long as the document
+is open, which is what 'mmap' avoids for large documents.
+"""
+
+import mmap
+
+import fitz  # PyMuPDF
+
+PDF_LOADERS = ('file', 'mmap')
+
+
+def open_pdf(pdf_path, pdf_bytes=None, loader='file'):
+    """
+    Open a PDF document.
+
+    Args:
+        pdf_path (str): Path to the PDF file
+        pdf_bytes (bytes): Contents of pdf_path, if already read; opened from
+            memory instead of the file
+        loader (str): 'file' or 'mmap', see PDF_LOADERS
+
+    Returns:
+        fitz.Document: The open document. With the 'mmap' loader the document
+            holds the only reference to the map, which is unmapped once the
+            document is closed and released.
+
+    Raises:
+        ValueError: For an unknown loader (or, with 'mmap', an empty file)
+    """
+    if pdf_bytes is not None:
+        return fitz.open(stream=pdf_bytes, filetype="pdf")
+    if loader == 'mmap':
+        # The map keeps its own handle on the file, which can be closed
+        with open(pdf_path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return fitz.open(stream=memoryview(mapped), filetype="pdf")
+    if loader != 'file':
+        raise ValueError(f"Unknown PDF loader: {loader}")
+    return fitz.open(pdf_path)
@@ -0,0 +1,71 @@
+"""
+PDF Prefetch
+Reads PDF files ahead of the parser on a small thread pool.
+
+On a network-mounted invoice share every fitz.open(path) waits for the file to
+arrive before parsing can start, so reads and parsing alternate and the parser
+sits idle for each file's read latency. iter_prefetched() keeps up to depth
+reads in flight on a bounded thread pool while the consumer parses the files
+before them, and hands each file over as bytes for
+fitz.open(stream=..., filetype="pdf"). File reads release the GIL, so the
+reader threads overlap with parsing even in a single process.
+
+At most depth files are held in memory at once.
+"""
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+def read_pdf_bytes(path):
+    """Return the contents of a file."""
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def _result(item, future):
+    """(item, bytes) once the read is done; bytes is None if it was not read or failed."""
+    if future is None:
+        return item, None
+    try:
+        return item, future.result()
+    except OSError:
+        # Left to the consumer, which opens the path itself and reports the error
+        return item, None
+
+
+def iter_prefetched(items, path=None, threads=4, depth=None):
+    """
+    Read files ahead of their consumer, yielding them in input order.
+
+    items is consumed lazily, and path() is called in the consumer's thread
+    (so it may use e.g. an SQLite connection owned by that thread).
+
+    Args:
+        items (iterable): Items to read, e.g. PDF paths
+        path (callable): item -> path of the file to read, or None to pass
+            the item through unread. Defaults to the item itself.
+        threads (int): Reader threads
+        depth (int): Maximum number of reads ahead of the consumer
+            (default threads * 4)
+
+    Yields:
+        tuple: (item, bytes), with bytes None if the item was not read or
+            its file could not be read
+    """
+    path = path or (lambda item: item)
+    depth = depth or threads * 4
+    window = deque()
+    executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='pdf-prefetch')
+    try:
+        for item in items:
+            item_path = path(item)
+            future = executor.submit(read_pdf_bytes, item_path) if item_path is not None else None
+            window.append((item, future))
+            if len(window) >= depth:
+                yield _result(*window.popleft())
+        while window:
+            yield _result(*window.popleft())
+    finally:
+        # Also reached when the consumer stops early: drop the queued reads
+        executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,269 @@
+"""
+Product Costing
+Columnar Profit / Expenses computation for a whole invoice table.
+
+Profit and Expenses used to be computed one row at a time through
+df.apply(axis=1), so every row's description was matched against the catalogue
+twice. Here each distinct description is matched once, the per-unit totals are
+broadcast back to the rows as a matched-product table, and revenue, base costs,
+shipping, profit and expenses are computed with NumPy array operations. Rows
+whose description is missing or names no catalogue product get 0 profit and 0
+expenses.
+
+Descriptions are matched through a CostBreakdownCache, so a description is
+only matched again after it has been evicted or the catalogue has changed.
+"""
+
+import hashlib
+import json
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from product_matcher import ProductMatcher
+
+# Per-unit product_costs entries that a cost breakdown totals, and the
+# matched-product table column each total goes to. Totals are summed over
+# every catalogue product named in a description (a product listed twice
+# counts twice).
+COST_KEYS = ('sp_before_gst', 'purchase', 'referral', 'packing', 'weight')
+UNIT_COLUMNS = ['Unit SP', 'Unit Purchase', 'Unit Referral', 'Unit Packing', 'Unit Weight']
+
+# Bump when the costing formulas change, so that results keyed on
+# catalogue_fingerprint() (e.g. the dashboard rollups) are recomputed
+COSTING_VERSION = 1
+
+
+def get_dynamic_shipping_array(total_weight_kg):
+    """
+    Shipping cost of every order weight: 76 up to 0.5 kg, 100 up to 1 kg, 143
+    up to 2 kg, then 40 per started kg up to 5 kg and 26 per started kg above.
+
+    Args:
+        total_weight_kg (array-like): Total order weights in kg
+
+    Returns:
+        numpy.ndarray: Shipping cost per weight
+    """
+    weight = np.asarray(total_weight_kg, dtype=float)
+    return np.select(
+        [weight <= 0.5, weight <= 1.0, weight <= 2.0, weight <= 5.0],
+        [76, 100, 143, 143 + np.ceil(weight - 2.0) * 40],
+        default=263 + np.ceil(weight - 5.0) * 26,
+    )
+
+
+def catalogue_fingerprint(product_costs):
+    """
+    SHA-256 of a catalogue: its product names and their COST_KEYS, in order,
+    and COSTING_VERSION.
+
+    Any product added, removed or re-priced, or a new COSTING_VERSION,
+    changes the fingerprint.
+    """
+    digest = hashlib.sha256(f"costing v{COSTING_VERSION}\n".encode('utf-8'))
+    for name, costs in product_costs.items():
+        # default=str: catalogue values are often NumPy scalars
+        entry = [name] + [costs[key] for key in COST_KEYS]
+        digest.update(json.dumps(entry, default=str).encode('utf-8') + b'\n')
+    return digest.hexdigest()
+
+
+class CostBreakdownCache:
+    """
+    Bounded memo of description -> cost breakdown, tied to one catalogue.
+
+    Usage:
+        cost_breakdowns = CostBreakdownCache(product_costs)
+        breakdown = cost_breakdowns.get(description)
+        # -> {'products': {name: count}, 'sp_before_gst': ..., 'purchase': ...,
+        #     'referral': ..., 'packing': ..., 'weight': ...}, or None
+
+    Invoice histories repeat a few dozen descriptions across many rows, so the
+    breakdown of each one is computed once and shared by the profit, expense
+    and platform-fee computations. Keys are the stripped, lower-cased
+    description (matching is case-insensitive, so this never changes a
+    result), and the least recently used entry is evicted beyond maxsize.
+
+    product_costs is referenced, not copied, and changes to it are picked up
+    automatically:
+
+      - every get() compares the catalogue's identity and length with the
+        ones the entries were built from (O(1)), so a replaced catalogue or
+        an added or removed product rebuilds the matcher and drops every
+        entry;
+      - every cache hit compares the COST_KEYS of the products in the entry
+        with the catalogue's current ones (O(products in the description)),
+        so a re-priced or removed product is matched and totalled again;
+      - check_catalogue(), which match_descriptions() (and so
+        calculate_costs()) calls once per batch, compares the full catalogue
+        fingerprint (O(catalogue size)), which also catches a product
+        swapped for another one between batches.
+
+    invalidate() drops everything explicitly.
+    """
+
+    def __init__(self, product_costs, maxsize=4096):
+        self.product_costs = product_costs
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._fingerprint = None
+        self._matcher = None
+        self._shape = None
+
+    def _catalogue_shape(self):
+        """The O(1) part of the catalogue check: which dict it is and how many products it has."""
+        return id(self.product_costs), len(self.product_costs)
+
+    def check_catalogue(self):
+        """Rebuild the matcher and drop every entry if the catalogue changed (O(catalogue size))."""
+        fingerprint = catalogue_fingerprint(self.product_costs)
+        if fingerprint != self._fingerprint:
+            self._fingerprint = fingerprint
+            self._matcher = ProductMatcher(self.product_costs)
+            self._entries.clear()
+        self._shape = self._catalogue_shape()
+
+    def invalidate(self):
+        """Forget the catalogue: the next lookup rebuilds the matcher from product_costs."""
+        self._fingerprint = None
+        self._matcher = None
+        self._shape = None
+        self._entries.clear()
+
+    def _unit_costs(self, products):
+        """Current COST_KEYS of each named product (None for a product no longer in the catalogue)."""
+        costs = []
+        for name in products:
+            product = self.product_costs.get(name)
+            costs.append(None if product is None else tuple(product[key] for key in COST_KEYS))
+        return costs
+
+    def _breakdown(self, key):
+        """Match a normalized description and total the per-unit costs of its products."""
+        products = self._matcher.match(key)
+        if not products:
+            return None
+
+        matched_products = [self.product_costs[name]
+                            for name, count in products.items()
+                            for _ in range(count)]
+        breakdown = {'products': products}
+        for cost_key in COST_KEYS:
+            breakdown[cost_key] = sum(p[cost_key] for p in matched_products)
+        return breakdown
+
+    def get(self, description):
+        """
+        Return the cost breakdown of a description.
+
+        Args:
+            description (str): Invoice Description
+
+        Returns:
+            dict: 'products' (product name -> count, longest name first) and
+                the per-unit totals of COST_KEYS over every matched product, or
+                None if no catalogue product is named
+        """
+        if self._matcher is None or self._shape != self._catalogue_shape():
+            self.check_catalogue()
+        key = str(description).strip().lower()
+        entry = self._entries.get(key)
+        if entry is not None:
+            breakdown, unit_costs = entry
+            if breakdown is None or self._unit_costs(breakdown['products']) == unit_costs:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return breakdown
+
+        self.misses += 1
+        breakdown = self._breakdown(key)
+        unit_costs = None if breakdown is None else self._unit_costs(breakdown['products'])
+        self._entries[key] = (breakdown, unit_costs)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return breakdown
+
+    def clear(self):
+        """Drop every entry."""
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def match_descriptions(descriptions, cost_breakdowns):
+    """
+    Build the per-row matched-product table, looking up each distinct description once.
+
+    Args:
+        descriptions (pd.Series): Description column
+        cost_breakdowns (CostBreakdownCache): Breakdowns of the catalogue to cost against
+
+    Returns:
+        pd.DataFrame: UNIT_COLUMNS plus a boolean 'Matched' column, indexed
+            like descriptions. Unmatched and missing descriptions are all 0.
+    """
+    cost_breakdowns.check_catalogue()
+    codes, uniques = pd.factorize(descriptions)
+
+    # One extra all-zero row at the end, which the -1 code of a missing
+    # description indexes. Built from Python values so every column keeps
+    # the catalogue's dtype (integer costs stay integers, as with the
+    # row-wise functions).
+    zeros = (0,) * len(UNIT_COLUMNS)
+    records, matched = [], []
+    for description in uniques:
+        breakdown = cost_breakdowns.get(description)
+        records.append(tuple(breakdown[key] for key in COST_KEYS) if breakdown else zeros)
+        matched.append(breakdown is not None)
+    records.append(zeros)
+    matched.append(False)
+
+    rows = pd.DataFrame.from_records(records, columns=UNIT_COLUMNS).take(codes)
+    rows['Matched'] = np.array(matched)[codes]
+    rows.index = descriptions.index
+    return rows
+
+
+def calculate_costs(descriptions, quantities, cost_breakdowns, invoice_values=None):
+    """
+    Compute revenue, costs, profit and expenses for every row in one pass.
+
+    Args:
+        descriptions (pd.Series): Description column
+        quantities (pd.Series): Cleaned (integer) Qty column
+        cost_breakdowns (CostBreakdownCache): Breakdowns of the catalogue to cost against
+        invoice_values (pd.Series): Invoice Value column; if given, a
+            'Platform Fees' column (Invoice Value - Expenses - Profit) is added
+
+    Returns:
+        pd.DataFrame: 'Revenue', 'Base Costs', 'Shipping', 'Profit',
+            'Expenses' (and 'Platform Fees') columns, indexed like descriptions
+    """
+    units = match_descriptions(descriptions, cost_breakdowns)
+    quantity = np.asarray(quantities)
+    matched = units['Matched'].to_numpy()
+
+    revenue = units['Unit SP'].to_numpy() * quantity
+    base_costs = (units['Unit Purchase'].to_numpy() + units['Unit Referral'].to_numpy()
+                  + units['Unit Packing'].to_numpy()) * quantity
+    shipping = get_dynamic_shipping_array(units['Unit Weight'].to_numpy() * quantity)
+    # Expenses = (purchase + packing) * quantity; shipping and referral are
+    # deducted from revenue, not out-of-pocket expenses
+    expenses = (units['Unit Purchase'].to_numpy() + units['Unit Packing'].to_numpy()) * quantity
+
+    costs = pd.DataFrame({
+        'Revenue': np.where(matched, revenue, 0),
+        'Base Costs': np.where(matched, base_costs, 0),
+        'Shipping': np.where(matched, shipping, 0),
+        'Profit': np.where(matched, np.round(revenue - base_costs - shipping, 2), 0),
+        'Expenses': np.where(matched, np.round(expenses, 2), 0),
+    }, index=descriptions.index)
+    if invoice_values is not None:
+        costs['Platform Fees'] = invoice_values - costs['Expenses'] - costs['Profit']
+    return costs
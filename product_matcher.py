@@ -0,0 +1,125 @@
+"""
+Product Matcher
+Finds the catalogue products named in an invoice Description.
+
+The costing code used to sort every product name by length and run `in`,
+`count` and `replace` for each name against each description, for every row.
+ProductMatcher builds an Aho-Corasick automaton over the catalogue once, so
+one linear pass over a description finds every occurrence of every product
+name. The occurrences are then resolved with the same longest-match-first
+rule as before: longer names claim their text first (ties in catalogue
+order), and an occurrence that overlaps text already claimed by a longer
+name is dropped.
+"""
+
+from collections import deque
+
+
+class ProductMatcher:
+    """
+    Aho-Corasick automaton over a product catalogue.
+
+    Usage:
+        matcher = ProductMatcher(product_costs)  # any iterable of names
+        matcher.match("2 x cashew nuts, 1kg | green tea, 200g")
+        # -> {'cashew nuts, 1kg': 1, 'green tea, 200g': 1}
+
+    Names are matched case-insensitively; the text is lower-cased before
+    the search.
+    """
+
+    def __init__(self, names):
+        self.names = [name.lower() for name in names]
+        # Longest first, ties in catalogue order (sorted() is stable)
+        self._priority = sorted(range(len(self.names)), key=lambda i: len(self.names[i]), reverse=True)
+
+        # Trie: one transition dict per state, plus the names ending there
+        self._goto = [{}]
+        self._output = [[]]
+        for index, name in enumerate(self.names):
+            if not name:
+                continue
+            state = 0
+            for char in name:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._output.append([])
+                state = next_state
+            self._output[state].append(index)
+
+        # Failure links, breadth first; each state also reports the names
+        # ending at its failure state (the names that are suffixes of it)
+        self._fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(char, 0)
+                self._fail[next_state] = fail if fail != next_state else 0
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def find_all(self, text):
+        """
+        Find every occurrence of every product name, overlapping or not.
+
+        Args:
+            text (str): Lower-cased text to search
+
+        Returns:
+            dict: name index -> list of start positions, in text order
+        """
+        goto, fail, output, names = self._goto, self._fail, self._output, self.names
+        occurrences = {}
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for index in output[state]:
+                occurrences.setdefault(index, []).append(position - len(names[index]) + 1)
+        return occurrences
+
+    def match(self, text):
+        """
+        Find the products named in a description, longest match first.
+
+        Args:
+            text (str): Description text
+
+        Returns:
+            dict: product name -> number of times it occurs, in priority
+                order (longest name first)
+        """
+        text = str(text).lower()
+        occurrences = self.find_all(text)
+        if not occurrences:
+            return {}
+
+        claimed = bytearray(len(text))
+        counts = {}
+        for index in self._priority:
+            starts = occurrences.get(index)
+            if not starts:
+                continue
+            length = len(self.names[index])
+            count = 0
+            last_end = 0
+            for start in starts:
+                end = start + length
+                # Non-overlapping repeats of the same name (like str.count),
+                # and nothing that a longer name has already claimed
+                if start < last_end or claimed.find(1, start, end) != -1:
+                    continue
+                claimed[start:end] = b'\x01' * length
+                count += 1
+                last_end = end
+            if count:
+                counts[self.names[index]] = count
+        return counts
@@ -0,0 +1,128 @@
+"""
+Invoice Rollups
+Pre-aggregated totals of the processed invoice table, for the dashboard.
+
+The dashboard's state, monthly, product and payment sections only need sums
+and counts, so instead of grouping the raw invoice rows on every render they
+can group a rollup: one row per (State, Year, Month, Description, Mode of
+Payment) combination with the order count, row count and the sums of Invoice
+Value, Qty, Profit, Expenses and Platform Fees. The rollup grows with the
+number of distinct keys, not with the number of invoices, and because every
+measure is a count or a sum, grouping it by any subset of its keys gives the
+same totals as grouping the raw rows.
+
+analysis.py materializes the rollup as a Parquet file named after its
+rollup_key(): the CSV's content hash, the fingerprint of the product catalogue
+and costing it was costed with (Profit, Expenses and Platform Fees depend on
+both) and ROLLUP_VERSION. The dashboard reads it back only when all three
+match, so a re-priced catalogue never serves stale totals.
+"""
+
+import os
+
+import pandas as pd
+
+ROLLUP_DIR = 'rollups'
+
+# Bump when the rollup's columns or aggregation change
+ROLLUP_VERSION = 1
+
+# Grouping keys, in order; any that the invoice table lacks are left out
+ROLLUP_KEYS = ['State', 'Year', 'Month', 'Description', 'Mode of Payment']
+
+
+def build_rollup(df):
+    """
+    Aggregate the processed invoice table to one row per distinct key combination.
+
+    Args:
+        df (pd.DataFrame): Invoice table after costing (with 'State', 'Year',
+            'Month', 'Profit', 'Expenses' and 'Platform Fees')
+
+    Returns:
+        pd.DataFrame: ROLLUP_KEYS columns plus 'Orders' (invoices with an
+            Invoice Value), 'Rows', 'Revenue', 'Qty', 'Profit', 'Expenses'
+            and 'Platform Fees'. Missing key values are kept as their own
+            group, so no invoice drops out of the totals.
+    """
+    keys = [key for key in ROLLUP_KEYS if key in df.columns]
+    return df.groupby(keys, dropna=False, sort=False).agg(
+        Orders=('Invoice Value', 'count'),
+        Rows=('Invoice Value', 'size'),
+        Revenue=('Invoice Value', 'sum'),
+        Qty=('Qty', 'sum'),
+        Profit=('Profit', 'sum'),
+        Expenses=('Expenses', 'sum'),
+        Platform_Fees=('Platform Fees', 'sum')
+    ).rename(columns={'Platform_Fees': 'Platform Fees'}).reset_index()
+
+
+def rollup_key(source_hash, catalogue_hash):
+    """
+    Key of the rollup of one CSV costed against one catalogue.
+
+    Args:
+        source_hash (str): SHA-256 of the CSV
+        catalogue_hash (str): product_costing.catalogue_fingerprint() of the
+            catalogue the CSV was costed with
+
+    Returns:
+        str: "<source hash>-<catalogue hash prefix>-v<ROLLUP_VERSION>"
+    """
+    return f"{source_hash}-{catalogue_hash[:16]}-v{ROLLUP_VERSION}"
+
+
+def rollup_path(key, rollup_dir=ROLLUP_DIR):
+    """Return the Parquet path of the rollup with this rollup_key()."""
+    return os.path.join(rollup_dir, f"{key}.parquet")
+
+
+def write_rollup(rollup, key, rollup_dir=ROLLUP_DIR):
+    """
+    Write a rollup to its Parquet file.
+
+    The rollup is serialized before anything touches the disk, so without a
+    Parquet engine no directory or file is created. The file is written next
+    to its final name and renamed into place, so a reader never sees a
+    partial file.
+
+    Args:
+        rollup (pd.DataFrame): Table returned by build_rollup()
+        key (str): rollup_key() of the CSV and catalogue it was built from
+        rollup_dir (str): Directory holding the rollup files
+
+    Returns:
+        str: Path of the written file
+
+    Raises:
+        ImportError: If no Parquet engine (pyarrow) is installed
+    """
+    data = rollup.to_parquet(None, index=False)
+    os.makedirs(rollup_dir, exist_ok=True)
+    path = rollup_path(key, rollup_dir)
+    with open(path + '.tmp', 'wb') as f:
+        f.write(data)
+    os.replace(path + '.tmp', path)
+    return path
+
+
+def read_rollup(key, rollup_dir=ROLLUP_DIR):
+    """
+    Read the materialized rollup of a CSV.
+
+    Args:
+        key (str): rollup_key() of the CSV and the current catalogue
+        rollup_dir (str): Directory holding the rollup files
+
+    Returns:
+        pd.DataFrame: The rollup, or None if it has not been materialized
+            for this CSV, catalogue and ROLLUP_VERSION (or no Parquet engine
+            is installed)
+    """
+    path = rollup_path(key, rollup_dir)
+    if not os.path.exists(path):
+        return None
+    try:
+        return pd.read_parquet(path)
+    except ImportError:
+        return None
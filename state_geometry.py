@@ -0,0 +1,258 @@
+"""
+India State Geometry
+Local copy of the India states GeoJSON used by the dashboard's choropleth.
+
+Passing the gist URL to px.choropleth made every render fetch and parse the
+full-resolution boundaries again. Run this module once where the network is
+available:
+
+    python state_geometry.py
+
+It downloads the GeoJSON, simplifies every ring with the Douglas-Peucker
+algorithm (points closer than GEOJSON_TOLERANCE degrees, about 500 m, to the
+simplified line are dropped), rounds the coordinates to GEOJSON_PRECISION
+decimal places, checks that every state in ALL_INDIA_STATES has a feature,
+and writes the result to GEOJSON_PATH (assets/india_states.geojson next to
+this module, whatever the working directory), which is committed with the
+dashboard. Neighbouring states are simplified separately, so their shared
+border can drift apart by up to the tolerance; on the dashboard's map of
+India one pixel covers about 0.06 degrees, so the slivers never show.
+
+    python state_geometry.py --check
+
+re-checks the committed file without the network.
+
+The dashboard reads the file once per process with load_state_geometry().
+The map joins the data on the features' ST_NM property, so the feature names
+are checked against the dashboard's state names when they are loaded: names
+that differ only in case, punctuation or "&" versus "and" are renamed to the
+dashboard's spelling, and any state still without a boundary is reported.
+"""
+
+import json
+import os
+import re
+import sys
+import urllib.request
+
+GEOJSON_URL = "https://gist.githubusercontent.com/jbrobst/56c13bbbf9d97d187fea01ca62ea5112/raw/e388c4cae20aa53cb5090210a42ebb9b765c0a36/india_states.geojson"
+GEOJSON_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'assets', 'india_states.geojson')
+GEOJSON_PRECISION = 3
+GEOJSON_TOLERANCE = 0.005  # Douglas-Peucker tolerance, in degrees
+
+# Feature property holding the state name (px.choropleth featureidkey)
+NAME_PROPERTY = 'ST_NM'
+FEATURE_ID_KEY = f'properties.{NAME_PROPERTY}'
+
+# All India States and UTs, as the dashboard names them; each needs a feature
+ALL_INDIA_STATES = [
+    'Andhra Pradesh', 'Arunachal Pradesh', 'Assam', 'Bihar', 'Chhattisgarh',
+    'Goa', 'Gujarat', 'Haryana', 'Himachal Pradesh', 'Jharkhand',
+    'Karnataka', 'Kerala', 'Madhya Pradesh', 'Maharashtra', 'Manipur',
+    'Meghalaya', 'Mizoram', 'Nagaland', 'Odisha', 'Punjab', 'Rajasthan',
+    'Sikkim', 'Tamil Nadu', 'Telangana', 'Tripura', 'Uttar Pradesh',
+    'Uttarakhand', 'West Bengal', 'Andaman and Nicobar Islands',
+    'Chandigarh', 'Dadra and Nagar Haveli and Daman and Diu',
+    'Delhi', 'Jammu and Kashmir', 'Ladakh', 'Lakshadweep', 'Puducherry'
+]
+
+
+def _segment_distance(point, start, end):
+    """Distance from point to the segment start-end, in coordinate units."""
+    dx, dy = end[0] - start[0], end[1] - start[1]
+    if dx == 0 and dy == 0:
+        return ((point[0] - start[0]) ** 2 + (point[1] - start[1]) ** 2) ** 0.5
+    t = max(0.0, min(1.0, ((point[0] - start[0]) * dx + (point[1] - start[1]) * dy) / (dx * dx + dy * dy)))
+    return ((point[0] - start[0] - t * dx) ** 2 + (point[1] - start[1] - t * dy) ** 2) ** 0.5
+
+
+def douglas_peucker(points, tolerance):
+    """
+    Simplify a polyline with the Douglas-Peucker algorithm.
+
+    Args:
+        points (list): [x, y] points
+        tolerance (float): Largest distance a dropped point may have from the
+            simplified line
+
+    Returns:
+        list: The points kept, first and last always included
+    """
+    if len(points) < 3:
+        return list(points)
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    # An explicit stack instead of recursion: coastlines have many thousand points
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        farthest, distance = None, tolerance
+        for i in range(first + 1, last):
+            d = _segment_distance(points[i], points[first], points[last])
+            if d > distance:
+                farthest, distance = i, d
+        if farthest is not None:
+            keep[farthest] = True
+            stack.append((first, farthest))
+            stack.append((farthest, last))
+    return [point for point, kept in zip(points, keep) if kept]
+
+
+def _simplify_ring(ring, precision, tolerance):
+    """Simplify a closed ring, round its coordinates and drop consecutive duplicates."""
+    # A closed ring starts and ends on the same point, which Douglas-Peucker
+    # would see as a zero-length baseline; split it at its farthest point
+    original = [list(point[:2]) for point in ring]
+    ring = original
+    if len(ring) > 4:
+        split = max(range(len(ring)), key=lambda i: _segment_distance(ring[i], ring[0], ring[0]))
+        ring = douglas_peucker(ring[:split + 1], tolerance)[:-1] + douglas_peucker(ring[split:], tolerance)
+    points = []
+    for point in ring:
+        rounded = [round(point[0], precision), round(point[1], precision)]
+        if not points or rounded != points[-1]:
+            points.append(rounded)
+    # A closed ring needs at least 4 points; keep tiny islands as they were
+    return points if len(points) >= 4 else original
+
+
+def simplify_geojson(geojson, precision=GEOJSON_PRECISION, tolerance=GEOJSON_TOLERANCE):
+    """
+    Simplify every Polygon / MultiPolygon feature and round its coordinates, in place.
+
+    Args:
+        geojson (dict): FeatureCollection
+        precision (int): Decimal places to keep
+        tolerance (float): Douglas-Peucker tolerance, in degrees
+
+    Returns:
+        dict: The same FeatureCollection
+    """
+    for feature in geojson['features']:
+        geometry = feature.get('geometry') or {}
+        if geometry.get('type') == 'Polygon':
+            geometry['coordinates'] = [_simplify_ring(ring, precision, tolerance)
+                                       for ring in geometry['coordinates']]
+        elif geometry.get('type') == 'MultiPolygon':
+            geometry['coordinates'] = [[_simplify_ring(ring, precision, tolerance) for ring in polygon]
+                                       for polygon in geometry['coordinates']]
+    return geojson
+
+
+def count_points(geojson):
+    """Number of coordinate pairs in the Polygon / MultiPolygon features."""
+    total = 0
+    for feature in geojson['features']:
+        geometry = feature.get('geometry') or {}
+        polygons = {'Polygon': [geometry.get('coordinates')],
+                    'MultiPolygon': geometry.get('coordinates')}.get(geometry.get('type'), [])
+        total += sum(len(ring) for polygon in polygons for ring in polygon)
+    return total
+
+
+def _name_key(name):
+    """Comparison key for state names: lower case, '&' as 'and', letters only."""
+    return re.sub(r'[^a-z]', '', str(name).lower().replace('&', 'and'))
+
+
+def match_state_names(geojson, state_names):
+    """
+    Align the features' names with the dashboard's state names, in place.
+
+    Args:
+        geojson (dict): FeatureCollection with NAME_PROPERTY on each feature
+        state_names (list): State names the dashboard plots
+
+    Returns:
+        list: The state_names that no feature matches
+    """
+    canonical = {_name_key(name): name for name in state_names}
+    found = set()
+    for feature in geojson['features']:
+        properties = feature.setdefault('properties', {})
+        name = canonical.get(_name_key(properties.get(NAME_PROPERTY, '')))
+        if name is not None:
+            properties[NAME_PROPERTY] = name
+            found.add(name)
+    return [name for name in state_names if name not in found]
+
+
+def load_state_geometry(state_names=ALL_INDIA_STATES, path=GEOJSON_PATH):
+    """
+    Read the local GeoJSON and validate its names against the dashboard's.
+
+    Args:
+        state_names (list): State names the dashboard plots
+        path (str): Local GeoJSON file
+
+    Returns:
+        tuple: (geojson, missing_states), missing_states listing the
+            state_names without a boundary
+
+    Raises:
+        FileNotFoundError: If the GeoJSON has not been downloaded
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"{path} not found; download it once with: python state_geometry.py")
+    with open(path, encoding='utf-8') as f:
+        geojson = json.load(f)
+    return geojson, match_state_names(geojson, state_names)
+
+
+def download_geojson(url=GEOJSON_URL, path=GEOJSON_PATH, precision=GEOJSON_PRECISION,
+                     tolerance=GEOJSON_TOLERANCE):
+    """
+    Download the state boundaries, simplify them and save them to path.
+
+    Returns:
+        dict: downloaded / written sizes in bytes and points_before /
+            points_after
+
+    Raises:
+        ValueError: If a state in ALL_INDIA_STATES has no feature; nothing
+            is written
+    """
+    with urllib.request.urlopen(url, timeout=60) as response:
+        raw = response.read()
+    geojson = json.loads(raw)
+    points_before = count_points(geojson)
+    simplify_geojson(geojson, precision, tolerance)
+
+    missing_states = match_state_names(geojson, ALL_INDIA_STATES)
+    if missing_states:
+        raise ValueError(f"No boundary for: {', '.join(missing_states)}")
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(geojson, f, separators=(',', ':'))
+    os.replace(path + '.tmp', path)
+    return {
+        'downloaded': len(raw),
+        'written': os.path.getsize(path),
+        'points_before': points_before,
+        'points_after': count_points(geojson),
+    }
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ['--check']:
+        try:
+            geojson, missing_states = load_state_geometry()
+        except FileNotFoundError as e:
+            print(f"✗ {e}")
+            sys.exit(1)
+        if missing_states:
+            print(f"✗ No boundary for: {', '.join(missing_states)}")
+            sys.exit(1)
+        print(f"✓ {GEOJSON_PATH}: all {len(ALL_INDIA_STATES)} states and UTs, "
+              f"{count_points(geojson):,} points")
+        sys.exit(0)
+
+    print("=" * 80)
+    print("DOWNLOADING INDIA STATE GEOMETRY")
+    print("=" * 80)
+    stats = download_geojson()
+    print(f"✓ {GEOJSON_URL}")
+    print(f"✓ Saved to {GEOJSON_PATH}: {stats['downloaded']:,} → {stats['written']:,} bytes, "
+          f"{stats['points_before']:,} → {stats['points_after']:,} points "
+          f"(tolerance {GEOJSON_TOLERANCE}°, {GEOJSON_PRECISION} decimal places)")
@@ -0,0 +1,173 @@
+"""
+State Normalizer
+Resolves the 'Place of Delivery' of each invoice to a standard state / UT name.
+
+Resolution, in order:
+  1. The whole value is a known state spelling (STATES_MAP key).
+  2. A known spelling appears inside the value (noisy address strings). All
+     spellings are searched at once with one compiled alternation, and the
+     longest spelling found wins.
+  3. The PIN code in the Shipping Address. The first three digits of an Indian
+     PIN identify the state; prefixes shared by two states / UTs are left
+     out of PIN_PREFIX_STATES, so this never guesses.
+  4. "Unknown".
+
+normalize_states() works on a whole column: each distinct value (and, for the
+rows that still need it, each distinct address) is resolved once and the
+results are mapped back to the rows, so the cost grows with the number of
+distinct addresses rather than the number of invoices.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+STATES_MAP = {
+    'ANDHRA PRADESH': 'Andhra Pradesh', 'ARUNACHAL PRADESH': 'Arunachal Pradesh',
+    'ASSAM': 'Assam', 'BIHAR': 'Bihar', 'CHHATTISGARH': 'Chhattisgarh',
+    'GOA': 'Goa', 'GUJARAT': 'Gujarat', 'HARYANA': 'Haryana',
+    'HIMACHAL PRADESH': 'Himachal Pradesh', 'JHARKHAND': 'Jharkhand',
+    'KARNATAKA': 'Karnataka', 'KERALA': 'Kerala', 'MADHYA PRADESH': 'Madhya Pradesh',
+    'MAHARASHTRA': 'Maharashtra', 'MANIPUR': 'Manipur', 'MEGHALAYA': 'Meghalaya',
+    'MIZORAM': 'Mizoram', 'NAGALAND': 'Nagaland', 'ODISHA': 'Odisha',
+    'PUNJAB': 'Punjab', 'RAJASTHAN': 'Rajasthan', 'SIKKIM': 'Sikkim',
+    'TAMIL NADU': 'Tamil Nadu', 'TAMILNADU': 'Tamil Nadu', 'TAMIL NADU ': 'Tamil Nadu',
+    'TELANGANA': 'Telangana', 'TRIPURA': 'Tripura', 'UTTAR PRADESH': 'Uttar Pradesh',
+    'UTTARAKHAND': 'Uttarakhand', 'WEST BENGAL': 'West Bengal',
+    # Union Territories
+    'ANDAMAN AND NICOBAR ISLANDS': 'Andaman and Nicobar Islands',
+    'CHANDIGARH': 'Chandigarh', 'DADRA AND NAGAR HAVELI AND DAMAN AND DIU': 'Dadra and Nagar Haveli and Daman and Diu',
+    'DELHI': 'Delhi', 'JAMMU AND KASHMIR': 'Jammu and Kashmir',
+    'LADAKH': 'Ladakh', 'LAKSHADWEEP': 'Lakshadweep', 'PUDUCHERRY': 'Puducherry'
+}
+
+# Every spelling in one alternation, longest first so that a spelling is never
+# cut short by a shorter one that it starts with
+STATE_PATTERN = re.compile('|'.join(re.escape(key) for key in sorted(STATES_MAP, key=len, reverse=True)))
+
+# First three PIN digits -> state, as inclusive ranges, following the India
+# Post circles. Prefixes that span two states / UTs are deliberately missing:
+#   160            Chandigarh / Punjab (Mohali)
+#   244, 246, 247  Uttar Pradesh / Uttarakhand (Kashipur, Bijnor / Pauri,
+#   262            Saharanpur / Roorkee, Pilibhit / Pithoragarh)
+#   362, 396       Gujarat / Dadra and Nagar Haveli and Daman and Diu (Diu,
+#                  Daman and Silvassa)
+#   507            Telangana / Andhra Pradesh (the Khammam mandals moved to
+#                  Andhra Pradesh in 2014)
+#   533            Andhra Pradesh / Puducherry (Yanam)
+#   605, 607, 609  Tamil Nadu / Puducherry (Puducherry, Bahour, Karaikal)
+#   673            Kerala / Puducherry (Mahe)
+#   682            Kerala / Lakshadweep
+#   822 is Jharkhand (Palamu, Garhwa) inside the Bihar block.
+PIN_PREFIX_RANGES = [
+    (110, 110, 'Delhi'),
+    (121, 136, 'Haryana'),
+    (140, 159, 'Punjab'),
+    (171, 177, 'Himachal Pradesh'),
+    (180, 193, 'Jammu and Kashmir'),
+    (194, 194, 'Ladakh'),
+    (201, 243, 'Uttar Pradesh'), (245, 245, 'Uttar Pradesh'),
+    (250, 261, 'Uttar Pradesh'), (271, 285, 'Uttar Pradesh'),
+    (248, 249, 'Uttarakhand'), (263, 263, 'Uttarakhand'),
+    (301, 345, 'Rajasthan'),
+    (360, 361, 'Gujarat'), (363, 395, 'Gujarat'),
+    (400, 402, 'Maharashtra'), (404, 445, 'Maharashtra'),
+    (403, 403, 'Goa'),
+    (450, 488, 'Madhya Pradesh'),
+    (490, 497, 'Chhattisgarh'),
+    (500, 506, 'Telangana'), (508, 509, 'Telangana'),
+    (515, 532, 'Andhra Pradesh'), (534, 535, 'Andhra Pradesh'),
+    (560, 591, 'Karnataka'),
+    (600, 604, 'Tamil Nadu'), (606, 606, 'Tamil Nadu'), (608, 608, 'Tamil Nadu'),
+    (610, 643, 'Tamil Nadu'),
+    (670, 672, 'Kerala'), (674, 681, 'Kerala'), (683, 695, 'Kerala'),
+    (700, 736, 'West Bengal'), (738, 743, 'West Bengal'),
+    (737, 737, 'Sikkim'),
+    (744, 744, 'Andaman and Nicobar Islands'),
+    (751, 770, 'Odisha'),
+    (781, 788, 'Assam'),
+    (790, 792, 'Arunachal Pradesh'),
+    (793, 794, 'Meghalaya'),
+    (795, 795, 'Manipur'),
+    (796, 796, 'Mizoram'),
+    (797, 798, 'Nagaland'),
+    (799, 799, 'Tripura'),
+    (800, 813, 'Bihar'), (817, 821, 'Bihar'), (823, 824, 'Bihar'), (836, 855, 'Bihar'),
+    (814, 816, 'Jharkhand'), (822, 822, 'Jharkhand'), (825, 835, 'Jharkhand'),
+]
+PIN_PREFIX_STATES = {prefix: state
+                     for first, last, state in PIN_PREFIX_RANGES
+                     for prefix in range(first, last + 1)}
+
+# A six-digit PIN, optionally written "600 126"
+PIN_PATTERN = re.compile(r'(?<!\d)([1-9]\d{2}) ?\d{3}(?!\d)')
+
+
+def state_from_name(value):
+    """
+    Resolve a Place of Delivery by its state name.
+
+    Returns:
+        str: Standard state / UT name, or None if no known spelling appears
+    """
+    val_str = str(value).upper().strip()
+    if val_str in STATES_MAP:
+        return STATES_MAP[val_str]
+    found = STATE_PATTERN.findall(val_str)
+    if found:
+        return STATES_MAP[max(found, key=len)]
+    return None
+
+
+def state_from_pin(address):
+    """
+    Resolve an address by its PIN code (the last six-digit number in it).
+
+    Returns:
+        str: Standard state / UT name, or None if there is no PIN or its
+            prefix is not tied to a single state
+    """
+    found = PIN_PATTERN.findall(str(address))
+    if not found:
+        return None
+    return PIN_PREFIX_STATES.get(int(found[-1]))
+
+
+def normalize_state(value, address=None):
+    """Resolve one Place of Delivery (and optionally its Shipping Address) to a state name or "Unknown"."""
+    state = state_from_name(value)
+    if state is None and address is not None:
+        state = state_from_pin(address)
+    return state or "Unknown"
+
+
+def _resolve_unique(values, resolve):
+    """Apply resolve to each distinct value of a Series; returns an object array aligned with it."""
+    codes, uniques = pd.factorize(values)
+    # Extra slot at the end for the -1 code of missing values
+    resolved = np.array([resolve(value) for value in uniques] + [resolve(np.nan)], dtype=object)
+    return resolved[codes]
+
+
+def normalize_states(values, addresses=None):
+    """
+    Resolve a whole column of Place of Delivery values.
+
+    Args:
+        values (pd.Series): Place of Delivery (or State) column
+        addresses (pd.Series): Shipping Address column, for the PIN fallback
+
+    Returns:
+        pd.Series: State / UT names ("Unknown" where nothing resolves),
+            indexed like values
+    """
+    states = _resolve_unique(values, state_from_name)
+
+    unresolved = pd.isna(states)
+    if addresses is not None and unresolved.any():
+        states[unresolved] = _resolve_unique(addresses[unresolved], state_from_pin)
+        unresolved = pd.isna(states)
+
+    states[unresolved] = "Unknown"
+    return pd.Series(states, index=values.index)
@@ -0,0 +1,198 @@
+"""
+Word-Based Table Reader
+Reads the line-item table of an invoice page from PyMuPDF's positioned words
+(page.get_text("words")) instead of the flattened page text.
+
+The column headers are located once per page: the Description column runs
+from the "Description" header to the next header to its right, and the Qty
+column sits between its neighbouring headers. Every word below the header row
+is then assigned to a cell by its coordinates in a single pass, so multi-line
+descriptions come out whole and prices or tax columns never leak into them.
+Item rows are delimited by the serial numbers in the first column, and the
+table ends at the first line below the header that holds one of the
+TABLE_STOP_KEYWORDS the text engine stops at, or at the TOTAL row.
+
+The output is not identical to the text engine's. The ASIN and SKU of every
+item are removed from its description, where the text engine leaves a SKU
+that wrapped onto its own line and the identifiers of later items in; and on
+invoices with several items the HSN code is the first item's, where the text
+engine keeps the last one it sees.
+"""
+
+import re
+
+from invoice_patterns import TABLE_PATTERNS, TABLE_STOP_KEYWORDS
+
+
+_SERIAL = re.compile(r'^\d{1,3}$')
+
+
+def _join_lines(cell):
+    """Join (y centre, x0, word) entries into text in reading order, one visual line at a time."""
+    lines = []
+    for y, x0, word in sorted(cell):
+        if lines and y - lines[-1][0] <= (word[3] - word[1]) / 2:
+            lines[-1][1].append((x0, word[4]))
+        else:
+            lines.append((y, [(x0, word[4])]))
+    return ' '.join(' '.join(text for _, text in sorted(line)) for _, line in lines)
+
+
+def _clean_description(description):
+    """The clean-up extract_description_hsn_asin_sku applies to a description."""
+    description = TABLE_PATTERNS['Leading Serial'].sub('', description)
+    description = ' '.join(description.split())
+    description = description.rstrip('|,;')
+    description = TABLE_PATTERNS['Trailing Number'].sub('', description)
+    description = TABLE_PATTERNS['Trailing Pipe'].sub('', description)
+    description = TABLE_PATTERNS['Whitespace'].sub(' ', description)
+    return TABLE_PATTERNS['Trailing Label'].sub('', description).strip()
+
+
+def _split_item(text):
+    """Split the text of one Description cell into (description, hsn_code, asin, sku)."""
+    hsn_code = asin = sku = ""
+
+    match = TABLE_PATTERNS['HSN'].search(text)
+    if match:
+        hsn_code = match.group(1)
+        text = text[:match.start()] + text[match.end():]
+
+    match = TABLE_PATTERNS['ASIN'].search(text)
+    if match:
+        asin = match.group(1)
+        text = text.replace(asin, '')
+
+    match = TABLE_PATTERNS['SKU'].search(text)
+    if match and match.group(1) != asin and '-' in match.group(1):
+        sku = match.group(1)
+        text = text[:match.start()] + text[match.end():]
+
+    return _clean_description(text), hsn_code, asin, sku
+
+
+def find_table_columns(words):
+    """
+    Locate the line-item table from its header row.
+
+    Args:
+        words (list): page.get_text("words") tuples
+
+    Returns:
+        dict: 'top', the y where the table body starts, and the (left, right)
+            x bounds of the 'Serial', 'Description' and 'Qty' columns ('Qty'
+            is None if there is no Qty header), or None if there is no
+            Description header on the page
+    """
+    header = next((w for w in words if w[4].rstrip(':').lower() == 'description'), None)
+    if header is None:
+        return None
+
+    # Header labels may wrap onto two lines ("Unit / Price"), so take every word
+    # whose centre is within about a line height of the Description header's.
+    # Centres are compared doubled (y0 + y1) to skip the division.
+    height = header[3] - header[1]
+    low = header[1] + header[3] - 2.4 * height
+    high = header[1] + header[3] + 2.4 * height
+    header_words = sorted((w for w in words if low <= w[1] + w[3] <= high), key=lambda w: w[0])
+    left_of = [w for w in header_words if w[2] <= header[0]]
+    right_of = [w for w in header_words if w[0] >= header[2]]
+
+    description_left = (left_of[-1][2] + header[0]) / 2 if left_of else header[0] - height
+    description_right = right_of[0][0] if right_of else float('inf')
+
+    qty = None
+    for i, word in enumerate(header_words):
+        if word[4].rstrip(':').lower() in ('qty', 'quantity'):
+            left = (header_words[i - 1][2] + word[0]) / 2 if i > 0 else word[0] - height
+            right = (word[2] + header_words[i + 1][0]) / 2 if i + 1 < len(header_words) else word[2] + height
+            qty = (left, right)
+            break
+
+    return {
+        'top': max(w[3] for w in header_words),
+        'Serial': (float('-inf'), description_left),
+        'Description': (description_left, description_right),
+        'Qty': qty,
+    }
+
+
+def extract_table_fields(words, debug=False):
+    """
+    Extract description, HSN code, ASIN, SKU and Qty from positioned words.
+
+    Args:
+        words (list): page.get_text("words") tuples of the invoice page
+        debug (bool): Print debug info
+
+    Returns:
+        tuple: (description, hsn_code, asin, sku, qty), or None if the table
+            could not be located (the caller should fall back to the text
+            engine). With several items the descriptions are joined with
+            " | " and the other fields come from the first item that has them.
+    """
+    columns = find_table_columns(words)
+    if columns is None:
+        if debug:
+            print("Word engine: no 'Description' header found")
+        return None
+
+    # One pass over the words: bucket everything below the header by column,
+    # collect the text lines (block, line numbers, as in the page text) to
+    # find where the table ends, and note the TOTAL row
+    top = columns['top']
+    bottom = float('inf')
+    description_left, description_right = columns['Description']
+    qty_left, qty_right = columns['Qty'] or (0, 0)
+    serials, description_cell, qty_cell = [], [], []
+    lines = {}
+    for word in words:
+        y = (word[1] + word[3]) / 2
+        if y <= top:
+            continue
+        line = lines.setdefault(word[5:7], [word[1], []])
+        line[0] = min(line[0], word[1])
+        line[1].append(word[4])
+        x = (word[0] + word[2]) / 2
+        if x < description_left:
+            if word[4].upper().startswith('TOTAL'):
+                bottom = min(bottom, word[1])
+            elif _SERIAL.match(word[4]):
+                serials.append(word[1] - (word[3] - word[1]) / 2)
+        elif x < description_right:
+            description_cell.append((y, word[0], word))
+        elif qty_left <= x < qty_right and word[4].isdigit():
+            qty_cell.append((y, word[4]))
+
+    # Without a TOTAL row in the first column, the footer sections (payment
+    # details, transaction dates, ...) would otherwise run into the last item
+    for line_top, line_words in lines.values():
+        text = ' '.join(line_words)
+        if any(keyword in text for keyword in TABLE_STOP_KEYWORDS):
+            bottom = min(bottom, line_top)
+
+    # Item rows start at the serial numbers; no serials means a single item
+    row_starts = sorted(y for y in serials if y < bottom) or [top]
+    row_ends = row_starts[1:] + [bottom]
+
+    descriptions = []
+    hsn_code = asin = sku = qty = ""
+    for start, end in zip(row_starts, row_ends):
+        in_row = [entry for entry in description_cell if start <= entry[0] < end]
+        item_description, item_hsn, item_asin, item_sku = _split_item(_join_lines(in_row))
+        item_qty = min((entry for entry in qty_cell if start <= entry[0] < end), default=(0, ""))[1]
+        if debug:
+            print(f"Word engine row: {item_description!r} HSN={item_hsn} ASIN={item_asin} "
+                  f"SKU={item_sku} Qty={item_qty}")
+
+        if item_description:
+            descriptions.append(item_description)
+        hsn_code = hsn_code or item_hsn
+        asin = asin or item_asin
+        sku = sku or item_sku
+        qty = qty or item_qty
+
+    description = ' | '.join(descriptions)
+    if not description:
+        return None
+    return description, hsn_code, asin, sku, qty